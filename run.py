@@ -1,8 +1,9 @@
 #!venv/bin/python3
 import os
 
-from src.funcs.textFunc import create_json_config_file, get_from_json
+from src.funcs.textFunc import create_json_config_file
 
+from src.clss.appConfig import load_config
 from src.clss.applicationConfigurator import appConfigurator
 
 
@@ -26,9 +27,10 @@ def main() -> None:
         return
     CONFIG_FILE = 'config.json'
     PACKAGE_PATH = os.path.join('src', 'apps')
-    app_conf = appConfigurator(CONFIG_FILE)
+    app_conf = appConfigurator(load_config(CONFIG_FILE))
     app_module = app_conf.import_app(PACKAGE_PATH)
-    automaton = app_module.automaton
+    build_automaton = getattr(app_module, 'build_automaton', None)
+    automaton = build_automaton() if build_automaton else app_module.automaton
     automaton.run_task()
     print(f"""
 Total created cards: {len(automaton.card_list)}
@@ -1 +1,41 @@
-CONFIG_FILE = 'config.json'
\ No newline at end of file
+from typing import Callable
+
+CONFIG_FILE = 'config.json'
+
+
+def lazy_automaton(module_name: str, build_automaton: Callable) -> Callable:
+    """
+        Cria o __getattr__ de um módulo de aplicação, de modo que o atributo automaton só seja construído, por build_automaton, no primeiro acesso. Importar a aplicação não lê a configuração nem cria conexões, navegadores ou clientes.
+
+        Args:
+            module_name (str): nome do módulo, utilizado nas mensagens de erro.
+            build_automaton (Callable): função que monta e retorna o AutoFlashCards da aplicação."""
+    built = {}
+
+    def __getattr__(name: str):
+        if name != 'automaton':
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+        if name not in built:
+            built[name] = build_automaton()
+        return built[name]
+
+    return __getattr__
+
+
+def create_text_extractor(config: 'AppConfig') -> 'CachedTextExtractor':
+    """
+        Cria o extrator de textos das aplicações de imagens conforme o campo "ocrEngine" do config.json: "vision" (padrão), o BatchGoogleVision, ou "tesseract", o TesseractOCR, offline. Cada motor tem seu próprio cache, de modo que os resultados de um não são reaproveitados pelo outro.
+
+        Args:
+            config (AppConfig): configuração carregada da aplicação."""
+    from src.clss.extractorCache import OCRResultCache, CachedTextExtractor
+    if config.ocr_engine == 'tesseract':
+        from src.clss.offlineExtractors import TesseractOCR
+        # a faixa da legenda já é recortada pelo SubtitleBandPreprocessor
+        return CachedTextExtractor(
+            TesseractOCR(band=None), OCRResultCache('ocr_cache_tesseract.sqlite3')
+        )
+    from src.clss.TextExtractors import BatchGoogleVision
+    return CachedTextExtractor(
+        BatchGoogleVision(), OCRResultCache('ocr_cache.sqlite3')
+    )
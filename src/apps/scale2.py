@@ -1,26 +1,33 @@
-import os
+from . import CONFIG_FILE, lazy_automaton
 
-from src.clss.webDriverConfigurator import WebDriverConfigurator
-from src.clss.assistants import AnkiEditPageHandler
-from src.clss.autoFlashCards import AutoFlashCards
-from src.clss.cardDeliverers import SeleniumAnkiBot
-from src.clss.sourceAdmins import (
-                MyCardShelveAdmin, TextSourceAdmin, 
-                DictBasedCardWriter
-    )
 
-from . import CONFIG_FILE
+def build_automaton() -> 'AutoFlashCards':
+    from src.clss.webDriverConfigurator import WebDriverConfigurator
+    from src.clss.autoFlashCards import AutoFlashCards
+    from src.clss.cardDeliverers import SeleniumAnkiBot
+    from src.clss.sourceAdmins import (
+                    MyCardShelveAdmin, TextSourceAdmin, 
+                    DictBasedCardWriter
+        )
+    from src.clss.phraseIndex import PhraseIndex
+    from src.clss.appConfig import load_config
+    from src.clss.databases import create_database
 
-wdconfig = WebDriverConfigurator(CONFIG_FILE)
-writer = DictBasedCardWriter()
-sourceAdmin = TextSourceAdmin(CONFIG_FILE, writer)
-dbAdmin = MyCardShelveAdmin('db', 'cards')
+    config = load_config(CONFIG_FILE)
+    wdconfig = WebDriverConfigurator(config)
+    writer = DictBasedCardWriter(PhraseIndex('phrases.sqlite3'), keep_cards=False)
+    sourceAdmin = TextSourceAdmin(config, writer, config.incremental_phrases)
+    dbAdmin = MyCardShelveAdmin('db', 'cards', create_database(config.database))
 
-selenium_anki_bot_args = {
-    'web_driver_settings': wdconfig.config_settings(), 
-    'user_data': CONFIG_FILE
-}
+    selenium_anki_bot_args = {
+        'web_driver_settings': wdconfig.config_settings(), 
+        'user_data': config,
+        'session_file': 'ankiweb_session.json',
+    }
 
-deliver = SeleniumAnkiBot(**selenium_anki_bot_args)
+    deliver = SeleniumAnkiBot(**selenium_anki_bot_args)
 
-automaton = AutoFlashCards(deliver, sourceAdmin, dbAdmin)
+    return AutoFlashCards(deliver, sourceAdmin, dbAdmin)
+
+
+__getattr__ = lazy_automaton(__name__, build_automaton)
@@ -1,41 +1,48 @@
 #!venv/bin/python3
 
-import os
-
-from src.clss.autoFlashCards import AutoFlashCards
-from src.clss.webDriverConfigurator import WebDriverConfigurator
-from src.clss.cardDeliverers import SeleniumAnkiBot
-from src.clss.cardWriter import DictBasedCardWriter
-from src.clss.imageSources import LocalFolderSource
-from src.clss.TextExtractors import GoogleVision
-from src.clss.sourceAdmins import ImageSourceAdmin
-from src.clss.sourceAdmins import MyCardShelveAdmin
-
-from . import CONFIG_FILE
-
-
-
-path = os.path.join(os.getcwd(), 'data.json')
-folder_path = login_path = path
-
-writer = DictBasedCardWriter()
-img_source = LocalFolderSource(CONFIG_FILE)
-text_extractor = GoogleVision()
-
-wdconfig = WebDriverConfigurator(CONFIG_FILE)
-selenium_anki_bot_args = {
-    'web_driver_settings': wdconfig.config_settings(), 
-    'user_data': CONFIG_FILE
-}
-deliver = SeleniumAnkiBot(**selenium_anki_bot_args)
-
-#deliver = SeleniumAnkiBot(Firefox, login_path)
-img_admin = ImageSourceAdmin(img_source, writer, text_extractor)
-db = MyCardShelveAdmin('db', 'cards')
-
-automaton = AutoFlashCards(deliver, img_admin, db)
+from . import CONFIG_FILE, create_text_extractor, lazy_automaton
+
+
+def build_automaton() -> 'AutoFlashCards':
+    from src.clss.autoFlashCards import AutoFlashCards
+    from src.clss.webDriverConfigurator import WebDriverConfigurator
+    from src.clss.cardDeliverers import SeleniumAnkiBot
+    from src.clss.cardWriter import DictBasedCardWriter
+    from src.clss.imageSources import LocalFolderSource
+    from src.clss.imageStages import SubtitleBandPreprocessor, PerceptualDedupStage
+    from src.clss.appConfig import load_config
+    from src.clss.databases import create_database
+    from src.clss.sourceAdmins import ImageSourceAdmin
+    from src.clss.sourceAdmins import MyCardShelveAdmin
+    from src.clss.phraseIndex import PhraseIndex
+    from src.funcs.imgFuncs import PILLOW_AVAILABLE
+
+    writer = DictBasedCardWriter(PhraseIndex('phrases.sqlite3'))
+    config = load_config(CONFIG_FILE)
+    img_source = LocalFolderSource(config)
+    text_extractor = create_text_extractor(config)
+
+    wdconfig = WebDriverConfigurator(config)
+    selenium_anki_bot_args = {
+        'web_driver_settings': wdconfig.config_settings(), 
+        'user_data': config,
+        'session_file': 'ankiweb_session.json',
+    }
+    deliver = SeleniumAnkiBot(**selenium_anki_bot_args)
+
+    stages = [PerceptualDedupStage(), SubtitleBandPreprocessor()] if PILLOW_AVAILABLE else []
+    img_admin = ImageSourceAdmin(img_source, writer, text_extractor,
+                                max_workers=4, batch_size=16, prefetch=32,
+                                stages=stages)
+    db = MyCardShelveAdmin('db', 'cards', create_database(config.database))
+
+    return AutoFlashCards(deliver, img_admin, db)
+
+
+__getattr__ = lazy_automaton(__name__, build_automaton)
 
 if __name__ == "__main__":
+    automaton = build_automaton()
     automaton.run_task()
     if len(automaton.card_list) == 0:
         print('No cards to create.')
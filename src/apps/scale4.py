@@ -1,39 +1,46 @@
-import os
-import re
+from . import CONFIG_FILE, create_text_extractor, lazy_automaton
 
-from selenium.webdriver import Firefox, Chrome
-from selenium.webdriver.chrome.options import Options
 
-from src.clss.webDriverConfigurator import WebDriverConfigurator
-from src.clss.autoFlashCards import AutoFlashCards
-from src.clss.assistants import AnkiEditPageHandler
-from src.clss.cardDeliverers import SeleniumAnkiBot
-from src.clss.cardWriter import DictBasedCardWriter
-from src.clss.imageSources import GoogleDriveSource
-from src.clss.TextExtractors import GoogleVision
-from src.clss.sourceAdmins import ImageSourceAdmin
-from src.clss.sourceAdmins import MyCardShelveAdmin
-from src.clss.sourceAdmins import DriveFileIdShelveAdmin
-
-
-user_data_file = os.path.join(os.getcwd(), 'data.json')
 drive_folder_target = 'Legendas'
 
-wdconfig = WebDriverConfigurator(user_data_file)
-writer = DictBasedCardWriter()
-id_admin = DriveFileIdShelveAdmin('db', 'drive_file_id')
-img_source = GoogleDriveSource(drive_folder_target, id_admin)
-text_extractor = GoogleVision()
-
-web_edit_page_handler = AnkiEditPageHandler(re)
-selenium_anki_bot_args = {
-    'web_driver_settings': wdconfig.config_settings(), 
-    'user_data': user_data_file,
-    'web_edit_page_handler': web_edit_page_handler,
-}
-deliver = SeleniumAnkiBot(**selenium_anki_bot_args)
-
-img_admin = ImageSourceAdmin(img_source, writer, text_extractor)
-db = MyCardShelveAdmin('db', 'cards')
 
-automaton = AutoFlashCards(deliver, img_admin, db)
+def build_automaton() -> 'AutoFlashCards':
+    from src.clss.webDriverConfigurator import WebDriverConfigurator
+    from src.clss.autoFlashCards import AutoFlashCards
+    from src.clss.cardDeliverers import SeleniumAnkiBot
+    from src.clss.cardWriter import DictBasedCardWriter
+    from src.clss.imageSources import GoogleDriveSource
+    from src.clss.imageStages import SubtitleBandPreprocessor, PerceptualDedupStage
+    from src.clss.appConfig import load_config
+    from src.clss.databases import create_database
+    from src.clss.sourceAdmins import ImageSourceAdmin
+    from src.clss.sourceAdmins import MyCardShelveAdmin
+    from src.clss.sourceAdmins import DriveFileIdShelveAdmin
+    from src.clss.phraseIndex import PhraseIndex
+    from src.funcs.imgFuncs import PILLOW_AVAILABLE
+
+    config = load_config(CONFIG_FILE)
+    wdconfig = WebDriverConfigurator(config)
+    writer = DictBasedCardWriter(PhraseIndex('phrases.sqlite3'))
+    database = create_database(config.database)
+    id_admin = DriveFileIdShelveAdmin('db', 'drive_file_id', database)
+    img_source = GoogleDriveSource(drive_folder_target, id_admin, max_workers=8)
+    text_extractor = create_text_extractor(config)
+
+    selenium_anki_bot_args = {
+        'web_driver_settings': wdconfig.config_settings(), 
+        'user_data': config,
+        'session_file': 'ankiweb_session.json',
+    }
+    deliver = SeleniumAnkiBot(**selenium_anki_bot_args)
+
+    stages = [PerceptualDedupStage(), SubtitleBandPreprocessor()] if PILLOW_AVAILABLE else []
+    img_admin = ImageSourceAdmin(img_source, writer, text_extractor,
+                                max_workers=4, batch_size=16, prefetch=32,
+                                stages=stages)
+    db = MyCardShelveAdmin('db', 'cards', database)
+
+    return AutoFlashCards(deliver, img_admin, db)
+
+
+__getattr__ = lazy_automaton(__name__, build_automaton)
@@ -0,0 +1,27 @@
+from . import CONFIG_FILE, lazy_automaton
+
+
+def build_automaton() -> 'AutoFlashCards':
+    from src.clss.autoFlashCards import AutoFlashCards
+    from src.clss.cardDeliverers import AnkiConnectDeliverer
+    from src.clss.sourceAdmins import (
+                    MyCardShelveAdmin, TextSourceAdmin, 
+                    DictBasedCardWriter
+        )
+    from src.clss.phraseIndex import PhraseIndex
+    from src.clss.appConfig import load_config
+    from src.clss.databases import create_database
+
+    config = load_config(CONFIG_FILE)
+    deck_name = config.deck.name if config.deck and config.deck.name else 'Default'
+
+    writer = DictBasedCardWriter(PhraseIndex('phrases.sqlite3'), keep_cards=False)
+    sourceAdmin = TextSourceAdmin(config, writer)
+    dbAdmin = MyCardShelveAdmin('db', 'cards', create_database(config.database))
+
+    deliver = AnkiConnectDeliverer(deck_name)
+
+    return AutoFlashCards(deliver, sourceAdmin, dbAdmin)
+
+
+__getattr__ = lazy_automaton(__name__, build_automaton)
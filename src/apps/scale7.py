@@ -0,0 +1,33 @@
+from . import CONFIG_FILE, lazy_automaton
+
+
+def build_automaton() -> 'AutoFlashCards':
+    from src.clss.webDriverConfigurator import WebDriverConfigurator
+    from src.clss.autoFlashCards import AutoFlashCards
+    from src.clss.cardDeliverers import SeleniumAnkiBot
+    from src.clss.sourceAdmins import (
+                    MyCardShelveAdmin, SubtitleSourceAdmin, 
+                    DictBasedCardWriter
+        )
+    from src.clss.phraseIndex import PhraseIndex
+    from src.clss.appConfig import load_config
+    from src.clss.databases import create_database
+
+    config = load_config(CONFIG_FILE)
+    wdconfig = WebDriverConfigurator(config)
+    writer = DictBasedCardWriter(PhraseIndex('phrases.sqlite3'), keep_cards=False)
+    sourceAdmin = SubtitleSourceAdmin(config, writer)
+    dbAdmin = MyCardShelveAdmin('db', 'cards', create_database(config.database))
+
+    selenium_anki_bot_args = {
+        'web_driver_settings': wdconfig.config_settings(), 
+        'user_data': config,
+        'session_file': 'ankiweb_session.json',
+    }
+
+    deliver = SeleniumAnkiBot(**selenium_anki_bot_args)
+
+    return AutoFlashCards(deliver, sourceAdmin, dbAdmin)
+
+
+__getattr__ = lazy_automaton(__name__, build_automaton)
@@ -1,6 +1,7 @@
 import os
 import io
-from typing import List
+from threading import Lock
+from typing import List, Optional
 
 from google.cloud import vision
 from google.cloud.vision import types
@@ -8,12 +9,19 @@ from google.cloud.vision import types
 from .interfaces import TextExtractorInterface
 
 
+_AUTH_FILE = 'serviceAccountToken.json'
+
+
+def _set_credentials() -> None:
+    """
+        Configura a chave de serviço do Google Cloud ao criar o cliente, e não na importação do módulo. Uma chave já configurada no ambiente é mantida."""
+    os.environ.setdefault('GOOGLE_APPLICATION_CREDENTIALS', _AUTH_FILE)
+
+
+
 class GoogleVision(TextExtractorInterface):
-    _AUTH_FILE = 'serviceAccountToken.json'
-    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = _AUTH_FILE
-    
-    
     def img_to_str(self, img: bytes) -> List[str]:
+        _set_credentials()
         client = vision.ImageAnnotatorClient()
         image = vision.types.Image(content=img)
         response = client.text_detection(image=image)
@@ -21,3 +29,59 @@ class GoogleVision(TextExtractorInterface):
         text = texts[0].description
         text = text.replace('\n', ' ').strip()
         return text
+
+
+
+class BatchGoogleVision(TextExtractorInterface):
+    """
+        Extrator que reutiliza um único cliente do Google Vision e agrupa as imagens em requisições batch_annotate_images.
+
+        Args:
+            client: cliente do Vision API. Se não fornecido, é criado na primeira utilização.
+            batch_size (int): quantidade de imagens por requisição, limitada ao máximo aceito pela API."""
+    _MAX_BATCH_SIZE = 16
+
+    def __init__(self, client=None, batch_size: int=_MAX_BATCH_SIZE) -> None:
+        self._client = client
+        self._client_lock = Lock()
+        self.batch_size = max(1, min(batch_size, self._MAX_BATCH_SIZE))
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                _set_credentials()
+                self._client = vision.ImageAnnotatorClient()
+        return self._client
+
+    def img_to_str(self, img: bytes) -> str:
+        return self.imgs_to_str([img])[0]
+
+    def imgs_to_str(self, imgs: List[bytes]) -> List[str]:
+        texts = []
+        for start in range(0, len(imgs), self.batch_size):
+            batch = imgs[start:start + self.batch_size]
+            response = self.client.batch_annotate_images(
+                [self._text_detection_request(img) for img in batch]
+            )
+            texts.extend(
+                self._response_to_str(r) for r in response.responses
+            )
+        return texts
+
+    def _text_detection_request(self, img: bytes) -> types.AnnotateImageRequest:
+        return types.AnnotateImageRequest(
+            image=types.Image(content=img),
+            features=[
+                types.Feature(type=vision.enums.Feature.Type.TEXT_DETECTION)
+            ]
+        )
+
+    def _response_to_str(self, response) -> Optional[str]:
+        if response.error.message:
+            print(response.error.message)
+            return None
+        if len(response.text_annotations) == 0:
+            return ''
+        text = response.text_annotations[0].description
+        return text.replace('\n', ' ').strip()
@@ -1,8 +1,9 @@
-from typing import List, Any
-import shelve
+from collections import deque
+from typing import Any, Deque, Dict, List
 from abc import ABC, abstractmethod
 
 from .cards import MyCard
+from .databases import ShelveDatabase
 
 
 class AbstractWebPageContentHandler(ABC):
@@ -19,15 +20,43 @@ class AbstractWebPageContentHandler(ABC):
 
 
 class AbstractCardDeliverer(ABC):
-    
+    """
+        Entregador de objetos MyCard. Mantém um índice dos cartões pendentes pela identidade (MyCard.key), de modo que marcar um cartão como inserido custa O(1)."""
     def __init__(self):
         self._card_list: List[MyCard] = []
+        self._pending: Dict[str, Deque[MyCard]] = {}
+        self._indexed = 0
         self.total_inserted = 0
 
     @property
     def card_list(self):
         return self._card_list.copy()
 
+    def _add_cards(self, card_list: List[MyCard]) -> None:
+        self._card_list.extend(card_list)
+        self._sync_index()
+
+    def _sync_index(self) -> None:
+        """
+            Indexa os cartões adicionados à _card_list desde a última sincronização."""
+        for card in self._card_list[self._indexed:]:
+            if not card.inserted:
+                self._pending.setdefault(card.key, deque()).append(card)
+        self._indexed = len(self._card_list)
+
+    def _mark_inserted(self, card: MyCard) -> None:
+        """
+            Marca como inserido o primeiro cartão pendente com a mesma identidade do cartão fornecido."""
+        if self._indexed < len(self._card_list):
+            self._sync_index()
+        key = card.key
+        pending = self._pending.get(key)
+        if not pending:
+            return
+        pending.popleft().inserted = True
+        if not pending:
+            del self._pending[key]
+
     @abstractmethod
     def deliver(self):
         ...
@@ -42,11 +71,11 @@ class AbstractCardDeliverer(ABC):
 
 
 class AbstractShelveKeyAdmin(ABC):
-    def __init__(self, db_cards: str, db_key: str) -> None:
+    def __init__(self, db_cards: str, db_key: str, database=None) -> None:
         super().__init__()
         self.db_cards = db_cards
         self.db_key = db_key
-        self._database = shelve
+        self._database = database or ShelveDatabase()
 
     @abstractmethod
     def update_sources(self): 
@@ -58,7 +87,7 @@ class AbstractShelveKeyAdmin(ABC):
         """
             Método que realiza a verificação de existencia da key/coluna que eventualmente está estocado objetos MyCard."""
         with self._database.open(self.db_cards) as db:
-            if not self.db_key in db.keys():
+            if not self.db_key in db:
                 db[self.db_key] = []        
 
     def return_sources(self) -> list:
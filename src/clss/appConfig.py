@@ -0,0 +1,156 @@
+import os
+from dataclasses import dataclass
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+from .error import DataConfigError
+
+from src.funcs.textFunc import get_json
+
+
+@dataclass(frozen=True)
+class LoginConfig:
+    email: str
+    password: str
+
+
+@dataclass(frozen=True)
+class DeckConfig:
+    name: str
+    new_deck: bool=False
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """
+        Configuração da aplicação, obtida do config.json em uma única leitura, validada e imutável. As chaves ausentes permanecem como None, e cada componente declara, ao ser criado, as que utiliza (require), de modo que a falta de uma delas é informada por DataConfigError antes da execução.
+
+        Use load_config para obter a configuração: o arquivo só é lido novamente quando sua data de modificação muda."""
+    path: str
+    mtime: int
+    login: Optional[LoginConfig]=None
+    deck: Optional[DeckConfig]=None
+    application_file_name: Optional[str]=None
+    web_driver_user_settings: Optional[Mapping[str, Any]]=None
+    img_path: Optional[str]=None
+    phrases_file: Optional[str]=None
+    subtitles_path: Optional[str]=None
+    incremental_phrases: bool=False
+    database: str="sqlite"
+    ocr_engine: str="vision"
+
+    _JSON_KEYS = MappingProxyType({
+        "login": "login",
+        "deck": "deck",
+        "application_file_name": "application_file_name",
+        "web_driver_user_settings": "web_driver_user_settings",
+        "img_path": "imgPath",
+        "phrases_file": "phrasesFile",
+        "subtitles_path": "subtitlesPath",
+        "incremental_phrases": "incrementalPhrases",
+        "database": "database",
+        "ocr_engine": "ocrEngine",
+    })
+    _DATABASES = ("sqlite", "shelve")
+    _OCR_ENGINES = ("vision", "tesseract")
+    _WEB_DRIVER_KEYS = ("browser", "web_driver_args",
+                        "web_driver_options", "auto_executable_path")
+
+    @classmethod
+    def from_file(cls, path: str) -> "AppConfig":
+        mtime = os.stat(path).st_mtime_ns
+        try:
+            content = get_json(path)
+        except ValueError:
+            raise DataConfigError(path)
+        if not isinstance(content, dict):
+            raise DataConfigError(path)
+        values = {
+            field: content[key] for field, key in cls._JSON_KEYS.items()
+            if content.get(key) is not None
+        }
+        if "login" in values:
+            values["login"] = cls._parse_login(values["login"])
+        if "deck" in values:
+            values["deck"] = cls._parse_deck(values["deck"])
+        if "web_driver_user_settings" in values:
+            settings = values["web_driver_user_settings"]
+            if not isinstance(settings, dict) or any(
+                    key not in settings for key in cls._WEB_DRIVER_KEYS):
+                raise DataConfigError("web_driver_user_settings")
+            values["web_driver_user_settings"] = _freeze(settings)
+        if not isinstance(values.get("incremental_phrases", False), bool):
+            raise DataConfigError("incrementalPhrases")
+        if values.get("database", "sqlite") not in cls._DATABASES:
+            raise DataConfigError("database")
+        if values.get("ocr_engine", "vision") not in cls._OCR_ENGINES:
+            raise DataConfigError("ocrEngine")
+        return cls(path=path, mtime=mtime, **values)
+
+    @staticmethod
+    def _parse_login(login: Any) -> LoginConfig:
+        if not isinstance(login, dict) or any(
+                not isinstance(login.get(key), str) for key in ("email", "password")):
+            raise DataConfigError("login")
+        return LoginConfig(login["email"], login["password"])
+
+    @staticmethod
+    def _parse_deck(deck: Any) -> DeckConfig:
+        if not isinstance(deck, dict):
+            raise DataConfigError("deck")
+        name = deck.get("name") or deck.get("deck_name") or ""
+        return DeckConfig(str(name), bool(deck.get("new_deck", False)))
+
+    def require(self, *names: str) -> Tuple[Any, ...]:
+        """
+            Retorna os valores dos campos informados, levantando DataConfigError com a chave do config.json do primeiro campo ausente."""
+        values = []
+        for name in names:
+            value = getattr(self, name)
+            if value is None:
+                raise DataConfigError(self._JSON_KEYS[name])
+            values.append(value)
+        return tuple(values)
+
+    def current(self) -> "AppConfig":
+        """
+            Retorna a configuração atual do arquivo: a própria instância, se o arquivo não tiver sido modificado."""
+        return load_config(self.path)
+
+
+
+_cache: Dict[str, AppConfig] = {}
+_cache_lock = Lock()
+
+
+def load_config(path: str) -> AppConfig:
+    """
+        Obtém a configuração do arquivo, reaproveitando a última leitura enquanto a data de modificação do arquivo não mudar."""
+    key = os.path.abspath(path)
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except OSError:
+        raise DataConfigError(path)
+    with _cache_lock:
+        config = _cache.get(key)
+        if config is None or config.mtime != mtime:
+            config = _cache[key] = AppConfig.from_file(path)
+    return config
+
+
+def as_config(config: Union[AppConfig, str]) -> AppConfig:
+    """
+        Permite que os componentes recebam tanto a configuração quanto o caminho do config.json."""
+    if isinstance(config, AppConfig):
+        return config
+    return load_config(config)
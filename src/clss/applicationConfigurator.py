@@ -1,13 +1,14 @@
 import os
 from importlib import import_module
-from src.funcs.textFunc import get_from_json
+from typing import Union
+from src.clss.appConfig import AppConfig, as_config
 from src.clss.error import DataConfigError
 
 
 
 class appConfigurator:
-    def __init__(self, config_file_path: str):
-        self.app_config = get_from_json(config_file_path, "application_file_name")
+    def __init__(self, config: Union[AppConfig, str]):
+        self.app_config, = as_config(config).require("application_file_name")
     
     def import_app(self, package_name_path: str) -> 'Python Module':
         """
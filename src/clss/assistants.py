@@ -1,59 +1,65 @@
 import re
-from typing import List, Tuple, Union, Dict
+import json
+from hashlib import sha1
+from typing import Any, Dict, Iterator, List
 
 from .abstractClasses import AbstractWebPageContentHandler
 
-#CRASHED HANDLER
-class AnkiEditPageHandler(AbstractWebPageContentHandler):    
+_EDITOR_DECKS = re.compile(r"editor\.decks\s*=\s*")
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _iter_deck_names(decks: Any) -> Iterator[str]:
+    if isinstance(decks, dict):
+        decks = list(decks.values())
+    if not isinstance(decks, list):
+        return
+    for deck in decks:
+        if isinstance(deck, dict) and isinstance(deck.get("name"), str):
+            yield deck["name"].strip()
+
+
+def extract_deck_names(page_source: str) -> List[str]:
+    """
+        Obtém os nomes dos baralhos da página de edição do AnkiWeb. O objeto atribuído a editor.decks é localizado por uma única busca, sem varrer os scripts da página, e lido diretamente pelo decodificador JSON a partir de seu início, de modo que o custo é linear no tamanho da página.
+
+        Args:
+            page_source (str) - código-fonte da página de edição.
+
+        Returns:
+            list - nomes dos baralhos, na ordem da página; vazia se o objeto não for encontrado ou não for um JSON válido."""
+    match = _EDITOR_DECKS.search(page_source)
+    if match is None:
+        return []
+    try:
+        decks, _ = _JSON_DECODER.raw_decode(page_source, match.end())
+    except ValueError:
+        return []
+    return list(_iter_deck_names(decks))
+
+
+
+class AnkiEditPageHandler(AbstractWebPageContentHandler):
+    """
+        Fornece ao SeleniumAnkiBotCRASHED os nomes dos baralhos da página de edição e a quantidade de teclas de apagar necessárias para limpar o campo do baralho. Os nomes são mantidos por página (pelo sha1 do código-fonte), e a mesma página não é lida novamente."""
     def __init__(self, regex_agent: re):
         super().__init__()
         self.regex_agent = regex_agent
-    
+        self._deck_names: Dict[str, List[str]] = {}
+
     def return_resources(self) -> Dict:
         deck_names = self._return_deck_names()
-        longest_name = len(deck_names[0])
-        for name in deck_names:
-            if len(name) > longest_name:
-                longest_name = len(name)
         resources = {
             "deck_names": deck_names,
-            "backspace_times": longest_name
+            "backspace_times": max(map(len, deck_names), default=0)
         }
         return resources
 
-    def _key_value_filter(self, filth_key_value: str,
-    split_target: str) -> str:
-        first_strip = filth_key_value.strip()
-        filth_split = first_strip.split(split_target)
-        name = filth_split[1].replace('"', '').strip()
-        return name    
-
-    def _return_filtered_content(self, pattern: str, content: str) -> List[Union[str, Tuple[str]]]:
-        pattern_re = self.regex_agent.compile(pattern, re.I|re.DOTALL|re.M)
-        matches = pattern_re.findall(content)
-        return matches
-
     def _return_deck_names(self) -> List[str]:
         if not self.page_source:
-            return
-        _EDITOR_DECK_SCOPE_PATTERN = r"editor\.decks =.*}};"
-        _NAME_PATTERN = r'("name": "(\w|\s|[.-=])*").+?'
-        _SCRIPT_PATTERN = r'(<script>.*</script>).+?'
-        
-        filth_script = self._return_filtered_content(
-            _SCRIPT_PATTERN, self.page_source
-        )[-1]                
-
-        filtered_editor = self._return_filtered_content(
-            _EDITOR_DECK_SCOPE_PATTERN, filth_script
-        )[0]
-                        
-        filth_names = self._return_filtered_content(
-            _NAME_PATTERN, filtered_editor
-        )
-        
-        names = []        
-        str_filth_names = [n[0] for n in filth_names]
-        for name in str_filth_names:
-            names.append(self._key_value_filter(name, ':'))
-        return names
+            return []
+        key = sha1(self.page_source.encode('utf-8', errors='replace')).hexdigest()
+        names = self._deck_names.get(key)
+        if names is None:
+            names = self._deck_names[key] = extract_deck_names(self.page_source)
+        return names.copy()
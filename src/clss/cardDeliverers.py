@@ -1,66 +1,210 @@
-from time import sleep
-from typing import List, TypeVar
+import os
+import re
+import json
+import http.client
+import sqlite3
+import hashlib
+import tempfile
+import zipfile
+from time import localtime, sleep, strftime, time
+from typing import Any, BinaryIO, List, Optional, Tuple, TypeVar, Union
+from urllib.parse import urlsplit
 
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
 from .abstractClasses import AbstractCardDeliverer, AbstractWebPageContentHandler
+from .appConfig import AppConfig, as_config
 from .cards import MyCard
-from src.funcs.textFunc import get_from_json
+from .error import AnkiConnectError
+from src.funcs.textFunc import get_json, set_json_file_atomically
 
 WebDriver = TypeVar('WebDriver')
+_UNSAFE_FILE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
 
 class SeleniumAnkiBot(AbstractCardDeliverer):
+    """
+        Entregador de cartões que utiliza o Selenium para inserí-los na página de edição do AnkiWeb. Ao invés de esperas fixas, aguarda explicitamente que cada página (ou o editor, após salvar um cartão) esteja pronta.
+
+        Args:
+            timeout (float): tempo máximo, em segundos, de cada espera.
+            poll_frequency (float): intervalo, em segundos, entre as verificações de cada espera.
+            session_file (str): arquivo em que os cookies da sessão autenticada são salvos após o login. Nas próximas entregas eles são restaurados e, se a sessão ainda for válida, o formulário de login é dispensado.
+            keep_alive (bool): mantém o navegador aberto após a entrega, para ser reaproveitado na próxima; deve ser encerrado com close()."""
+    _FILL_FIELDS_SCRIPT = """
+        var values = arguments[0];
+        for (var id in values) {
+            var field = document.getElementById(id);
+            if (field.isContentEditable) {
+                field.innerText = values[id];
+            } else {
+                field.value = values[id];
+            }
+            field.dispatchEvent(new Event('input', {bubbles: true}));
+        }
+    """
+    _FIELDS_CLEARED_SCRIPT = """
+        return Array.prototype.every.call(arguments[0], function (id) {
+            var field = document.getElementById(id);
+            var text = field.isContentEditable ? field.innerText : field.value;
+            return text.trim() === '';
+        });
+    """
+    _FIELDS = ("f0", "f1")
+    _NAV_LINKS = 'a[class="nav-link"]'
+    _EMAIL_INPUT = 'input[id="email"]'
+    _LOGOUT_LINK = 'a[href*="logout"]'
 
-    def __init__(self, web_driver_settings, user_data: str):
+    def __init__(self, web_driver_settings, user_data: Union[AppConfig, str],
+                    timeout: float=10, poll_frequency: float=0.05,
+                    session_file: Optional[str]=None, keep_alive: bool=False):
         super().__init__()
+        if isinstance(user_data, AppConfig):
+            user_data.require("login", "deck")
         self.user_data = user_data
         self.web_driver_settings = web_driver_settings
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.session_file = session_file
+        self.keep_alive = keep_alive
         self._URL = 'https://ankiweb.net/account/login'
+        self._DECKS_URL = 'https://ankiweb.net/decks/'
         self._bot = None
 
-    def deliver(self, card_list: list) -> list:
-        self._card_list.extend(card_list)
-        em, pw = get_from_json(self.user_data, 'login').values()
-        deck = get_from_json(self.user_data, 'deck')
+    def _wait(self, condition):
+        return WebDriverWait(
+            self._bot, self.timeout, self.poll_frequency
+        ).until(condition)
+
+    def _element(self, selector: str):
+        return self._wait(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+
+    def _browser_alive(self) -> bool:
+        if self._bot is None:
+            return False
+        try:
+            self._bot.current_url
+        except Exception:
+            self._bot = None
+            return False
+        return True
+
+    def _start_browser(self) -> None:
+        """
+            Inicia o navegador. Se o webdriver registrado em cache não conseguir iniciá-lo, como após uma atualização do navegador, o executável é resolvido novamente e uma nova tentativa é feita."""
         try:
             self._bot = self.web_driver_settings["driver"](
                     **self.web_driver_settings["web_driver_args"]
                 )
-            self._bot.implicitly_wait(30)
-            self._bot.get(self._URL)
-            self._bot.set_window_size(width=9999, height=9999)
+        except WebDriverException:
+            reinstall_driver = self.web_driver_settings.get("reinstall_driver")
+            if reinstall_driver is None or not reinstall_driver():
+                raise
+            self._bot = self.web_driver_settings["driver"](
+                    **self.web_driver_settings["web_driver_args"]
+                )
+        # somente esperas explícitas: uma espera implícita faria cada busca sem
+        # resultado, nas verificações das esperas, bloquear além do timeout
+        self._bot.implicitly_wait(0)
+        self._bot.set_window_size(width=9999, height=9999)
+
+    def _session_page(self, bot) -> Optional[str]:
+        elements = bot.find_elements(
+            By.CSS_SELECTOR, f'{self._EMAIL_INPUT}, {self._LOGOUT_LINK}')
+        if any(element.tag_name.lower() == 'input' for element in elements):
+            return 'login'
+        if elements and bot.current_url.startswith(self._DECKS_URL):
+            return 'decks'
+        return None
+
+    def _logged_in(self) -> bool:
+        """
+            Aguarda a página exibir o formulário de login ou a página de baralhos de uma conta autenticada, retornando verdadeiro no segundo caso. Os links de navegação não bastam, pois também estão presentes na página de login e podem ser exibidos antes do formulário; a conta só é considerada autenticada na URL da página de baralhos e com o link de saída (logout) presente."""
+        return self._wait(self._session_page) == 'decks'
+
+    def _restore_session(self, warm: bool) -> bool:
+        """
+            Reaproveita a sessão autenticada, seja a do navegador mantido aberto (warm), seja a dos cookies salvos em session_file. Retorna verdadeiro se a conta já estiver autenticada."""
+        if warm:
+            self._bot.get(self._DECKS_URL)
+            return self._logged_in()
+        if not (self.session_file and os.path.isfile(self.session_file)):
+            return False
+        try:
+            cookies = get_json(self.session_file)
+        except ValueError:
+            return False
+        self._bot.get(self._URL)
+        for cookie in cookies:
+            if 'expiry' in cookie:
+                cookie['expiry'] = int(cookie['expiry'])
+            try:
+                self._bot.add_cookie(cookie)
+            except Exception as err:
+                print(err)
+        self._bot.get(self._DECKS_URL)
+        return self._logged_in()
+
+    def _save_session(self) -> None:
+        if self.session_file:
+            set_json_file_atomically(self.session_file, self._bot.get_cookies())
+
+    def _login(self, em: str, pw: str) -> None:
+        self._bot.get(self._URL)
+        self._element(self._EMAIL_INPUT).send_keys(em)
+        self._element('input[type="password"]').send_keys(pw)
+        self._element('input[type="submit"]').click()
+        self._wait(lambda bot: self._session_page(bot) == 'decks')
+        self._save_session()
+
+    def deliver(self, card_list: list) -> list:
+        self._add_cards(card_list)
+        login, deck = as_config(self.user_data).current().require("login", "deck")
+        em, pw = login.email, login.password
+        warm = self._browser_alive()
+        try:
+            if not warm:
+                self._start_browser()
         except Exception as err:
-            if self._bot:
-                self._bot.close()
+            self.close()
             print("UNABLE TO CONNECT.\n", err)            
         else:
-            # LOGIN PAGE
-            print('LOGIN PAGE')
-            self._bot.find_element_by_css_selector(
-                'input[id="email"]').send_keys(em)
-            self._bot.find_element_by_css_selector(
-                'input[type="password"]').send_keys(pw)
-            self._bot.find_element_by_css_selector(
-                'input[type="submit"]').click()
-            sleep(1)
-            # DECKS PAGE
-            print('DECK PAGE')
-            self._bot.find_elements_by_css_selector(
-                'a[class="nav-link"]')[1].click()
-            sleep(1)
-            # EDIT PAGE
-            print('EDIT PAGE')
-            if deck["name"]:
-                self._insert_given_deck_name(deck["name"])
-            for card in card_list:
-                self._insert_card(card)
-        finally:
-            if self._bot:
-                self._bot.quit()
+            try:
+                # LOGIN PAGE
+                if self._restore_session(warm):
+                    print('SESSION RESTORED')
+                    self._save_session()
+                else:
+                    print('LOGIN PAGE')
+                    self._login(em, pw)
+                # DECKS PAGE
+                print('DECK PAGE')
+                self._wait(EC.presence_of_all_elements_located(
+                    (By.CSS_SELECTOR, self._NAV_LINKS)))[1].click()
+                # EDIT PAGE
+                print('EDIT PAGE')
+                self._wait(EC.presence_of_element_located((By.ID, self._FIELDS[0])))
+                if deck.name:
+                    self._insert_given_deck_name(deck.name)
+                for card in card_list:
+                    self._insert_card(card)
+            finally:
+                if not self.keep_alive:
+                    self.close()
+
+    def close(self) -> None:
+        """
+            Encerra o navegador, inclusive o mantido aberto entre entregas com keep_alive."""
+        if self._bot:
+            self._bot.quit()
+            self._bot = None
 
     def _insert_given_deck_name(self, deck_name) -> None:
-        deck_field = self._bot.find_element_by_css_selector('input[id="deck"]')
+        deck_field = self._element('input[id="deck"]')
         backspace_times = 100
         ac = ActionChains(self._bot)
         ac.move_to_element(deck_field).click()
@@ -70,13 +214,18 @@ class SeleniumAnkiBot(AbstractCardDeliverer):
         ac.perform()
         deck_field.send_keys(deck_name)            
 
+    def _fields_cleared(self, bot) -> bool:
+        return bot.execute_script(
+            self._FIELDS_CLEARED_SCRIPT, list(self._FIELDS))
+
     def _insert_card(self, card: MyCard) -> None:
         try:
-            self._bot.find_element_by_id("f0").send_keys(card.front)
-            self._bot.find_element_by_id("f1").send_keys(card.back)
-            self._bot.find_element_by_css_selector(
-                'button[class$="primary"]').click()
-            sleep(1)
+            self._bot.execute_script(
+                self._FILL_FIELDS_SCRIPT, 
+                dict(zip(self._FIELDS, (card.front, card.back)))
+            )
+            self._element('button[class$="primary"]').click()
+            self._wait(self._fields_cleared)
         except Exception as err:
             print(err)
         else:
@@ -84,10 +233,354 @@ class SeleniumAnkiBot(AbstractCardDeliverer):
             self._update_card(card)
     
     def _update_card(self, card: MyCard) -> None:
-        for i, c in enumerate(self.card_list):
-            if c.representation == card.representation:
-                break
-        self._card_list[i].inserted = True
+        self._mark_inserted(card)
+
+
+
+
+class AnkiPackageDeliverer(AbstractCardDeliverer):
+    """
+        Entregador de cartões que os escreve diretamente em um pacote do Anki (.apkg), isto é, uma coleção SQLite compactada em zip, que pode ser importado de uma só vez pelo Anki.
+
+        Args:
+            export_dir (str): diretório em que o pacote será criado. Cada entrega cria um novo arquivo.
+            deck_name (str): nome do baralho dos cartões. No nome do arquivo, o separador de subbaralhos (::) e os caracteres inválidos em nomes de arquivo são substituídos."""
+    _MODEL_ID = 1607392319
+    _MODEL_NAME = "AutoCards Basic"
+    _SCHEMA = """
+        CREATE TABLE col (
+            id integer primary key, crt integer not null, mod integer not null,
+            scm integer not null, ver integer not null, dty integer not null,
+            usn integer not null, ls integer not null, conf text not null,
+            models text not null, decks text not null, dconf text not null,
+            tags text not null
+        );
+        CREATE TABLE notes (
+            id integer primary key, guid text not null, mid integer not null,
+            mod integer not null, usn integer not null, tags text not null,
+            flds text not null, sfld integer not null, csum integer not null,
+            flags integer not null, data text not null
+        );
+        CREATE TABLE cards (
+            id integer primary key, nid integer not null, did integer not null,
+            ord integer not null, mod integer not null, usn integer not null,
+            type integer not null, queue integer not null, due integer not null,
+            ivl integer not null, factor integer not null, reps integer not null,
+            lapses integer not null, left integer not null, odue integer not null,
+            odid integer not null, flags integer not null, data text not null
+        );
+        CREATE TABLE revlog (
+            id integer primary key, cid integer not null, usn integer not null,
+            ease integer not null, ivl integer not null, lastIvl integer not null,
+            factor integer not null, time integer not null, type integer not null
+        );
+        CREATE TABLE graves (
+            usn integer not null, oid integer not null, type integer not null
+        );
+        CREATE INDEX ix_notes_usn ON notes (usn);
+        CREATE INDEX ix_cards_usn ON cards (usn);
+        CREATE INDEX ix_revlog_usn ON revlog (usn);
+        CREATE INDEX ix_cards_nid ON cards (nid);
+        CREATE INDEX ix_cards_sched ON cards (did, queue, due);
+        CREATE INDEX ix_revlog_cid ON revlog (cid);
+        CREATE INDEX ix_notes_csum ON notes (csum);
+    """
+
+    def __init__(self, export_dir: str, deck_name: str="Default"):
+        super().__init__()
+        self.export_dir = export_dir
+        self.deck_name = deck_name
+        self.package_path = None
+        self._collection = None
+        self._next_id = 0
+        self._position = 0
+
+    @property
+    def deck_id(self) -> int:
+        """
+            Id do baralho: o do baralho padrão (1) se o nome for "Default", pois o Anki não diferencia maiúsculas nos nomes; caso contrário, derivado do nome."""
+        if self.deck_name.strip().casefold() == "default":
+            return 1
+        digest = hashlib.sha1(self.deck_name.encode("utf-8")).hexdigest()
+        return int(digest[:12], 16)
+
+    def deliver(self, card_list: list) -> None:
+        self._add_cards(card_list)
+        now = int(time())
+        self._next_id = now * 1000
+        self._position = 0
+        os.makedirs(self.export_dir, exist_ok=True)
+        package_name = strftime("%Y%m%d-%H%M%S", localtime(now))
+        package_path, package_file = self._open_package(
+            f"{self._file_stem()}-{package_name}")
+        try:
+            with package_file:
+                inserted = self._write_package(package_file, card_list, now)
+        except BaseException:
+            os.remove(package_path)
+            raise
+        self.package_path = package_path
+        for card in inserted:
+            self.total_inserted += 1
+            self._update_card(card)
+
+    def _write_package(self, package_file: BinaryIO, card_list: list, now: int) -> List[MyCard]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            collection_path = os.path.join(tmp_dir, "collection.anki2")
+            self._collection = sqlite3.connect(collection_path)
+            try:
+                self._create_collection(now)
+                with self._collection:
+                    inserted = [card for card in card_list if self._insert_card(card)]
+            finally:
+                self._collection.close()
+                self._collection = None
+            with zipfile.ZipFile(package_file, "w", zipfile.ZIP_DEFLATED) as package:
+                package.write(collection_path, "collection.anki2")
+                package.writestr("media", "{}")
+        return inserted
+
+    def _file_stem(self) -> str:
+        stem = self.deck_name.replace("::", "-")
+        stem = _UNSAFE_FILE_CHARS.sub("_", stem).strip(". ")
+        return stem or "deck"
+
+    def _open_package(self, name: str) -> Tuple[str, BinaryIO]:
+        """
+            Cria, de forma exclusiva (O_EXCL), o arquivo do pacote. Se já houver um arquivo com o mesmo nome, como em duas entregas no mesmo segundo, um sufixo numérico é acrescentado."""
+        suffix = ""
+        attempt = 0
+        while True:
+            package_path = os.path.join(self.export_dir, f"{name}{suffix}.apkg")
+            try:
+                return package_path, open(package_path, "xb")
+            except FileExistsError:
+                attempt += 1
+                suffix = f"-{attempt}"
+
+    def _create_collection(self, now: int) -> None:
+        deck = {
+            "id": self.deck_id, "name": self.deck_name, "mod": now, "usn": -1,
+            "lrnToday": [0, 0], "revToday": [0, 0], "newToday": [0, 0],
+            "timeToday": [0, 0], "collapsed": False, "browserCollapsed": False,
+            "desc": "", "dyn": 0, "conf": 1, "extendNew": 10, "extendRev": 50,
+        }
+        # com o nome "Default", o baralho dos cartões substitui o padrão
+        decks = {"1": dict(deck, id=1, name="Default")}
+        decks[str(self.deck_id)] = deck
+        model = {
+            "id": self._MODEL_ID, "name": self._MODEL_NAME, "type": 0,
+            "mod": now, "usn": -1, "sortf": 0, "did": self.deck_id,
+            "tmpls": [{
+                "name": "Card 1", "ord": 0, "qfmt": "{{Front}}",
+                "afmt": "{{FrontSide}}<hr id=answer>{{Back}}",
+                "did": None, "bqfmt": "", "bafmt": "",
+            }],
+            "flds": [
+                {"name": name, "ord": i, "sticky": False, "rtl": False,
+                    "font": "Arial", "size": 20, "media": []}
+                for i, name in enumerate(("Front", "Back"))
+            ],
+            "css": ".card { font-family: arial; font-size: 20px; "
+                    "text-align: center; color: black; background-color: white; }",
+            "latexPre": "\\documentclass[12pt]{article}\n\\begin{document}\n",
+            "latexPost": "\\end{document}",
+            "tags": [], "vers": [], "req": [[0, "all", [0]]],
+        }
+        dconf = {
+            "id": 1, "name": "Default", "mod": 0, "usn": 0, "dyn": False,
+            "maxTaken": 60, "timer": 0, "autoplay": True, "replayq": True,
+            "new": {"delays": [1, 10], "ints": [1, 4, 7], "initialFactor": 2500,
+                    "separate": True, "order": 1, "perDay": 20, "bury": False},
+            "lapse": {"delays": [10], "mult": 0, "minInt": 1,
+                        "leechFails": 8, "leechAction": 0},
+            "rev": {"perDay": 200, "ease4": 1.3, "fuzz": 0.05, "minSpace": 1,
+                    "ivlFct": 1, "maxIvl": 36500, "bury": False, "hardFactor": 1.2},
+        }
+        conf = {
+            "activeDecks": [1], "curDeck": 1, "newSpread": 0, "collapseTime": 1200,
+            "timeLim": 0, "estTimes": True, "dueCounts": True, "curModel": None,
+            "nextPos": 1, "sortType": "noteFld", "sortBackwards": False,
+            "addToCur": True,
+        }
+        self._collection.executescript(self._SCHEMA)
+        self._collection.execute(
+            "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+            (
+                now, now * 1000, now * 1000, json.dumps(conf),
+                json.dumps({str(self._MODEL_ID): model}),
+                json.dumps(decks),
+                json.dumps({"1": dconf}),
+            )
+        )
+
+    def _insert_card(self, card: MyCard) -> bool:
+        try:
+            self._next_id += 1
+            self._position += 1
+            note_id = card_id = self._next_id
+            now = note_id // 1000
+            checksum = int(hashlib.sha1(card.front.encode("utf-8")).hexdigest()[:8], 16)
+            self._collection.execute(
+                "INSERT INTO notes VALUES (?, ?, ?, ?, -1, '', ?, ?, ?, 0, '')",
+                (note_id, card.key, self._MODEL_ID, now,
+                    f"{card.front}\x1f{card.back}", card.front, checksum)
+            )
+            self._collection.execute(
+                "INSERT INTO cards VALUES "
+                "(?, ?, ?, 0, ?, -1, 0, 0, ?, 0, 0, 0, 0, 0, 0, 0, 0, '')",
+                (card_id, note_id, self.deck_id, now, self._position)
+            )
+        except sqlite3.Error as err:
+            print(err)
+            return False
+        return True
+
+    def _update_card(self, card: MyCard) -> None:
+        self._mark_inserted(card)
+
+
+
+
+class AnkiConnectDeliverer(AbstractCardDeliverer):
+    """
+        Entregador de cartões que os envia a um endpoint HTTP compatível com o AnkiConnect, em lotes de addNotes, através de uma única conexão persistente.
+
+        Args:
+            deck_name (str): nome do baralho dos cartões. É criado caso não exista.
+            url (str): endereço do AnkiConnect.
+            batch_size (int): quantidade de cartões por requisição addNotes.
+            model_name (str): tipo de nota do Anki, com os campos Front e Back."""
+    _VERSION = 6
+
+    def __init__(self, deck_name: str="Default", 
+                    url: str="http://127.0.0.1:8765",
+                    batch_size: int=100, model_name: str="Basic",
+                    timeout: float=30):
+        super().__init__()
+        self.deck_name = deck_name
+        self.url = urlsplit(url)
+        self.batch_size = batch_size
+        self.model_name = model_name
+        self.timeout = timeout
+        self._connection = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            connection_class = (http.client.HTTPSConnection 
+                if self.url.scheme == "https" else http.client.HTTPConnection)
+            self._connection = connection_class(
+                self.url.hostname, self.url.port, timeout=self.timeout)
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _post(self, body: bytes) -> dict:
+        connection = self._connect()
+        connection.request("POST", self.url.path or "/", body=body,
+                            headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return json.loads(response.read())
+
+    def _request(self, action: str, **params) -> Any:
+        body = json.dumps(
+            {"action": action, "version": self._VERSION, "params": params}
+        ).encode("utf-8")
+        try:
+            reply = self._post(body)
+        except (http.client.RemoteDisconnected, ConnectionResetError,
+                BrokenPipeError, http.client.CannotSendRequest):
+            self.close()
+            reply = self._post(body)
+        if reply.get("error") and reply.get("result") is None:
+            raise AnkiConnectError(reply["error"])
+        return reply["result"]
+
+    def _note(self, card: MyCard) -> dict:
+        return {
+            "deckName": self.deck_name,
+            "modelName": self.model_name,
+            "fields": {"Front": card.front, "Back": card.back},
+            "options": {"allowDuplicate": False},
+            "tags": ["autocards"],
+        }
+
+    def deliver(self, card_list: list) -> None:
+        self._add_cards(card_list)
+        try:
+            self._request("createDeck", deck=self.deck_name)
+            for start in range(0, len(card_list), self.batch_size):
+                self._insert_cards(card_list[start:start + self.batch_size])
+        except Exception as err:
+            print("UNABLE TO DELIVER.\n", err)
+        finally:
+            self.close()
+
+    def _note_states(self, notes: List[dict]) -> List[str]:
+        """
+            Classifica, pelo canAddNotesWithErrorDetail, cada nota como "addable", "present" (a frente já está na coleção) ou "invalid". Nas versões do AnkiConnect sem essa ação, o canAddNotes é utilizado e toda nota recusada é tida como presente."""
+        try:
+            details = self._request("canAddNotesWithErrorDetail", notes=notes)
+        except AnkiConnectError:
+            return ["addable" if ok else "present" 
+                    for ok in self._request("canAddNotes", notes=notes)]
+        states = []
+        for detail in details:
+            if detail.get("canAdd"):
+                states.append("addable")
+            elif "duplicate" in str(detail.get("error", "")):
+                states.append("present")
+            else:
+                states.append("invalid")
+        return states
+
+    def _insert_cards(self, cards: List[MyCard]) -> None:
+        """
+            Insere o lote de cartões. O AnkiConnect rejeita o lote inteiro de addNotes quando alguma das notas falha, como as duplicadas; por isso, apenas uma nota por frente, dentre as que podem ser adicionadas, é enviada. Os cartões cuja frente já está na coleção, ou que repetem a frente de uma nota adicionada, são considerados entregues e deixam a lista de pendentes."""
+        try:
+            states = self._note_states([self._note(card) for card in cards])
+            delivered, to_add, repeated = [], [], []
+            fronts = set()
+            for card, state in zip(cards, states):
+                if state == "present":
+                    delivered.append(card)
+                elif state == "addable" and card.front in fronts:
+                    repeated.append(card)
+                elif state == "addable":
+                    fronts.add(card.front)
+                    to_add.append(card)
+            added = []
+            if len(to_add) > 0:
+                notes = [self._note(card) for card in to_add]
+                try:
+                    added = [note_id is not None 
+                                for note_id in self._request("addNotes", notes=notes)]
+                except AnkiConnectError as err:
+                    # As notas válidas do lote rejeitado já foram adicionadas: são as 
+                    # que deixaram de poder ser adicionadas, pois sua frente está na coleção.
+                    print(err)
+                    added = [state == "present" for state in self._note_states(notes)]
+        except AnkiConnectError as err:
+            print(err)
+            return
+        added_fronts = set()
+        for card, was_added in zip(to_add, added):
+            if was_added:
+                self.total_inserted += 1
+                added_fronts.add(card.front)
+                self._update_card(card)
+        delivered.extend(card for card in repeated if card.front in added_fronts)
+        for card in delivered:
+            self._update_card(card)
+
+    def _insert_card(self, card: MyCard) -> None:
+        self._insert_cards([card])
+
+    def _update_card(self, card: MyCard) -> None:
+        self._mark_inserted(card)
 
 
 
@@ -103,11 +596,13 @@ class SeleniumAnkiBotCRASHED(AbstractCardDeliverer):
     """
     def __init__(
             self, web_driver_settings,
-            user_data: str,
+            user_data: Union[AppConfig, str],
             web_edit_page_handler=None,
             
     ):
         super().__init__()
+        if isinstance(user_data, AppConfig):
+            user_data.require("login", "deck")
         #self.driver = web_driver
         self.user_data = user_data
         self.web_driver_settings = web_driver_settings
@@ -117,9 +612,9 @@ class SeleniumAnkiBotCRASHED(AbstractCardDeliverer):
         self._bot = None
 
     def deliver(self, card_list: list) -> list:
-        self._card_list.extend(card_list)
-        em, pw = get_from_json(self.user_data, 'login').values()
-        deck = get_from_json(self.user_data, 'deck')
+        self._add_cards(card_list)
+        login, deck = as_config(self.user_data).current().require("login", "deck")
+        em, pw = login.email, login.password
         try:
             """
             self._bot = self.driver(
@@ -153,15 +648,15 @@ class SeleniumAnkiBotCRASHED(AbstractCardDeliverer):
             sleep(1)
             # EDIT PAGE
             print('EDIT PAGE')
-            if deck["name"]:
+            if deck.name:
                 if not self.page_handler:
                     print('Was not given the web page content handler.')
                     return
                 self.page_handler.page_source = self._bot.page_source
                 r = self.page_handler.return_resources()
-                if deck["name"] in r["deck_names"] or deck["new_deck"]:
+                if deck.name in r["deck_names"] or deck.new_deck:
                     self._insert_given_deck_name(
-                        r["backspace_times"], deck["name"])
+                        r["backspace_times"], deck.name)
                 else:
                     print('The given deck name does not exist.')
                     return
@@ -197,7 +692,4 @@ class SeleniumAnkiBotCRASHED(AbstractCardDeliverer):
             self._update_card(card)
     
     def _update_card(self, card: MyCard) -> None:
-        for i, c in enumerate(self.card_list):
-            if c.representation == card.representation:
-                break
-        self._card_list[i].inserted = True
+        self._mark_inserted(card)
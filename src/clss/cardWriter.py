@@ -1,13 +1,27 @@
-from typing import List, Dict, Union
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Union
 from .cards import MyCard
+from .phraseIndex import PhraseIndex
 
 
 class DictBasedCardWriter:
     """
-        Classe auxiliar que recebe conteúdos(frase, path) de um SourceAdmin e os organiza em uma estrutura de dicionários, e escreve-os em objetos MyCard e retorna uma lista com esses objetos."""
-    def __init__(self):        
+        Classe auxiliar que recebe conteúdos(frase, path) de um SourceAdmin e os organiza em uma estrutura de dicionários, e escreve-os em objetos MyCard e retorna uma lista com esses objetos.
+
+        Args:
+            phrase_index (PhraseIndex): se fornecido, as frases já indexadas, nesta ou em execuções anteriores, são marcadas como repetidas e não originam cartões. Elas permanecem nos conteúdos, para que a fonte seja atualizada normalmente. As frases novas só são gravadas no índice por commit_index, chamado pelos SourceAdmins após o armazenamento dos cartões.
+            keep_cards (bool): se falso, modo de memória limitada: nem os cartões escritos nem os conteúdos que os originaram são retidos pelo escritor, de modo que fontes muito grandes podem ser consumidas em lotes (iter_card_batches), com memória proporcional ao lote. Nesse modo, iter_contents percorre apenas os conteúdos ainda não escritos; é utilizado pelos SourceAdmins que não dependem dos conteúdos para atualizar a fonte (TextSourceAdmin e SubtitleSourceAdmin).
+
+        Cada conteúdo é escrito em um objeto MyCard uma única vez; um cursor marca até onde os conteúdos já foram escritos."""
+    _TRIM_EVERY = 256
+
+    def __init__(self, phrase_index: Optional[PhraseIndex]=None, 
+                    keep_cards: bool=True):        
+        self.phrase_index = phrase_index
+        self.keep_cards = keep_cards
         self._contents: List[Dict[str:str, str:str]] = []
         self._card_list: List[Union[MyCard, None]] = []
+        self._written = 0
 
     @property
     def contents(self):        
@@ -18,15 +32,57 @@ class DictBasedCardWriter:
         return self._card_list.copy()
 
     def update_contents(self, phrase: str, source: str) -> None:
-        self._contents.append(
-            {'phrase': phrase, 
-            'source': source}
-        )
+        content = {'phrase': phrase, 'source': source}
+        if self.phrase_index is not None and self.phrase_index.check_and_add(phrase):
+            content['duplicate'] = True
+        self._contents.append(content)
+
+    def commit_index(self) -> None:
+        """
+            Grava no índice de frases, de uma só vez, as frases dos conteúdos escritos. Deve ser chamado somente depois que os cartões forem estocados no banco de dados."""
+        if self.phrase_index is not None:
+            self.phrase_index.commit()
+
+    def iter_contents(self) -> Iterator[Dict[str, str]]:
+        """
+            Percorre os conteúdos sem copiá-los."""
+        yield from self._contents
+
+    def _trim_contents(self) -> None:
+        del self._contents[:self._written]
+        self._written = 0
+
+    def iter_cards(self) -> Iterator[MyCard]:
+        """
+            Gerador que escreve e entrega somente os conteúdos ainda não escritos, avançando o cursor a cada um. No modo de memória limitada, os conteúdos escritos são descartados."""
+        while self._written < len(self._contents):
+            c = self._contents[self._written]
+            self._written += 1
+            if not self.keep_cards and self._written >= self._TRIM_EVERY:
+                self._trim_contents()
+            if c.get('duplicate'):
+                continue
+            card = MyCard(c['phrase'], c['source'])
+            if self.keep_cards:
+                self._card_list.append(card)
+            yield card
+        if not self.keep_cards:
+            self._trim_contents()
+
+    def iter_card_batches(self, batch_size: int) -> Iterator[List[MyCard]]:
+        """
+            Entrega os novos cartões em listas de no máximo batch_size cartões."""
+        cards = self.iter_cards()
+        while True:
+            batch = list(islice(cards, batch_size))
+            if len(batch) == 0:
+                return
+            yield batch
 
     def return_written_cards(self) -> list:
-        if len(self.contents) > 0:
-            for c in self.contents:
-                self._card_list.append(
-                    MyCard(c['phrase'], c['source'])
-                )
-        return self.card_list
\ No newline at end of file
+        """
+            Escreve os conteúdos ainda não escritos e retorna todos os cartões escritos. No modo de memória limitada, retorna apenas os novos cartões."""
+        new_cards = list(self.iter_cards())
+        if not self.keep_cards:
+            return new_cards
+        return self.card_list
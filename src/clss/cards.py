@@ -1,6 +1,10 @@
+import hashlib
+
+
 class FlashCard:
     """
         Classe que representa um objeto Flash Card, que são cartões utilizados em revisões espaçadas e que possuem o conteúdo estudado na parte da frente e sua "resposta" na parte de trás."""
+    __slots__ = ("front", "back")
 
     def __init__(self, front: str, back: str) -> None:
         self.front = front
@@ -9,14 +13,51 @@ class FlashCard:
 
 class MyCard(FlashCard):
     """
-        Classe que herda de flash cards, e os implementam contexto da solução."""
+        Classe que herda de flash cards, e os implementam contexto da solução. A frente, o verso e a fonte compõem a identidade do cartão e não podem ser alterados após a criação; dois cartões com a mesma identidade são iguais, independentemente do status de inserido."""
+    __slots__ = ("source", "inserted", "_key")
 
     _DEFAULT_BACK = "*CONFIRA NO DICIONÁRIO CONFIGURADO OU NA FERRAMENTA DE TRADUÇÃO*"
+    _IDENTITY = ("front", "back", "source")
 
-    def __init__(self, front: str, source: str, back: str=_DEFAULT_BACK) -> None:        
+    def __init__(self, front: str, source: str, back: str=_DEFAULT_BACK) -> None:
         super().__init__(front, back)
         self.source = source
         self.inserted = False
+        self._key = None
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in self._IDENTITY and hasattr(self, name):
+            raise AttributeError(f"MyCard.{name} is part of the card identity.")
+        super().__setattr__(name, value)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MyCard):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __getstate__(self) -> dict:
+        return {
+            "front": self.front,
+            "back": self.back,
+            "source": self.source,
+            "inserted": self.inserted,
+        }
+
+    def __setstate__(self, state) -> None:
+        """
+            Restaura o cartão tanto do formato atual quanto do formato dos cartões estocados antes da adoção de __slots__, cujo estado é o __dict__ do objeto."""
+        if isinstance(state, tuple):
+            merged = {}
+            for part in state:
+                merged.update(part or {})
+            state = merged
+        for name in self._IDENTITY:
+            object.__setattr__(self, name, state[name])
+        object.__setattr__(self, "inserted", state.get("inserted", False))
+        object.__setattr__(self, "_key", None)
 
     @property
     def representation(self) -> str:
@@ -28,3 +69,12 @@ class MyCard(FlashCard):
                 "inserted": self.inserted,
             }
         )
+
+    @property
+    def key(self) -> str:
+        """
+            Identidade estável do cartão, derivada da frente, verso e fonte, calculada uma única vez. Não considera o status de inserido."""
+        if self._key is None:
+            identity = "\x1f".join((str(self.front), str(self.back), str(self.source)))
+            self._key = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+        return self._key
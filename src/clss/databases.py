@@ -0,0 +1,169 @@
+import os
+import dbm
+import pickle
+import shelve
+import sqlite3
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class KeyShelf(shelve.DbfilenameShelf):
+    """
+        Shelf que adiciona consultas por prefixo de key/coluna. Os registros consultados devem ser tuplas (sequência, objeto), sendo ordenados pela sequência de inserção."""
+    def records_by_prefix(self, prefix: str, offset: int=0,
+                            limit: Optional[int]=None) -> List[Tuple[int, Any]]:
+        records = [self[key] for key in self.keys() if key.startswith(prefix)]
+        records.sort(key=lambda record: record[0])
+        stop = None if limit is None else offset + limit
+        return records[offset:stop]
+
+    def count_by_prefix(self, prefix: str) -> int:
+        return sum(1 for key in self.keys() if key.startswith(prefix))
+
+
+class ShelveDatabase:
+    """
+        Motor de persistência padrão, baseado no módulo shelve. Abre e fecha o arquivo a cada utilização."""
+    def open(self, filename: str) -> KeyShelf:
+        return KeyShelf(filename)
+
+    def close(self) -> None:
+        ...
+
+
+class SQLiteShelf(MutableMapping):
+    """
+        Mapeamento persistente com a mesma interface de um shelve, mas estocado em uma tabela SQLite indexada pela key/coluna. A conexão permanece aberta e cada bloco "with" corresponde a uma transação."""
+    _PREFIX_END = "\U0010ffff"
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self._conn = sqlite3.connect(filename)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shelf ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def __enter__(self) -> "SQLiteShelf":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+
+    def __getitem__(self, key: str) -> Any:
+        row = self._conn.execute(
+            "SELECT value FROM shelf WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return pickle.loads(row[0])
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._conn.execute(
+            "INSERT INTO shelf (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        )
+
+    def __delitem__(self, key: str) -> None:
+        cursor = self._conn.execute("DELETE FROM shelf WHERE key = ?", (key,))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM shelf WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self._conn.execute("SELECT key FROM shelf ORDER BY rowid"):
+            yield row[0]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM shelf").fetchone()[0]
+
+    def records_by_prefix(self, prefix: str, offset: int=0,
+                            limit: Optional[int]=None) -> List[Tuple[int, Any]]:
+        cursor = self._conn.execute(
+            "SELECT value FROM shelf WHERE key >= ? AND key < ? "
+            "ORDER BY rowid LIMIT ? OFFSET ?",
+            (prefix, prefix + self._PREFIX_END,
+                -1 if limit is None else limit, offset)
+        )
+        return [pickle.loads(row[0]) for row in cursor]
+
+    def count_by_prefix(self, prefix: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM shelf WHERE key >= ? AND key < ?",
+            (prefix, prefix + self._PREFIX_END)
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _import_order(item: Tuple[str, Any]) -> Tuple[int, int]:
+    _, value = item
+    if (isinstance(value, tuple) and len(value) == 2 and 
+            isinstance(value[0], int)):
+        return 0, value[0]
+    return 1, 0
+
+
+class SQLiteDatabase:
+    """
+        Motor de persistência baseado em SQLite (modo WAL). Mantém uma única conexão aberta por arquivo durante toda a execução.
+
+        Na criação do arquivo SQLite, se existir um shelve com o mesmo nome, seus registros são importados em uma única transação e os arquivos do shelve são renomeados com o sufixo ".migrated", de modo que a importação ocorre uma única vez e o shelve permanece como cópia de segurança."""
+    _SUFFIX = ".sqlite3"
+    _MIGRATED_SUFFIX = ".migrated"
+    _SHELVE_SUFFIXES = ("", ".db", ".dat", ".dir", ".bak")
+
+    def __init__(self) -> None:
+        self._shelves: Dict[str, SQLiteShelf] = {}
+
+    def open(self, filename: str) -> SQLiteShelf:
+        if not filename in self._shelves:
+            path = f"{filename}{self._SUFFIX}"
+            created = not os.path.exists(path)
+            shelf = SQLiteShelf(path)
+            if created:
+                self._import_shelve(filename, shelf)
+            self._shelves[filename] = shelf
+        return self._shelves[filename]
+
+    def _import_shelve(self, filename: str, shelf: SQLiteShelf) -> None:
+        if not dbm.whichdb(filename):
+            return
+        with shelve.open(filename, flag="r") as legacy, shelf:
+            # as keys do dbm vêm na ordem do hash: os registros são inseridos 
+            # pela sequência estocada, que passa a ser a ordem das linhas (rowid)
+            items = sorted(
+                ((key, legacy[key]) for key in legacy.keys()), key=_import_order)
+            for key, value in items:
+                shelf[key] = value
+        for suffix in self._SHELVE_SUFFIXES:
+            legacy_file = f"{filename}{suffix}"
+            if os.path.isfile(legacy_file):
+                os.replace(legacy_file, f"{legacy_file}{self._MIGRATED_SUFFIX}")
+
+    def close(self) -> None:
+        for shelf in self._shelves.values():
+            shelf.close()
+        self._shelves.clear()
+
+
+DATABASES = {"shelve": ShelveDatabase, "sqlite": SQLiteDatabase}
+
+
+def create_database(name: str):
+    """
+        Cria o motor de persistência configurado no campo "database" do config.json: "sqlite" (padrão) ou "shelve"."""
+    return DATABASES[name]()
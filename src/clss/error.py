@@ -5,4 +5,15 @@ class DataConfigError(Exception):
             text = f"Configuration data '{data}' incorrect."
         MESSAGE = f"{text} Please check the config.json file in the application's root directory."
         super().__init__(MESSAGE)
-       
\ No newline at end of file
+       
+
+
+class AnkiConnectError(Exception):
+    def __init__(self, error):
+        super().__init__(f"AnkiConnect request failed: {error}")
+
+
+
+class DriveServiceError(Exception):
+    def __init__(self, error):
+        super().__init__(f"Unable to create the Google Drive service: {error}")
@@ -0,0 +1,170 @@
+import hashlib
+import sqlite3
+from threading import Lock
+from time import time
+from typing import Dict, List, Optional
+
+from .interfaces import TextExtractorInterface
+
+
+class OCRResultCache:
+    """
+        Cache persistente, em SQLite, dos textos extraídos de imagens, endereçado pelo SHA-256 do conteúdo da imagem.
+
+        As consultas não escrevem no banco: os horários de acesso ficam em memória e são gravados em lote, a cada flush_every textos acessados, antes de um descarte ou no close. O descarte por excesso só é executado quando o limite de entradas é ultrapassado pela folga configurada, de modo que o custo da varredura é dividido entre várias inserções.
+
+        Args:
+            path (str): arquivo do banco de dados.
+            max_entries (int): quantidade máxima de textos estocados. Ao ser excedida, os menos acessados recentemente são descartados.
+            max_age (float): idade máxima, em segundos, de um texto estocado.
+            flush_every (int): quantidade de textos acessados mantidos em memória antes da gravação.
+            evict_margin (float): folga, em fração de max_entries, tolerada antes do descarte."""
+    _DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+    def __init__(self, path: str, max_entries: int=10000,
+                    max_age: float=_DEFAULT_MAX_AGE, flush_every: int=64,
+                    evict_margin: float=0.1) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.flush_every = flush_every
+        self.evict_margin = evict_margin
+        self.hits = 0
+        self.misses = 0
+        self._accessed: Dict[str, float] = {}
+        self._entries = 0
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            "digest TEXT PRIMARY KEY, text TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ocr_cache_accessed "
+            "ON ocr_cache (accessed)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ocr_cache_created "
+            "ON ocr_cache (created)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def digest(img: bytes) -> str:
+        return hashlib.sha256(img).hexdigest()
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+
+    def get(self, digest: str) -> Optional[str]:
+        now = time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM ocr_cache WHERE digest = ? AND created >= ?",
+                (digest, now - self.max_age)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._accessed[digest] = now
+            if len(self._accessed) >= self.flush_every:
+                self._flush_accessed()
+                self._conn.commit()
+        return row[0]
+
+    def set(self, digest: str, text: str) -> None:
+        now = time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache "
+                "(digest, text, created, accessed) VALUES (?, ?, ?, ?)",
+                (digest, text, now, now)
+            )
+            self._accessed.pop(digest, None)
+            self._entries += 1
+            if self._entries > self.max_entries + int(self.max_entries * self.evict_margin):
+                self._evict()
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """
+            Grava os horários de acesso mantidos em memória."""
+        with self._lock:
+            self._flush_accessed()
+            self._conn.commit()
+
+    def evict(self) -> None:
+        """
+            Descarta os textos expirados e os excedentes ao limite de entradas."""
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+
+    def _flush_accessed(self) -> None:
+        if len(self._accessed) == 0:
+            return
+        self._conn.executemany(
+            "UPDATE ocr_cache SET accessed = ? WHERE digest = ?",
+            ((accessed, digest) for digest, accessed in self._accessed.items())
+        )
+        self._accessed = {}
+
+    def _evict(self) -> None:
+        self._flush_accessed()
+        self._conn.execute(
+            "DELETE FROM ocr_cache WHERE created < ?", (time() - self.max_age,)
+        )
+        self._conn.execute(
+            "DELETE FROM ocr_cache WHERE digest IN ("
+            "SELECT digest FROM ocr_cache ORDER BY accessed DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self._entries = self._conn.execute(
+            "SELECT COUNT(*) FROM ocr_cache").fetchone()[0]
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+
+class CachedTextExtractor(TextExtractorInterface):
+    """
+        Envolve qualquer extrator de textos, consultando o OCRResultCache antes de delegar a extração. Imagens repetidas custam apenas o cálculo do hash."""
+    def __init__(self, extractor: TextExtractorInterface,
+                    cache: OCRResultCache) -> None:
+        self.extractor = extractor
+        self.cache = cache
+
+    def img_to_str(self, img: bytes) -> str:
+        digest = self.cache.digest(img)
+        text = self.cache.get(digest)
+        if text is None:
+            text = self.extractor.img_to_str(img)
+            if text is not None:
+                self.cache.set(digest, text)
+        return text
+
+    def imgs_to_str(self, imgs: List[bytes]) -> List[str]:
+        digests = [self.cache.digest(img) for img in imgs]
+        texts = [self.cache.get(digest) for digest in digests]
+        missing = [i for i, text in enumerate(texts) if text is None]
+        if len(missing) == 0:
+            return texts
+        extracted = self.extractor.imgs_to_str([imgs[i] for i in missing])
+        for i, text in zip(missing, extracted):
+            texts[i] = text
+            if text is not None:
+                self.cache.set(digests[i], text)
+        return texts
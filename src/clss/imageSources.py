@@ -1,15 +1,18 @@
 import os
 import io
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple, Union
 
 from .interfaces import ImageSourceInterface
 from .sourceAdmins import DriveFileIdShelveAdmin
+from .appConfig import AppConfig, as_config
 from .error import DataConfigError
 from .myImageData import MyImageData
 from src.funcs.imgFuncs import get_imgs_path, remove_imgs_list
-from src.funcs.textFunc import get_from_json
+from src.funcs.poolFuncs import bounded_ordered_map
 from src.funcs.google_drive_interface import (
-    create_drive_folder, delete_file_by_id, get_data_files_from_folder, get_id_by_folder_name, get_images_byte
+    create_drive_folder, delete_file_by_id, get_data_files_from_folder, get_id_by_folder_name, get_images_byte,
+    download_file_bytes, DEFAULT_CHUNK_SIZE
     )
 
 
@@ -35,16 +38,17 @@ class OcamlfuseSource(ImageSourceInterface):
                 os.system(f'google-drive-ocamlfuse {self._LOCAL_PATH}')
         return os.path.join(self._LOCAL_PATH, self.folder_target)
     
-    def get_images(self) -> List[str]:
-        imgs_data = []
-        paths = get_imgs_path(self._total_path)
-        for path in paths:
-            with io.open(path, 'rb') as image_file:
-                _bytes = image_file.read()
-            imgs_data.append(
-                {'bytes': _bytes, 'source': path}
-            )
-        return imgs_data
+    def accumulate_image_data(self, source: str) -> MyImageData:
+        with io.open(source, 'rb') as image_file:
+            _bytes = image_file.read()
+        return MyImageData(_bytes, source=source)
+
+    def iter_images(self) -> Iterator[MyImageData]:
+        for path in get_imgs_path(self._total_path):
+            yield self.accumulate_image_data(path)
+
+    def get_images(self) -> List[MyImageData]:
+        return list(self.iter_images())
 
     def remove_images(self, imgs_path: List[str]) -> None: 
         remove_imgs_list(imgs_path)
@@ -58,10 +62,20 @@ class OcamlfuseSource(ImageSourceInterface):
 
 
 class GoogleDriveSource(ImageSourceInterface):
+    """
+        Fonte de imagens armazenadas em um diretório do Google Drive.
+
+        Args:
+            max_workers (int): quantidade máxima de downloads simultâneos, cada thread com o seu próprio serviço do Drive. Com o valor 1 (padrão), os downloads são sequenciais.
+            chunk_size (int): tamanho, em bytes, de cada parte do download."""
     def __init__(self, drive_folder_name, 
-    id_admin: DriveFileIdShelveAdmin):
+    id_admin: DriveFileIdShelveAdmin,
+    max_workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE):
         self.folder = drive_folder_name
         self.id_admin = id_admin
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
         self._failed_rm_id = None
     
     @property
@@ -70,21 +84,45 @@ class GoogleDriveSource(ImageSourceInterface):
             self._failed_rm_id = self.id_admin.return_sources()
         return self._failed_rm_id
 
-    def get_images(self):
-        imgs_data = []
+    def _download(self, data_id: str) -> Union[bytes, None]:
+        return download_file_bytes(data_id, chunk_size=self.chunk_size)
+
+    def _return_imgs_id(self) -> List[str]:
         _id = get_id_by_folder_name(self.folder)
         if not _id:
             raise Exception(f'{self.folder} folders not exists.')
-        imgs_id = get_data_files_from_folder(_id)
-        for data_id in imgs_id:
-            if data_id in self.failed_rm_id:
-                continue
-            _bytes = get_images_byte(data_id)
+        return [
+            data_id for data_id in get_data_files_from_folder(_id)
+            if not data_id in self.failed_rm_id
+        ]
+
+    def _download_all(self, imgs_id: List[str]) -> Iterator[Tuple[str, Union[bytes, None]]]:
+        if self.max_workers <= 1:
+            for data_id in imgs_id:
+                yield data_id, self._download(data_id)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            imgs_bytes = bounded_ordered_map(
+                executor, self._download, imgs_id, self.max_workers)
+            yield from zip(imgs_id, imgs_bytes)
+
+    def iter_images(self) -> Iterator[MyImageData]:
+        for data_id, _bytes in self._download_all(self._return_imgs_id()):
             if _bytes:
-                imgs_data.append(
-                    MyImageData(_bytes, source=data_id)
-                )
+                yield MyImageData(_bytes, source=data_id)
+
+    def get_images(self):
+        imgs_data = []
+        for data_id, _bytes in self._download_all(self._return_imgs_id()):
+            self.accumulate_image_data(imgs_data, data_id, _bytes)
         return imgs_data
+
+    def accumulate_image_data(self, imgs_data: List[MyImageData],
+                                data_id: str, _bytes: Union[bytes, None]) -> None:
+        if _bytes:
+            imgs_data.append(
+                MyImageData(_bytes, source=data_id)
+            )
     
     def remove_images(self, data_list: list) -> None:
         data_list.extend(self.failed_rm_id)
@@ -98,8 +136,8 @@ class GoogleDriveSource(ImageSourceInterface):
 
 
 class LocalFolderSource(ImageSourceInterface):
-    def __init__(self, config_file_path):
-        self.folder_source = get_from_json(config_file_path, "imgPath")
+    def __init__(self, config: Union[AppConfig, str]):
+        self.folder_source, = as_config(config).require("img_path")
         self._my_images = []
     
     @property
@@ -112,14 +150,27 @@ class LocalFolderSource(ImageSourceInterface):
         my_image_data = MyImageData(_bytes, source=source)
         self._my_images.append(my_image_data)
 
-    def get_images(self) -> list:
+    def _return_imgs_path(self) -> List[str]:
         if not os.path.isdir(self.folder_source):
             raise DataConfigError(self.folder_source)
-        for file in os.listdir(self.folder_source):
-            if file.endswith(".png") or file.endswith(".jpg"):
-                path = os.path.abspath(os.path.join(self.folder_source,file))
-                self.accumulate_image_data(source=path)
+        return [
+            os.path.abspath(os.path.join(self.folder_source, file))
+            for file in os.listdir(self.folder_source)
+            if file.endswith(".png") or file.endswith(".jpg")
+        ]
+
+    def get_images(self) -> list:
+        for path in self._return_imgs_path():
+            self.accumulate_image_data(source=path)
         return self.my_images
+
+    def iter_images(self) -> Iterator[MyImageData]:
+        """
+            Lê cada imagem somente quando solicitada, sem acumulá-las."""
+        for path in self._return_imgs_path():
+            with io.open(path, 'rb') as image_file:
+                _bytes = image_file.read()
+            yield MyImageData(_bytes, source=path)
     
     def remove_images(self, imgs_list: list) -> None:
         for img in imgs_list:
@@ -0,0 +1,178 @@
+from typing import Dict, List, Optional, Tuple
+
+from .interfaces import ImageStageInterface
+from .myImageData import MyImageData
+
+from src.funcs.imgFuncs import (SUBTITLE_BAND, mask_distance, 
+                                frame_signature, shrink_image)
+
+
+def replace_bytes(data: MyImageData, _bytes: bytes) -> MyImageData:
+    """
+        Cria um novo MyImageData com o conteúdo fornecido, preservando os demais atributos, como a fonte, utilizada na remoção das imagens consumidas."""
+    attrs = {k: v for k, v in vars(data).items() if k != 'bytes'}
+    return MyImageData(_bytes, **attrs)
+
+
+
+class SubtitleBandPreprocessor(ImageStageInterface):
+    """
+        Etapa que recorta a faixa da legenda, reduz e recodifica cada imagem antes da extração, diminuindo os bytes enviados ao extrator. Imagens que não puderem ser processadas seguem sem alterações. As métricas de bytes antes e depois do processamento ficam em stats.
+
+        Args:
+            band (tuple): frações (topo, base) da altura a manter; None mantém a imagem inteira.
+            max_width (int): largura máxima, em pixels; None mantém a largura.
+            grayscale (bool): se verdadeiro, descarta as cores.
+            format (str): formato da recodificação.
+            quality (int): qualidade da recodificação, para formatos com perdas."""
+    def __init__(self, band: Optional[Tuple[float, float]]=SUBTITLE_BAND,
+                    max_width: Optional[int]=960, grayscale: bool=True,
+                    format: str='JPEG', quality: int=85) -> None:
+        self.band = band
+        self.max_width = max_width
+        self.grayscale = grayscale
+        self.format = format
+        self.quality = quality
+        self.images = 0
+        self.failed = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    @property
+    def stats(self) -> dict:
+        saved = 1 - self.bytes_after / self.bytes_before if self.bytes_before else 0
+        return {
+            'images': self.images, 
+            'failed': self.failed,
+            'bytes_before': self.bytes_before, 
+            'bytes_after': self.bytes_after,
+            'saved': round(saved, 3)
+        }
+
+    def process(self, data: MyImageData) -> MyImageData:
+        self.images += 1
+        self.bytes_before += len(data.bytes)
+        try:
+            _bytes = shrink_image(data.bytes, self.band, self.max_width, 
+                                    self.grayscale, self.format, self.quality)
+        except Exception as err:
+            print(err)
+            self.failed += 1
+            self.bytes_after += len(data.bytes)
+            return data
+        self.bytes_after += len(_bytes)
+        return replace_bytes(data, _bytes)
+
+
+
+class BKTree:
+    """
+        Árvore BK de hashes inteiros sob a distância de Hamming. Uma consulta com limite t visita apenas os filhos cuja distância ao nó está entre d - t e d + t, de modo que a busca permanece rápida com milhares de hashes."""
+    def __init__(self) -> None:
+        self._root: Optional[Tuple[int, Dict[int, tuple]]] = None
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @staticmethod
+    def distance(a: int, b: int) -> int:
+        return bin(a ^ b).count("1")
+
+    def add(self, _hash: int) -> None:
+        self._len += 1
+        if self._root is None:
+            self._root = (_hash, {})
+            return
+        node = self._root
+        while True:
+            dist = self.distance(_hash, node[0])
+            child = node[1].get(dist)
+            if child is None:
+                node[1][dist] = (_hash, {})
+                return
+            node = child
+
+    def find(self, _hash: int, threshold: int) -> List[int]:
+        """
+            Retorna os hashes estocados a uma distância de no máximo threshold do hash fornecido."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            value, children = stack.pop()
+            dist = self.distance(_hash, value)
+            if dist <= threshold:
+                found.append(value)
+            for child_dist, child in children.items():
+                if dist - threshold <= child_dist <= dist + threshold:
+                    stack.append(child)
+        return found
+
+
+
+class PerceptualDedupStage(ImageStageInterface):
+    """
+        Etapa que descarta imagens cuja legenda já foi vista, como quadros consecutivos com a mesma fala, evitando extrações e cartões repetidos. Deve receber os quadros inteiros, antes do recorte da legenda: a faixa da legenda é binarizada, de modo que apenas o texto claro seja comparado, mesmo que o fundo se mova entre os quadros. Os candidatos são localizados pelo dHash da máscara do texto, indexado em uma árvore BK, e a repetição só é confirmada se as máscaras forem praticamente iguais. Imagens que não puderem ser lidas seguem adiante.
+
+        A imagem descartada recebe o atributo duplicate_of, com a fonte da imagem mantida a que corresponde, para que só seja removida da fonte junto a ela.
+
+        Args:
+            threshold (int): distância de Hamming máxima, entre hashes de 64 bits, para que duas imagens sejam comparadas.
+            band (tuple): frações (topo, base) da altura em que fica a legenda.
+            max_changed (float): fração máxima dos pixels com texto que podem diferir entre as máscaras para considerar duas imagens iguais. O fundo claro que atravessa a faixa e se desloca alguns pixels altera poucos deles; uma legenda diferente, em geral mais de um quarto.
+            tolerance (int): diferença, em níveis, a partir da qual um pixel da máscara é considerado alterado.
+            text_threshold (int): limiar da binarização, acima do qual um pixel é considerado texto."""
+    def __init__(self, threshold: int=4, 
+                    band: Optional[Tuple[float, float]]=SUBTITLE_BAND,
+                    max_changed: float=0.15, tolerance: int=64,
+                    text_threshold: int=180) -> None:
+        self.threshold = threshold
+        self.band = band
+        self.max_changed = max_changed
+        self.tolerance = tolerance
+        self.text_threshold = text_threshold
+        self.index = BKTree()
+        self._kept: Dict[int, List[Tuple[str, bytes]]] = {}
+        self.images = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.failed = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'images': self.images,
+            'ocr_calls_avoided': self.duplicates,
+            'rejected_matches': self.rejected,
+            'failed': self.failed
+        }
+
+    def _match(self, _hash: int, mask: bytes) -> Optional[str]:
+        candidates = self.index.find(_hash, self.threshold)
+        for candidate in candidates:
+            for source, kept in self._kept[candidate]:
+                if mask_distance(mask, kept, self.tolerance) <= self.max_changed:
+                    return source
+        if candidates:
+            self.rejected += 1
+        return None
+
+    def process(self, data: MyImageData) -> Optional[MyImageData]:
+        self.images += 1
+        try:
+            _hash, mask = frame_signature(
+                data.bytes, self.band, threshold=self.text_threshold)
+        except Exception as err:
+            print(err)
+            self.failed += 1
+            return data
+        source = self._match(_hash, mask)
+        if source is not None:
+            self.duplicates += 1
+            data.duplicate_of = source
+            return None
+        if _hash not in self._kept:
+            self.index.add(_hash)
+            self._kept[_hash] = []
+        self._kept[_hash].append((getattr(data, 'source', None), mask))
+        return data
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional
 
 
 class SourceAdminInterface(ABC):
@@ -22,6 +23,11 @@ class ImageSourceInterface(ABC):
     @abstractmethod
     def get_images(self):
         ...
+
+    def iter_images(self) -> Iterator:
+        """
+            Retorna as imagens sob demanda. Implementações podem especializar esse método para não carregar todas as imagens na memória antes do processamento."""
+        yield from self.get_images()
     
     @abstractmethod
     def remove_images(self):
@@ -36,4 +42,19 @@ class ImageSourceInterface(ABC):
 class TextExtractorInterface(ABC):
     @abstractmethod
     def img_to_str(self):
-        ...
\ No newline at end of file
+        ...
+
+    def imgs_to_str(self, imgs: List[bytes]) -> List[str]:
+        """
+            Extrai o texto de várias imagens, retornando um resultado por imagem. Implementações podem agrupá-las em uma única requisição."""
+        return [self.img_to_str(img) for img in imgs]
+
+
+class ImageStageInterface(ABC):
+    """
+        Interface para uma etapa de processamento das imagens, executada entre a fonte de imagens e o extrator de textos."""
+    @abstractmethod
+    def process(self, data) -> Optional[object]:
+        """
+            Assinatura para estabelecer o contrato de implementação desse método que deverá retornar o MyImageData processado, ou None para descartá-lo."""
+        ...
@@ -1,12 +1,17 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import sleep
+from types import SimpleNamespace
 from typing import List
 from src.funcs.imgFuncs import get_imgs_path, remove_imgs_list
-from src.funcs.textFunc import get_from_json
 
+from .appConfig import as_config
 from .myImageData import MyImageData
 
 class MockImageSource:
     def __init__(self, img_path_file: str):
-        self.source = get_from_json(img_path_file, 'imgPath')
+        self.source, = as_config(img_path_file).require('img_path')
     
     def get_images(self) -> List[str]:        
         imgs_data = []
@@ -18,6 +23,9 @@ class MockImageSource:
             )
         return imgs_data
 
+    def iter_images(self):
+        yield from self.get_images()
+
     def remove_images(self, img_list: List[str]) -> None:
         ...
 
@@ -48,3 +56,145 @@ class MockGoogleVision:
     def img_to_str(self, img: bytes) -> None:
         ...
     
+
+
+class MockMemoryImageSource:
+    def __init__(self, imgs_data: List[MyImageData], latency: float=0):
+        self.imgs_data = imgs_data
+        self.latency = latency
+
+    def get_images(self) -> List[MyImageData]:
+        return list(self.imgs_data)
+
+    def iter_images(self):
+        for data in self.imgs_data:
+            sleep(self.latency)
+            yield data
+
+    def remove_images(self, img_list: List[str]) -> None:
+        ...
+
+
+class MockLatencyTextExtractor:
+    """
+        Extrator que simula a latência de uma chamada de rede, retornando o próprio conteúdo da imagem como texto."""
+    def __init__(self, latency: float, failing: List[bytes]=None):
+        self.latency = latency
+        self.failing = failing or []
+
+    def img_to_str(self, img: bytes) -> str:
+        sleep(self.latency)
+        if img in self.failing:
+            raise Exception(f'Unable to extract {img!r}.')
+        return img.decode('utf-8')
+
+
+class MockVisionClient:
+    """
+        Cliente local que imita o batch_annotate_images do Vision API. O texto detectado é o próprio conteúdo de cada imagem; conteúdos vazios retornam erro."""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def _annotate(self, request):
+        content = request.image.content
+        if not content:
+            return SimpleNamespace(
+                error=SimpleNamespace(message='Bad image data.'), 
+                text_annotations=[]
+            )
+        return SimpleNamespace(
+            error=SimpleNamespace(message=''),
+            text_annotations=[
+                SimpleNamespace(description=content.decode('utf-8'))
+            ]
+        )
+
+    def batch_annotate_images(self, requests):
+        self.batch_sizes.append(len(requests))
+        return SimpleNamespace(
+            responses=[self._annotate(r) for r in requests]
+        )
+
+
+class MockAnkiConnectServer:
+    """
+        Servidor HTTP local que imita as ações createDeck, canAddNotes, canAddNotesWithErrorDetail e addNotes do AnkiConnect. Como nas versões atuais, se alguma nota do addNotes for duplicada (frente já adicionada), as demais são adicionadas e a resposta traz o erro, com result null; com null_per_note, como nas versões antigas, apenas as notas duplicadas retornam null. Sem error_detail, também como nas versões antigas, canAddNotesWithErrorDetail não é suportada."""
+    def __init__(self, null_per_note: bool=False, error_detail: bool=True):
+        self.null_per_note = null_per_note
+        self.error_detail = error_detail
+        self.requests = []
+        self.connections = 0
+        self.fronts = set()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def _handler(self):
+        mock_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                mock_server.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                request = json.loads(self.rfile.read(length))
+                mock_server.requests.append(request)
+                body = json.dumps(mock_server.reply(request)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                ...
+        return Handler
+
+    def reply(self, request: dict) -> dict:
+        if request['action'] == 'createDeck':
+            return {'result': 1, 'error': None}
+        if request['action'] == 'canAddNotes':
+            notes = request['params']['notes']
+            return {'result': [note['fields']['Front'] not in self.fronts for note in notes], 
+                    'error': None}
+        if request['action'] == 'canAddNotesWithErrorDetail' and self.error_detail:
+            details = []
+            for note in request['params']['notes']:
+                if not note['fields']['Front']:
+                    details.append({'canAdd': False, 'error': 'cannot create note because it is empty'})
+                elif note['fields']['Front'] in self.fronts:
+                    details.append({'canAdd': False, 
+                                    'error': 'cannot create note because it is a duplicate'})
+                else:
+                    details.append({'canAdd': True})
+            return {'result': details, 'error': None}
+        if request['action'] == 'addNotes':
+            result, errors = [], []
+            for note in request['params']['notes']:
+                front = note['fields']['Front']
+                if front in self.fronts:
+                    result.append(None)
+                    errors.append('cannot create note because it is a duplicate')
+                else:
+                    self.fronts.add(front)
+                    result.append(len(self.fronts))
+            if errors and not self.null_per_note:
+                return {'result': None, 'error': str(errors)}
+            return {'result': result, 'error': None}
+        return {'result': None, 'error': 'unsupported action'}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,98 @@
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .interfaces import TextExtractorInterface
+
+from src.funcs.imgFuncs import PILLOW_AVAILABLE, SUBTITLE_BAND, preprocess_for_ocr
+
+
+def _recognize(img: bytes, command: Sequence[str], timeout: float,
+                preprocess: bool, band: Optional[Tuple[float, float]],
+                threshold: int) -> Optional[str]:
+    """
+        Executado nos processos do pool: pré-processa a imagem e a envia ao Tesseract pela entrada padrão. Retorna None se o reconhecimento falhar ou exceder o tempo limite."""
+    try:
+        if preprocess:
+            img = preprocess_for_ocr(img, band, threshold)
+        result = subprocess.run(
+            list(command), input=img, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        print(f'OCR timed out after {timeout} s.')
+        return None
+    except (OSError, ValueError) as err:
+        print(err)
+        return None
+    if result.returncode != 0:
+        print(result.stderr.decode('utf-8', errors='replace').strip())
+        return None
+    text = result.stdout.decode('utf-8', errors='replace')
+    return text.replace('\n', ' ').strip()
+
+
+
+class TesseractOCR(TextExtractorInterface):
+    """
+        Extrator offline, que reconhece os textos com o Tesseract em subprocessos, sem acesso à rede. As imagens de imgs_to_str são distribuídas por um pool de processos, por padrão um por núcleo, e cada imagem tem seu próprio tempo limite.
+
+        Args:
+            command (str | Sequence[str]): executável do Tesseract.
+            lang (str): idioma(s) do reconhecimento, como aceito pela opção -l.
+            psm (int): modo de segmentação da página; 6 trata a imagem como um bloco de texto.
+            timeout (float): tempo limite, em segundos, por imagem.
+            max_workers (int): quantidade de processos; None utiliza todos os núcleos.
+            preprocess (bool): recorta a faixa da legenda, converte para tons de cinza e binariza antes do reconhecimento. Ignorado se o Pillow não estiver instalado.
+            band (tuple): frações (topo, base) da altura mantidas no recorte; None mantém a imagem inteira.
+            threshold (int): limiar da binarização."""
+    def __init__(self, command: Union[str, Sequence[str]]='tesseract',
+                    lang: str='eng', psm: int=6, timeout: float=30,
+                    max_workers: Optional[int]=None, preprocess: bool=True,
+                    band: Optional[Tuple[float, float]]=SUBTITLE_BAND,
+                    threshold: int=180) -> None:
+        if isinstance(command, str):
+            command = [command]
+        if preprocess and not PILLOW_AVAILABLE:
+            print('Pillow not installed: images will be sent to Tesseract without pre-processing.')
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._recognize = partial(
+            _recognize,
+            command=[*command, 'stdin', 'stdout', '-l', lang, '--psm', str(psm)],
+            timeout=timeout,
+            preprocess=preprocess and PILLOW_AVAILABLE,
+            band=band,
+            threshold=threshold
+        )
+        self._executor = None
+        self._executor_lock = Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    def img_to_str(self, img: bytes) -> Optional[str]:
+        return self._recognize(img)
+
+    def imgs_to_str(self, imgs: List[bytes]) -> List[Optional[str]]:
+        if len(imgs) <= 1:
+            return [self._recognize(img) for img in imgs]
+        return list(self.executor.map(self._recognize, imgs))
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self) -> "TesseractOCR":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
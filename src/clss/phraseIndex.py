@@ -0,0 +1,120 @@
+import sqlite3
+from collections import defaultdict
+from difflib import SequenceMatcher
+from threading import Lock
+from time import time
+from typing import Dict, List, Optional, Tuple
+
+from src.funcs.textFunc import normalize_phrase
+
+
+class PhraseIndex:
+    """
+        Índice persistente, em SQLite, das frases que já originaram cartões, comparadas após a normalização (normalize_phrase). Permite descartar frases repetidas, vindas de fontes diferentes ou de execuções anteriores, antes da criação dos cartões.
+
+        As frases novas ficam reservadas em memória, valendo apenas para a execução corrente, até que commit as grave, em uma única transação, depois que os cartões forem estocados no banco de dados. Assim, se a execução for interrompida antes disso, as frases não são consideradas vistas.
+
+        Args:
+            path (str): arquivo do banco de dados.
+            fuzzy (float): se fornecido, similaridade mínima (0 a 1, pelo SequenceMatcher) para que frases diferentes sejam consideradas repetidas. Nesse modo, as frases normalizadas são mantidas também em memória, agrupadas pelo tamanho e pelo início ou pelo fim, e somente as do mesmo grupo são comparadas; frases que diferem tanto no início quanto no fim não são consideradas repetidas."""
+    _AFFIX = 3
+
+    def __init__(self, path: str, fuzzy: Optional[float]=None) -> None:
+        self.path = path
+        self.fuzzy = fuzzy
+        self.duplicates = 0
+        self._lock = Lock()
+        self._reserved: Dict[str, str] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS phrase_index ("
+            "normalized TEXT PRIMARY KEY, phrase TEXT NOT NULL, "
+            "created REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._buckets: Dict[Tuple[str, int, str], List[str]] = defaultdict(list)
+        if fuzzy is not None:
+            for row in self._conn.execute("SELECT normalized FROM phrase_index"):
+                self._add_to_buckets(row[0])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM phrase_index").fetchone()[0]
+
+    def _keys(self, normalized: str, length: int) -> List[Tuple[str, int, str]]:
+        return [("prefix", length, normalized[:self._AFFIX]),
+                ("suffix", length, normalized[-self._AFFIX:])]
+
+    def _add_to_buckets(self, normalized: str) -> None:
+        for key in self._keys(normalized, len(normalized)):
+            self._buckets[key].append(normalized)
+
+    def _fuzzy_match(self, normalized: str) -> Optional[str]:
+        size = len(normalized)
+        ratio = self.fuzzy
+        low = int(size * ratio / (2 - ratio))
+        high = int(size * (2 - ratio) / ratio) + 1
+        for length in range(low, high + 1):
+            for key in self._keys(normalized, length):
+                for candidate in self._buckets.get(key, ()):
+                    matcher = SequenceMatcher(None, normalized, candidate)
+                    if (matcher.real_quick_ratio() >= ratio and
+                            matcher.quick_ratio() >= ratio and
+                            matcher.ratio() >= ratio):
+                        return candidate
+        return None
+
+    def find(self, phrase: str) -> Optional[str]:
+        """
+            Retorna a frase normalizada já indexada, ou reservada, que corresponde à frase fornecida, ou None."""
+        normalized = normalize_phrase(phrase)
+        with self._lock:
+            return self._find(normalized)
+
+    def _find(self, normalized: str) -> Optional[str]:
+        if normalized in self._reserved:
+            return normalized
+        row = self._conn.execute(
+            "SELECT normalized FROM phrase_index WHERE normalized = ?",
+            (normalized,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        if self.fuzzy is not None:
+            return self._fuzzy_match(normalized)
+        return None
+
+    def check_and_add(self, phrase: str) -> bool:
+        """
+            Reserva a frase, caso ainda não haja correspondente, até o próximo commit. Retorna verdadeiro se a frase for repetida."""
+        normalized = normalize_phrase(phrase)
+        with self._lock:
+            if self._find(normalized) is not None:
+                self.duplicates += 1
+                return True
+            self._reserved[normalized] = phrase
+            if self.fuzzy is not None:
+                self._add_to_buckets(normalized)
+        return False
+
+    def commit(self) -> int:
+        """
+            Grava as frases reservadas em uma única transação. Retorna a quantidade de frases gravadas."""
+        with self._lock:
+            if len(self._reserved) == 0:
+                return 0
+            created = time()
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO phrase_index (normalized, phrase, created) "
+                    "VALUES (?, ?, ?)",
+                    ((normalized, phrase, created) for normalized, phrase in self._reserved.items())
+                )
+            committed = len(self._reserved)
+            self._reserved = {}
+        return committed
+
+    def close(self) -> None:
+        self._conn.close()
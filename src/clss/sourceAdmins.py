@@ -1,20 +1,89 @@
+import os
 import shelve
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Union
 
 from .cards import MyCard
 from .cardWriter import DictBasedCardWriter
+from .myImageData import MyImageData
 from . abstractClasses import AbstractShelveKeyAdmin
 from .interfaces import (SourceAdminInterface,
                             ImageSourceInterface, 
+                            ImageStageInterface,
                             TextExtractorInterface)
 
-from src.funcs.textFunc import get_from_txt, get_from_json
+from .appConfig import AppConfig, as_config
+
+from src.funcs.textFunc import (rewrite_txt_atomically, txt_head_digest,
+                                iter_from_txt_offset, read_txt_checkpoint, 
+                                write_txt_checkpoint)
+from src.funcs.subtitleFuncs import get_subtitle_files, iter_subtitle_cues
+from src.funcs.poolFuncs import bounded_ordered_map, prefetch
 
 
 class MyCardShelveAdmin(AbstractShelveKeyAdmin):
-    def __init__(self, db_cards: str, db_key: str) -> None:
-        super().__init__(db_cards, db_key)
-        
+    """
+        Administra os objetos MyCard pendentes na estrutura de persistência. Cada cartão é estocado em um registro próprio, indexado pela sua identidade (MyCard.key), de modo que a atualização custa proporcionalmente aos cartões alterados e não ao tamanho do backlog.
+
+        Args:
+            database: motor de persistência (padrão: ShelveDatabase). Com o SQLiteDatabase, o backlog pode ser paginado sem carregá-lo todo na memória."""
+    def __init__(self, db_cards: str, db_key: str, database=None) -> None:
+        super().__init__(db_cards, db_key, database)
+        self._record_prefix = f"{db_key}:"
+        self._seq_key = f"{db_key}#seq"
+
+    def _record_key(self, card: MyCard) -> str:
+        return f"{self._record_prefix}{card.key}"
+
+    def _verify_key(self) -> None:
+        """
+            Realiza a migração, caso exista, da lista legada de objetos MyCard estocada sob a key/coluna db_key."""
+        with self._database.open(self.db_cards) as db:
+            self._migrate(db)
+
+    def _migrate(self, db) -> None:
+        if not self.db_key in db:
+            return
+        legacy_cards = db[self.db_key]
+        self._upsert(db, legacy_cards)
+        del db[self.db_key]
+
+    def _upsert(self, db, cards: List[MyCard]) -> None:
+        if len(cards) == 0:
+            return
+        seq = db.get(self._seq_key, 0)
+        for card in cards:
+            record_key = self._record_key(card)
+            if not record_key in db:
+                seq += 1
+                db[record_key] = (seq, card)
+        db[self._seq_key] = seq
+
+    def _delete(self, db, cards: List[MyCard]) -> None:
+        for card in cards:
+            record_key = self._record_key(card)
+            if record_key in db:
+                del db[record_key]
+
+    def return_sources(self) -> list:
+        """
+            Retorna os objetos MyCard estocados, na ordem em que foram inseridos."""
+        return self.page_sources()
+
+    def page_sources(self, offset: int=0, limit: Optional[int]=None) -> List[MyCard]:
+        """
+            Retorna uma página dos objetos MyCard estocados, na ordem em que foram inseridos."""
+        with self._database.open(self.db_cards) as db:
+            self._migrate(db)
+            records = db.records_by_prefix(self._record_prefix, offset, limit)
+        return [card for _, card in records]
+
+    def count_sources(self) -> int:
+        with self._database.open(self.db_cards) as db:
+            self._migrate(db)
+            return db.count_by_prefix(self._record_prefix)
+
     def update_sources(self, cards: list) -> None:
         """
             Método resposável pela atualização da estrutura de persistência, de acordo com o status de inserido do objeto MyCard.
@@ -23,29 +92,18 @@ class MyCardShelveAdmin(AbstractShelveKeyAdmin):
                 cards (list): lista de objetos MyCard a serem submetido por avaliação e comparação com objetos MyCard eventualmente estocados na estrutura de db."""
         if len(cards) == 0:
             return
-        self._verify_key()        
-        cards_temp = self.return_sources()
-        c_temp_repr = [card.representation for card in cards_temp]            
-
-        for card in cards:
-            if card.inserted == False:
-                if not card.representation in c_temp_repr:
-                    cards_temp.append(card)
-
-            if card.inserted == True:
-                c_temp = card
-                c_temp.inserted = False
-                for i, c in enumerate(cards_temp): 
-                    if c.representation == c_temp.representation:
-                        cards_temp.pop(i)
-                        break
-        self._insert(cards_temp)    
+        pending = [card for card in cards if card.inserted == False]
+        inserted = [card for card in cards if card.inserted == True]
+        with self._database.open(self.db_cards) as db:
+            self._migrate(db)
+            self._upsert(db, pending)
+            self._delete(db, inserted)
 
 
 
 class DriveFileIdShelveAdmin(AbstractShelveKeyAdmin): 
-    def __init__(self, db_cards, db_key):
-        super().__init__(db_cards, db_key)
+    def __init__(self, db_cards, db_key, database=None):
+        super().__init__(db_cards, db_key, database)
     
     def update_sources(self, _id_list: list) -> None:
         self._insert(_id_list)
@@ -53,11 +111,22 @@ class DriveFileIdShelveAdmin(AbstractShelveKeyAdmin):
 
 class TextSourceAdmin(SourceAdminInterface):
     """
-        Classe que implementa os contratos de retorno e atualização de fontes de conteúdo para a criação de cartões, no contexto de criação através de um arquivo de texto."""
-    def __init__(self, config_file_path: str, writer: DictBasedCardWriter):
-        self.source = get_from_json(config_file_path, "phrasesFile")
+        Classe que implementa os contratos de retorno e atualização de fontes de conteúdo para a criação de cartões, no contexto de criação através de um arquivo de texto.
+
+        O arquivo é lido linha a linha e as frases são entregues ao escritor em lotes. A atualização da fonte depende apenas da posição, em bytes, até a qual o arquivo foi lido, e não dos conteúdos do escritor; assim, com um escritor em modo de memória limitada, além dos cartões retornados, apenas um lote de conteúdos é mantido em memória.
+
+        Args:
+            incremental (bool): se verdadeiro, o arquivo não é reescrito após a inserção; é registrado um checkpoint com a posição, em bytes, até a qual foi consumido, e a próxima execução lê apenas as linhas adicionadas desde então.
+            batch_size (int): quantidade de frases entregues ao escritor antes de os cartões serem escritos."""
+    def __init__(self, config: Union[AppConfig, str], writer: DictBasedCardWriter, 
+                    incremental: bool=False, batch_size: int=1000):
+        self.source, = as_config(config).require("phrases_file")
         self.writer = writer
+        self.incremental = incremental
+        self.batch_size = batch_size
         self._card_list = []
+        self._read_offset = None
+        self._read_head = None
         
     @property
     def card_list(self):
@@ -65,50 +134,198 @@ class TextSourceAdmin(SourceAdminInterface):
 
     def return_sources(self) -> str:
         """
-            Obtém o conteúdo, organiza e retorna os cards gerados."""        
-        phrases = get_from_txt(self.source)
-        if len(phrases) == 0:
-            return phrases
-        for phrase in phrases:
-           self.writer.update_contents(phrase, self.source)        
-        return self.writer.return_written_cards()
+            Obtém o conteúdo, organiza e retorna os cards gerados. O arquivo é lido linha a linha."""        
+        if self.incremental:
+            return self._return_appended_sources()
+        cards = self._write_in_batches(self._iter_appended(0, complete_only=False))
+        if self._read_offset:
+            self._read_head = txt_head_digest(self.source, self._read_offset)
+        return cards
+
+    def _write_in_batches(self, phrases: Iterable[str]) -> List[MyCard]:
+        phrases = iter(phrases)
+        cards = []
+        while True:
+            batch = list(islice(phrases, max(1, self.batch_size)))
+            if len(batch) == 0:
+                return cards
+            for phrase in batch:
+                self.writer.update_contents(phrase, self.source)
+            cards.extend(self.writer.iter_cards())
+
+    def _iter_appended(self, offset: int, complete_only: bool=True) -> Iterator[str]:
+        self._read_offset = offset
+        for phrase, offset in iter_from_txt_offset(self.source, offset, complete_only):
+            self._read_offset = offset
+            if phrase != "":
+                yield phrase
+
+    def _return_appended_sources(self) -> list:
+        offset = read_txt_checkpoint(self.source)
+        return self._write_in_batches(self._iter_appended(offset))
 
     def update_sources(self) -> None:
         """
-            Atualiza a fonte de conteúdo após a escrita de objetos MyCard e posterior inserção no banco de dados."""
-        contents = self.writer.contents
-        if len(contents) == 0:
+            Atualiza a fonte de conteúdo após a escrita de objetos MyCard e posterior inserção no banco de dados. O arquivo é reescrito, atomicamente, apenas com as linhas adicionadas após a leitura; se tiver sido substituído ou truncado nesse intervalo, não é alterado."""
+        self.writer.commit_index()
+        if self.incremental:
+            if self._read_offset is not None:
+                write_txt_checkpoint(self.source, self._read_offset)
             return
-        phrases = [card['phrase'] for card in contents]
-        source = get_from_txt(self.source)
-        update = [phrase for phrase in source if phrase not in phrases]
-        with open(self.source, "w") as source:
-            for phrase in update:
-                source.write(f"{phrase}\n")
-    
+        if not self._read_offset:
+            return
+        if (not os.path.isfile(self.source) or 
+                os.path.getsize(self.source) < self._read_offset or
+                txt_head_digest(self.source, self._read_offset) != self._read_head):
+            print(f'"{self.source}" changed while it was being read and was not rewritten.')
+            return
+        update = (
+            phrase for phrase, _ in 
+            iter_from_txt_offset(self.source, self._read_offset, complete_only=False)
+            if phrase != ""
+        )
+        rewrite_txt_atomically(self.source, update)
+        self._read_offset = None
+
+
+
+class SubtitleSourceAdmin(SourceAdminInterface):
+    """
+        Classe que implementa os contratos de retorno e atualização de fontes de conteúdo no contexto de criação de cartões diretamente a partir de legendas (SRT, WebVTT e ASS/SSA), sem a extração de textos de imagens. A fonte de cada cartão é o arquivo e o início da fala, no formato "arquivo@HH:MM:SS.mmm".
+
+        Os arquivos de legenda não são alterados: cada arquivo lido recebe um checkpoint (<arquivo>.checkpoint.json), como o do arquivo de frases, e não é lido novamente enquanto não for modificado."""
+    def __init__(self, config: Union[AppConfig, str], writer: DictBasedCardWriter):
+        self.source, = as_config(config).require("subtitles_path")
+        self.writer = writer
+        self._read_files: List[Tuple[str, int]] = []
+
+    @staticmethod
+    def _is_processed(file: str) -> bool:
+        size = os.path.getsize(file)
+        return size > 0 and read_txt_checkpoint(file) == size
+
+    def return_sources(self) -> list:
+        """
+            Obtém as falas de cada arquivo de legenda ainda não processado, uma a uma, organiza e retorna os cards gerados. Os cartões são escritos ao fim de cada arquivo."""
+        cards = []
+        for file in get_subtitle_files(self.source):
+            if self._is_processed(file):
+                continue
+            size = os.path.getsize(file)
+            for start, phrase in iter_subtitle_cues(file):
+                self.writer.update_contents(phrase, f"{file}@{start}")
+            cards.extend(self.writer.iter_cards())
+            self._read_files.append((file, size))
+        return cards
+
+    def update_sources(self) -> None:
+        """
+            Registra o checkpoint dos arquivos de legenda lidos, inclusive daqueles cujas falas eram vazias ou repetidas, após a inserção dos cartões no banco de dados."""
+        self.writer.commit_index()
+        for file, size in self._read_files:
+            if os.path.isfile(file):
+                write_txt_checkpoint(file, size)
+        self._read_files = []
+
 
 
 class ImageSourceAdmin(SourceAdminInterface):    
+    """
+        Classe que implementa os contratos de retorno e atualização de fontes de conteúdo no contexto de extração de textos de imagens. As imagens são consumidas da fonte como um fluxo, de modo que a extração começa antes do término da obtenção.
+
+        Args:
+            max_workers (int): quantidade máxima de extrações simultâneas. Com o valor 1 (padrão), as imagens são processadas uma a uma.
+            batch_size (int): quantidade de imagens entregues ao extrator em cada chamada de imgs_to_str. Com o valor 1 (padrão), é utilizado o img_to_str.
+            prefetch (int): tamanho da fila de imagens obtidas antecipadamente por uma thread auxiliar. Com o valor 0 (padrão), as imagens são obtidas sob demanda.
+            stages (list): etapas de processamento aplicadas, em ordem, a cada imagem antes da extração. Com prefetch, são executadas na thread auxiliar. As imagens descartadas por uma etapa são removidas da fonte junto às consumidas; as repetidas, somente se a imagem mantida a que correspondem tiver sido consumida."""
     def __init__(self, image_source: ImageSourceInterface, 
                     writer: DictBasedCardWriter,
-                    text_extractor: TextExtractorInterface) -> None:
+                    text_extractor: TextExtractorInterface,
+                    max_workers: int=1,
+                    batch_size: int=1,
+                    prefetch: int=0,
+                    stages: Optional[List[ImageStageInterface]]=None) -> None:
         self.source = image_source
         self.writer = writer
         self.extractor = text_extractor
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.stages = list(stages or [])
+        self._dropped_sources: List[Tuple[str, Optional[str]]] = []
 
-    def return_sources(self):    
-        imgs_data = self.source.get_images()
+    def _extract(self, data: MyImageData) -> Optional[str]:
+        try:
+            phrase = self.extractor.img_to_str(data.bytes)
+        except Exception as err:
+            print(err)
+        else:
+            return phrase
+
+    def _extract_batch(self, batch: List[MyImageData]) -> List[Tuple[MyImageData, Optional[str]]]:
+        if len(batch) == 1:
+            return [(batch[0], self._extract(batch[0]))]
+        try:
+            phrases = self.extractor.imgs_to_str([data.bytes for data in batch])
+        except Exception as err:
+            print(err)
+            phrases = [None] * len(batch)
+        return list(zip(batch, phrases))
+
+    def _batches(self, imgs_data: Iterable[MyImageData]) -> Iterator[List[MyImageData]]:
+        imgs_data = iter(imgs_data)
+        batch_size = max(1, self.batch_size)
+        while True:
+            batch = list(islice(imgs_data, batch_size))
+            if len(batch) == 0:
+                return
+            yield batch
+
+    def _apply_stages(self, imgs_data: Iterable[MyImageData]) -> Iterator[MyImageData]:
         for data in imgs_data:
-            try:
-                phrase = self.extractor.img_to_str(data.bytes)
-            except Exception as err:
-                print(err)
+            source = data.source
+            for stage in self.stages:
+                current, data = data, stage.process(data)
+                if data is None:
+                    self._dropped_sources.append(
+                        (source, getattr(current, 'duplicate_of', None)))
+                    break
             else:
-                if phrase:
-                    self.writer.update_contents(phrase, data.source)
+                yield data
+
+    def _extract_stream(self, imgs_data: Iterable[MyImageData]) -> Iterator[Tuple[MyImageData, Optional[str]]]:
+        batches = self._batches(imgs_data)
+        if self.max_workers <= 1:
+            for batch in batches:
+                yield from self._extract_batch(batch)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = bounded_ordered_map(
+                executor, self._extract_batch, batches, 2 * self.max_workers)
+            for result in results:
+                yield from result
+
+    def return_sources(self):    
+        imgs_data = self._apply_stages(self.source.iter_images())
+        if self.prefetch > 0:
+            imgs_data = prefetch(imgs_data, self.prefetch)
+        for data, phrase in self._extract_stream(imgs_data):
+            if phrase:
+                self.writer.update_contents(phrase, data.source)
+        for stage in self.stages:
+            if hasattr(stage, 'stats'):
+                print(f'{type(stage).__name__}: {stage.stats}')
         return self.writer.return_written_cards()
     
     def update_sources(self):
-        imgs_src = [data['source'] for data in self.writer.contents]
+        """
+            Remove da fonte as imagens consumidas e as descartadas pelas etapas. Uma imagem descartada por ser repetição de outra só é removida se essa outra também tiver sido consumida."""
+        self.writer.commit_index()
+        imgs_src = [data['source'] for data in self.writer.iter_contents()]
+        consumed = set(imgs_src)
+        imgs_src.extend(
+            source for source, duplicate_of in self._dropped_sources
+            if duplicate_of is None or duplicate_of in consumed
+        )
         self.source.remove_images(imgs_src)
         
\ No newline at end of file
@@ -1,16 +1,25 @@
 from importlib import import_module
-from src.funcs.textFunc import get_from_json
+from typing import Union
+from src.clss.appConfig import AppConfig, as_config
 from src.clss.error import DataConfigError
+from src.funcs.driverFuncs import (get_browser_version, get_cached_driver, 
+									set_cached_driver, invalidate_cached_driver)
 
 
 class WebDriverConfigurator:
-	def __init__(self, config_file_path: str):
-		self._user_settings = get_from_json(
-			config_file_path, 
-			"web_driver_user_settings"
-			)
+	"""
+		Classe que monta, a partir do config.json, os argumentos do webdriver do navegador configurado.
+
+		Args:
+			driver_cache_file (str): arquivo em que é registrado o executável resolvido pelo webdriver manager, junto à versão do navegador. Enquanto a versão não mudar, o executável registrado é utilizado sem acesso à rede. Se o navegador não puder ser iniciado com ele, o registro é descartado e o executável é resolvido novamente (reinstall_driver, exposto também em web_driver_settings)."""
+	def __init__(self, config: Union[AppConfig, str], 
+					driver_cache_file: str=".webdriver_cache.json"):
+		user_settings, = as_config(config).require("web_driver_user_settings")
+		self._user_settings = dict(user_settings)
+		self.driver_cache_file = driver_cache_file
 		self.web_driver_settings = {
-			"web_driver_args": {}
+			"web_driver_args": {},
+			"reinstall_driver": self.reinstall_driver
 		}
 
 	def _browser_import_handler(self):
@@ -53,15 +62,29 @@ class WebDriverConfigurator:
 		}
 		browser = self._user_settings["browser"]
 		driver_manager_name = driver_collections.get(browser)
-		try:
-			module = import_module(f'webdriver_manager.{browser}')
-		except ModuleNotFoundError:
-			raise DataConfigError(browser)
-		else:
+		browser_version = get_browser_version(browser)
+		exe_path_installed = get_cached_driver(
+			self.driver_cache_file, browser, browser_version)
+		if exe_path_installed is None:
+			try:
+				module = import_module(f'webdriver_manager.{browser}')
+			except ModuleNotFoundError:
+				raise DataConfigError(browser)
 			driver_manager = getattr(module, driver_manager_name)
-			exe_path_installed = driver_manager().install()	
-			self.web_driver_settings["web_driver_args"].\
-				update(executable_path=exe_path_installed)
+			exe_path_installed = driver_manager().install()
+			set_cached_driver(self.driver_cache_file, browser, 
+								browser_version, exe_path_installed)
+		self.web_driver_settings["web_driver_args"].\
+			update(executable_path=exe_path_installed)
+
+	def reinstall_driver(self) -> bool:
+		"""
+			Descarta o executável registrado no cache e o resolve novamente pelo webdriver manager. Retorna falso se a instalação automática estiver desativada."""
+		if not self._user_settings["auto_executable_path"]:
+			return False
+		invalidate_cached_driver(self.driver_cache_file, self._user_settings["browser"])
+		self._install_driver_handler()
+		return True
 
 	@property
 	def install_path(self):
@@ -0,0 +1,196 @@
+import os
+import re
+import sys
+import shutil
+import plistlib
+import subprocess
+from typing import Iterator, Optional, Tuple
+
+from src.funcs.textFunc import get_json, set_json_file_atomically
+
+BROWSER_COMMANDS = {
+    "chrome": ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"),
+    "firefox": ("firefox",),
+    "opera": ("opera",),
+}
+WINDOWS_REGISTRY_KEYS = {
+    "chrome": ((r"Software\Google\Chrome\BLBeacon", "version"),),
+    "firefox": ((r"Software\Mozilla\Mozilla Firefox", "CurrentVersion"),),
+    "opera": (),
+}
+WINDOWS_INSTALL_DIRS = {
+    "chrome": (("PROGRAMFILES", r"Google\Chrome\Application"),
+                ("PROGRAMFILES(X86)", r"Google\Chrome\Application"),
+                ("LOCALAPPDATA", r"Google\Chrome\Application")),
+    "firefox": (("PROGRAMFILES", "Mozilla Firefox"),
+                ("PROGRAMFILES(X86)", "Mozilla Firefox")),
+    "opera": (("LOCALAPPDATA", r"Programs\Opera"),
+                ("PROGRAMFILES", "Opera")),
+}
+MAC_APP_BUNDLES = {
+    "chrome": ("Google Chrome.app", "Chromium.app"),
+    "firefox": ("Firefox.app",),
+    "opera": ("Opera.app",),
+}
+_VERSION = re.compile(r"\d+(?:\.\d+)+")
+
+
+def get_browser_version(browser: str, timeout: float=5) -> Optional[str]:
+    """
+        Obtém, localmente e sem acesso à rede, a versão do navegador instalado. No Windows, a versão é lida do registro ou, na falta dele, do diretório de instalação; no macOS, do Info.plist do pacote do aplicativo; nos demais sistemas, o navegador é executado com a opção --version.
+
+        Args:
+            browser (str) - nome do navegador (chrome, firefox ou opera).
+            timeout (float) - tempo limite, em segundos, de cada execução.
+
+        Returns:
+            str - a versão, ou None se o navegador não for encontrado."""
+    browser = browser.lower()
+    if sys.platform == "win32":
+        return _windows_registry_version(browser) or _windows_install_version(browser)
+    if sys.platform == "darwin":
+        return _mac_bundle_version(browser) or _command_version(browser, timeout)
+    return _command_version(browser, timeout)
+
+
+def _command_version(browser: str, timeout: float) -> Optional[str]:
+    for command in BROWSER_COMMANDS.get(browser, ()):
+        executable = shutil.which(command)
+        if executable is None:
+            continue
+        try:
+            result = subprocess.run(
+                [executable, "--version"], stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, timeout=timeout
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        match = _VERSION.search(result.stdout.decode("utf-8", errors="replace"))
+        if match:
+            return match.group()
+    return None
+
+
+def _windows_registry_version(browser: str) -> Optional[str]:
+    try:
+        import winreg
+    except ImportError:
+        return None
+    for key_path, value_name in WINDOWS_REGISTRY_KEYS.get(browser, ()):
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, key_path) as key:
+                    value, _ = winreg.QueryValueEx(key, value_name)
+            except OSError:
+                continue
+            match = _VERSION.search(str(value))
+            if match:
+                return match.group()
+    return None
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+
+def _windows_install_dirs(browser: str) -> Iterator[str]:
+    for variable, relative in WINDOWS_INSTALL_DIRS.get(browser, ()):
+        base = os.environ.get(variable)
+        if base:
+            yield os.path.join(base, relative)
+
+
+def _windows_install_version(browser: str) -> Optional[str]:
+    """
+        Lê a versão do diretório de instalação: do application.ini, no Firefox, ou do maior subdiretório nomeado pela versão, no Chrome e no Opera."""
+    for directory in _windows_install_dirs(browser):
+        application_ini = os.path.join(directory, "application.ini")
+        if os.path.isfile(application_ini):
+            with open(application_ini, "r", errors="replace") as f:
+                match = re.search(r"^Version=(\S+)", f.read(), re.MULTILINE)
+            if match and _VERSION.fullmatch(match.group(1)):
+                return match.group(1)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        versions = [
+            name for name in names if _VERSION.fullmatch(name)
+            and os.path.isdir(os.path.join(directory, name))
+        ]
+        if versions:
+            return max(versions, key=_version_key)
+    return None
+
+
+def _mac_bundle_version(browser: str) -> Optional[str]:
+    for applications in ("/Applications", os.path.expanduser("~/Applications")):
+        for bundle in MAC_APP_BUNDLES.get(browser, ()):
+            info = os.path.join(applications, bundle, "Contents", "Info.plist")
+            try:
+                with open(info, "rb") as f:
+                    version = plistlib.load(f).get("CFBundleShortVersionString")
+            except (OSError, ValueError, plistlib.InvalidFileException):
+                continue
+            match = _VERSION.search(str(version or ""))
+            if match:
+                return match.group()
+    return None
+
+
+def get_cached_driver(cache_file: str, browser: str, 
+                        browser_version: Optional[str]) -> Optional[str]:
+    """
+        Retorna o executável do webdriver registrado para o navegador, desde que o arquivo ainda exista e a versão do navegador não tenha mudado. Se a versão atual não puder ser obtida, o registro é aceito.
+
+        Args:
+            cache_file (str) - arquivo JSON do cache.
+            browser (str) - nome do navegador.
+            browser_version (str) - versão atual do navegador, ou None.
+
+        Returns:
+            str - caminho do executável, ou None se for necessário resolvê-lo novamente."""
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        entry = get_json(cache_file).get(browser)
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(entry, dict):
+        return None
+    path = entry.get("executable_path")
+    if not path or not os.path.isfile(path):
+        return None
+    if browser_version is not None and entry.get("browser_version") != browser_version:
+        return None
+    return path
+
+
+def set_cached_driver(cache_file: str, browser: str, 
+                        browser_version: Optional[str], path: str) -> None:
+    """
+        Registra o executável do webdriver resolvido para o navegador e a versão do navegador."""
+    cache = {}
+    if os.path.isfile(cache_file):
+        try:
+            cache = get_json(cache_file)
+        except ValueError:
+            cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    cache[browser] = {"browser_version": browser_version, "executable_path": path}
+    set_json_file_atomically(cache_file, cache)
+
+
+def invalidate_cached_driver(cache_file: str, browser: str) -> None:
+    """
+        Remove o registro do navegador do cache, de modo que o executável do webdriver seja resolvido novamente."""
+    if not os.path.isfile(cache_file):
+        return
+    try:
+        cache = get_json(cache_file)
+    except ValueError:
+        return
+    if isinstance(cache, dict) and browser in cache:
+        del cache[browser]
+        set_json_file_atomically(cache_file, cache)
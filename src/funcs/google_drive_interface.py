@@ -2,6 +2,8 @@ import os
 import io
 from typing import Union, Dict, List
 import pickle
+import threading
+from time import sleep
 
 from google_auth_oauthlib.flow import Flow, InstalledAppFlow
 from googleapiclient.discovery import build
@@ -9,6 +11,8 @@ from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
 from google.auth.transport.requests import Request
 from googleapiclient.errors import HttpError
 
+from src.clss.error import DriveServiceError
+
 #from src.funcs.imgFuncs import Create_Service
 
 
@@ -18,21 +22,78 @@ KEY = 'client_drive_key.json'
 API_NAME = 'drive'
 API_VERSION = 'v3'
 
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+_thread_data = threading.local()
+_credentials = None
+_credentials_lock = threading.Lock()
+
+
+def get_credentials():
+    """
+        Retorna as credenciais do Drive compartilhadas pelas threads. São carregadas, ou renovadas, uma única vez, sob um lock, de modo que apenas uma thread pode iniciar o fluxo de autorização ou regravar o token.
+
+        Raises:
+            DriveServiceError: se não for possível obter as credenciais."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None or not _credentials.valid:
+            try:
+                _credentials = load_credentials(KEY, API_NAME, API_VERSION, SCOPES)
+            except Exception as err:
+                raise DriveServiceError(err) from err
+        return _credentials
+
+
+def get_thread_service():
+    """
+        Retorna um serviço do Drive exclusivo da thread corrente, pois o cliente httplib2 não é thread-safe. Os serviços são criados a partir das credenciais compartilhadas (get_credentials).
+
+        Raises:
+            DriveServiceError: se não for possível criar o serviço."""
+    if getattr(_thread_data, 'service', None) is None:
+        credentials = get_credentials()
+        try:
+            _thread_data.service = build(API_NAME, API_VERSION, credentials=credentials)
+        except Exception as err:
+            raise DriveServiceError(err) from err
+    return _thread_data.service
+
+
 #DOWNLOAD DAS IMAGENS
-def get_images_byte(file_id):    
-    try:
-        request = service.files().get_media(fileId=file_id)
-    except HttpError as err:
-        print(err)
-    else:
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fd=fh, request=request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()            
-        fh.seek(0)            
-        img_bytes = fh.read()
-        return img_bytes
+def download_file_bytes(file_id: str, drive_service=None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        retries: int = 3, backoff: float = 0.5) -> Union[bytes, None]:
+    """
+        Realiza o download de um arquivo em partes de chunk_size bytes, tentando novamente com espera exponencial em caso de HttpError transitório.
+
+        Args:
+            file_id (str): id do arquivo no Drive.
+            drive_service: serviço do Drive. Se não fornecido, é utilizado o serviço da thread corrente.
+
+        Returns:
+            bytes - conteúdo do arquivo, ou None se não for possível obtê-lo."""
+    drive_service = drive_service or get_thread_service()
+    for attempt in range(retries + 1):
+        try:
+            request = drive_service.files().get_media(fileId=file_id)
+            fh = io.BytesIO()
+            downloader = MediaIoBaseDownload(
+                fd=fh, request=request, chunksize=chunk_size)
+            done = False
+            while not done:
+                status, done = downloader.next_chunk()
+            return fh.getvalue()
+        except HttpError as err:
+            if err.resp.status not in RETRY_STATUS or attempt == retries:
+                print(err)
+                return None
+            sleep(backoff * 2 ** attempt)
+
+
+def get_images_byte(file_id):
+    return download_file_bytes(file_id)
 
 
 #REMOVER id EM UM DIRETÓRIO
@@ -98,13 +159,12 @@ def get_id_by_folder_name(folder_name: str) -> str:
 
 
 
-def create_service(client_secret_file, api_name, api_version, *scopes):    
-    CLIENT_SECRET_FILE = client_secret_file
-    API_SERVICE_NAME = api_name
-    API_VERSION = api_version
+def load_credentials(client_secret_file, api_name, api_version, *scopes):
+    """
+        Carrega as credenciais do token salvo, renovando-as se expiradas, ou inicia o fluxo de autorização no navegador. O token é regravado sempre que as credenciais mudam."""
     SCOPES = [scope for scope in scopes[0]]
     cred = None
-    pickle_file = f'token_{API_SERVICE_NAME}_{API_VERSION}.pickle'
+    pickle_file = f'token_{api_name}_{api_version}.pickle'
     if os.path.exists(pickle_file):
         with open(pickle_file, 'rb') as token:
             cred = pickle.load(token)
@@ -112,12 +172,17 @@ def create_service(client_secret_file, api_name, api_version, *scopes):
         if cred and cred.expired and cred.refresh_token:
             cred.refresh(Request())
         else:
-            flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_FILE, SCOPES)
+            flow = InstalledAppFlow.from_client_secrets_file(client_secret_file, SCOPES)
             cred = flow.run_local_server()
         with open(pickle_file, 'wb') as token:
             pickle.dump(cred, token)
+    return cred
+
+
+def create_service(client_secret_file, api_name, api_version, *scopes):    
+    cred = load_credentials(client_secret_file, api_name, api_version, *scopes)
     try:
-        service = build(API_SERVICE_NAME, API_VERSION, credentials=cred)        
+        service = build(api_name, api_version, credentials=cred)        
         return service
     except Exception as e:
         print('Unable to connect.')
@@ -1,5 +1,14 @@
+import io
 import os
-from typing import List
+from typing import List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PILLOW_AVAILABLE = Image is not None
+SUBTITLE_BAND = (0.7, 1.0)
 
 
 def get_imgs_path(folder_path: str) -> List[str]:
@@ -20,3 +29,138 @@ def remove_imgs_list(imgs_list: List[str]) -> None:
             img_path.endswith(".jpg")
         ):
             os.unlink(img_path)
+
+
+
+def crop_band(image: "Image.Image", band: Tuple[float, float]) -> "Image.Image":
+    """
+        Recorta a faixa horizontal da imagem delimitada pelas frações (topo, base) de sua altura. A faixa padrão, SUBTITLE_BAND, corresponde à parte inferior do quadro, onde ficam as legendas."""
+    top, bottom = band
+    width, height = image.size
+    return image.crop((0, int(height * top), width, int(height * bottom)))
+
+
+def preprocess_for_ocr(img: bytes, band: Optional[Tuple[float, float]]=SUBTITLE_BAND, 
+                        threshold: int=180, invert: bool=True) -> bytes:
+    """
+        Prepara a imagem para o reconhecimento de caracteres: recorta a faixa da legenda, converte para tons de cinza e binariza pelo limiar. Com invert, o texto claro das legendas passa a ser escuro sobre fundo branco, como esperado pelos motores de OCR. Requer o Pillow.
+
+        Args:
+            img (bytes): conteúdo da imagem em qualquer formato suportado pelo Pillow.
+            band (tuple): frações (topo, base) da altura a manter; None mantém a imagem inteira.
+            threshold (int): limiar de 0 a 255 da binarização.
+            invert (bool): se verdadeiro, os pixels acima do limiar ficam pretos.
+
+        Returns:
+            bytes: imagem processada, em PNG."""
+    if not PILLOW_AVAILABLE:
+        raise ImportError("preprocess_for_ocr requires Pillow (pip install Pillow).")
+    image = Image.open(io.BytesIO(img))
+    if band is not None:
+        image = crop_band(image, band)
+    on, off = (0, 255) if invert else (255, 0)
+    lut = [on if level > threshold else off for level in range(256)]
+    image = image.convert("L").point(lut)
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def shrink_image(img: bytes, band: Optional[Tuple[float, float]]=SUBTITLE_BAND,
+                    max_width: Optional[int]=960, grayscale: bool=True,
+                    format: str="JPEG", quality: int=85) -> bytes:
+    """
+        Reduz a imagem antes do envio ao extrator: recorta a faixa configurada, reduz a largura mantendo a proporção, converte para tons de cinza e a recodifica. As operações são executadas pelo Pillow sobre o buffer inteiro da imagem. Requer o Pillow.
+
+        Args:
+            img (bytes): conteúdo da imagem em qualquer formato suportado pelo Pillow.
+            band (tuple): frações (topo, base) da altura a manter; None mantém a imagem inteira.
+            max_width (int): largura máxima, em pixels; None mantém a largura.
+            grayscale (bool): se verdadeiro, descarta as cores.
+            format (str): formato da recodificação.
+            quality (int): qualidade da recodificação, para formatos com perdas.
+
+        Returns:
+            bytes: imagem reduzida."""
+    if not PILLOW_AVAILABLE:
+        raise ImportError("shrink_image requires Pillow (pip install Pillow).")
+    image = Image.open(io.BytesIO(img))
+    if band is not None:
+        image = crop_band(image, band)
+    if max_width is not None and image.width > max_width:
+        height = max(1, round(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.LANCZOS, reducing_gap=2.0)
+    image = image.convert("L" if grayscale else "RGB")
+    output = io.BytesIO()
+    image.save(output, format=format, quality=quality)
+    return output.getvalue()
+
+
+def _dhash_image(image: "Image.Image", size: int) -> int:
+    pixels = list(image.convert("L").resize((size + 1, size), Image.LANCZOS).getdata())
+    _hash = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            _hash = (_hash << 1) | (left > right)
+    return _hash
+
+
+def dhash(img: bytes, size: int=8) -> int:
+    """
+        Calcula o hash perceptual por diferença (dHash) da imagem: ela é reduzida a (size + 1) x size pixels em tons de cinza e cada bit indica se um pixel é mais claro que o seu vizinho à direita. Imagens quase idênticas têm hashes com pequena distância de Hamming. Requer o Pillow.
+
+        Args:
+            img (bytes): conteúdo da imagem em qualquer formato suportado pelo Pillow.
+            size (int): lado do hash; o hash possui size * size bits.
+
+        Returns:
+            int: o hash."""
+    if not PILLOW_AVAILABLE:
+        raise ImportError("dhash requires Pillow (pip install Pillow).")
+    image = Image.open(io.BytesIO(img))
+    image.draft("L", (size * 4, size * 4))
+    return _dhash_image(image, size)
+
+
+def frame_signature(img: bytes, band: Optional[Tuple[float, float]]=SUBTITLE_BAND,
+                    size: int=8, thumbnail: Tuple[int, int]=(320, 64),
+                    threshold: int=180) -> Tuple[int, bytes]:
+    """
+        Obtém, em uma única decodificação, a máscara do texto da faixa da legenda e o seu dHash. A faixa é binarizada pelo limiar, como em preprocess_for_ocr, antes de ser reduzida à miniatura, de modo que o texto claro das legendas se mantém e o fundo, ainda que se mova entre quadros consecutivos, é em grande parte descartado. O hash localiza as máscaras parecidas; a máscara confirma se as legendas são de fato as mesmas (mask_distance). Requer o Pillow.
+
+        Args:
+            img (bytes): conteúdo da imagem em qualquer formato suportado pelo Pillow.
+            band (tuple): frações (topo, base) da altura da faixa; None utiliza a imagem inteira.
+            size (int): lado do hash.
+            thumbnail (tuple): largura e altura máximas da máscara; a faixa nunca é ampliada.
+            threshold (int): limiar de 0 a 255 acima do qual um pixel é considerado texto.
+
+        Returns:
+            tuple: o hash e os pixels da máscara, com a proporção de texto de cada um (0 a 255)."""
+    if not PILLOW_AVAILABLE:
+        raise ImportError("frame_signature requires Pillow (pip install Pillow).")
+    image = Image.open(io.BytesIO(img))
+    image.draft("L", (thumbnail[0] * 2, thumbnail[1] * 8))
+    image = image.convert("L")
+    if band is not None:
+        image = crop_band(image, band)
+    image = image.point([255 if level > threshold else 0 for level in range(256)])
+    thumbnail = (min(thumbnail[0], image.width), min(thumbnail[1], image.height))
+    mask = image.resize(thumbnail, Image.BOX)
+    return _dhash_image(mask, size), mask.tobytes()
+
+
+def mask_distance(a: bytes, b: bytes, tolerance: int=64) -> float:
+    """
+        Fração, entre os pixels com texto em ao menos uma das máscaras, dos que diferem em mais de tolerance níveis. Por ser relativa ao texto, e não à faixa inteira, não depende do tamanho da legenda. Máscaras de tamanhos diferentes são totalmente diferentes; duas máscaras sem texto são iguais."""
+    if len(a) != len(b) or len(a) == 0:
+        return 1.0
+    changed = text = 0
+    for x, y in zip(a, b):
+        if x > tolerance or y > tolerance:
+            text += 1
+            if abs(x - y) > tolerance:
+                changed += 1
+    return changed / text if text else 0.0
@@ -0,0 +1,65 @@
+from collections import deque
+from concurrent.futures import Executor
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import Callable, Iterable, Iterator
+
+
+def bounded_ordered_map(executor: Executor, func: Callable,
+                        iterable: Iterable, max_pending: int) -> Iterator:
+    """
+        Equivalente ao executor.map, mas consome o iterável aos poucos, mantendo no máximo max_pending tarefas submetidas. Os resultados são retornados na ordem do iterável.
+
+        Args:
+            executor (Executor): pool que executará as tarefas.
+            func (Callable): função aplicada a cada item.
+            iterable (Iterable): itens, eventualmente produzidos sob demanda.
+            max_pending (int): quantidade máxima de tarefas submetidas e ainda não consumidas."""
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def prefetch(iterable: Iterable, maxsize: int, poll_interval: float=0.1) -> Iterator:
+    """
+        Consome o iterável em uma thread auxiliar, armazenando até maxsize itens em uma fila, de modo que a produção dos próximos itens ocorra enquanto os anteriores são processados. Exceções da produção são relançadas ao consumidor.
+
+        Se o consumidor abandonar o gerador (break, exceção ou close), a thread auxiliar é sinalizada e para de produzir, em vez de permanecer bloqueada na fila cheia; por isso, a inserção na fila é feita com timeout de poll_interval segundos."""
+    queue = Queue(maxsize=maxsize)
+    stop = Event()
+    _ITEM, _ERROR, _END = range(3)
+
+    def put(entry: tuple) -> bool:
+        while not stop.is_set():
+            try:
+                queue.put(entry, timeout=poll_interval)
+                return True
+            except Full:
+                pass
+        return False
+
+    def producer() -> None:
+        try:
+            for item in iterable:
+                if not put((_ITEM, item)):
+                    return
+        except Exception as err:
+            put((_ERROR, err))
+        else:
+            put((_END, None))
+
+    Thread(target=producer, daemon=True).start()
+    try:
+        while True:
+            kind, item = queue.get()
+            if kind == _END:
+                return
+            if kind == _ERROR:
+                raise item
+            yield item
+    finally:
+        stop.set()
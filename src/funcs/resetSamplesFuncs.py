@@ -21,4 +21,7 @@ def db_cards_reset(source: str, key: str, source_before: list) -> None:
             key (str): chave/coluna que aloca a lista dos objetos MyCard criados em produção.
             source_before (list): lista da estrutura antes da submissão dos testes automatizados."""
     with shelve.open(source) as db:
+        for db_key in list(db.keys()):
+            if db_key.startswith(f"{key}:") or db_key.startswith(f"{key}#"):
+                del db[db_key]
         db[key] = source_before
\ No newline at end of file
@@ -0,0 +1,105 @@
+import os
+import re
+import html
+from typing import Iterator, List, Tuple
+
+SUBTITLE_EXTENSIONS = (".srt", ".vtt", ".ass", ".ssa")
+
+_TAG = re.compile(r"<[^>]*>")
+_ASS_OVERRIDE = re.compile(r"\{[^}]*\}")
+_WHITESPACE = re.compile(r"\s+")
+_TIMESTAMP = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})")
+
+
+def is_subtitle_file(file: str) -> bool:
+    return os.path.isfile(file) and str(file).lower().endswith(SUBTITLE_EXTENSIONS)
+
+
+def get_subtitle_files(path: str) -> List[str]:
+    """
+        Obtém os arquivos de legenda suportados (SRT, WebVTT e ASS/SSA). O caminho pode ser um único arquivo ou uma pasta, caso em que os arquivos são retornados em ordem alfabética, como episódios de uma temporada.
+
+        Args:
+            path (str) - arquivo ou pasta de legendas.
+
+        Returns:
+            list - caminhos dos arquivos de legenda."""
+    if os.path.isdir(path):
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        return [file for file in files if is_subtitle_file(file)]
+    if is_subtitle_file(path):
+        return [path]
+    print(f'\n\n"{path}" is not a valid subtitle file or folder.')
+    return []
+
+
+def normalize_timestamp(timestamp: str) -> str:
+    """
+        Converte as marcações de tempo dos diferentes formatos (00:01:02,500 no SRT, 01:02.500 no WebVTT e 0:01:02.50 no ASS) para HH:MM:SS.mmm."""
+    match = _TIMESTAMP.search(timestamp)
+    if match is None:
+        return timestamp.strip()
+    hours, minutes, seconds, fraction = match.groups()
+    millis = int(fraction.ljust(3, "0"))
+    return f"{int(hours or 0):02d}:{int(minutes):02d}:{int(seconds):02d}.{millis:03d}"
+
+
+def clean_cue_text(text: str) -> str:
+    """
+        Remove a marcação de uma fala (tags HTML/WebVTT, blocos de estilo do ASS e entidades HTML) e une suas linhas em uma única frase."""
+    text = text.replace("\\N", " ").replace("\\n", " ").replace("\\h", " ")
+    text = _ASS_OVERRIDE.sub("", text)
+    text = _TAG.sub("", text)
+    text = html.unescape(text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _iter_block_cues(lines: Iterator[str]) -> Iterator[Tuple[str, str]]:
+    start, text = None, []
+    for line in lines:
+        line = line.strip()
+        if "-->" in line:
+            start, text = normalize_timestamp(line.split("-->")[0]), []
+        elif line == "":
+            if start is not None and text:
+                yield start, clean_cue_text(" ".join(text))
+            start, text = None, []
+        elif start is not None:
+            text.append(line)
+    if start is not None and text:
+        yield start, clean_cue_text(" ".join(text))
+
+
+def _iter_ass_cues(lines: Iterator[str]) -> Iterator[Tuple[str, str]]:
+    in_events, fields = False, None
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            in_events = line.lower() == "[events]"
+            continue
+        if not in_events:
+            continue
+        if line.startswith("Format:"):
+            fields = [field.strip().lower() for field in line[7:].split(",")]
+        elif line.startswith("Dialogue:") and fields is not None:
+            values = line[9:].split(",", len(fields) - 1)
+            if len(values) != len(fields):
+                continue
+            cue = dict(zip(fields, values))
+            yield normalize_timestamp(cue.get("start", "")), clean_cue_text(cue.get("text", ""))
+
+
+def iter_subtitle_cues(file: str) -> Iterator[Tuple[str, str]]:
+    """
+        Gerador que lê, linha a linha, as falas de um arquivo de legenda SRT, WebVTT ou ASS/SSA, sem carregá-lo inteiramente na memória. A marcação é removida e as falas vazias são ignoradas.
+
+        Args:
+            file (str) - arquivo de legenda.
+
+        Yields:
+            tuple - o início da fala, no formato HH:MM:SS.mmm, e o texto da fala."""
+    parse = _iter_ass_cues if file.lower().endswith((".ass", ".ssa")) else _iter_block_cues
+    with open(file, "r", encoding="utf-8-sig", errors="replace") as f:
+        for start, text in parse(f):
+            if text != "":
+                yield start, text
@@ -1,6 +1,57 @@
 import os
 import json
-from typing import List
+import shutil
+import hashlib
+import tempfile
+import unicodedata
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+_CHECKPOINT_HEAD = 4096
+_APOSTROPHES = "'\u2019"
+
+def _is_txt_file(file: str) -> bool:
+    if not (os.path.isfile(file) and str(file).endswith(".txt")):
+        print(f'\n\n"{file}" is not a valid file or file path.')
+        return False
+    return True
+
+
+def iter_from_txt(file: str) -> Iterator[str]:
+    """
+        Gerador que obtém, linha a linha, as frases de um arquivo .txt, sem carregá-lo inteiramente na memória. Cada frase tem seus espaços em branco tratados e as linhas vazias são ignoradas.
+
+        Args:
+            file (str) - nome do arquivo que contém as frases.
+
+        Yields:
+            str - cada frase obtida do arquivo."""
+    if not _is_txt_file(file):
+        return
+    with open(file, "r", encoding="utf-8") as f:
+        for line in f:
+            phrase = line.strip()
+            if phrase != "":
+                yield phrase
+
+
+def normalize_phrase(phrase: str) -> str:
+    """
+        Normaliza a frase para comparação: forma Unicode NFKC, sem distinção de maiúsculas e minúsculas (casefold), sem pontuação e com os espaços em branco unificados.
+
+        Args:
+            phrase (str) - frase a ser normalizada.
+
+        Returns:
+            str - frase normalizada."""
+    phrase = unicodedata.normalize("NFKC", phrase).casefold()
+    chars = []
+    for char in phrase:
+        if char in _APOSTROPHES:
+            continue
+        chars.append(" " if unicodedata.category(char).startswith("P") else char)
+    return " ".join("".join(chars).split())
+
 
 def get_from_txt(file: str) -> List[str]:
     """
@@ -12,16 +63,104 @@ def get_from_txt(file: str) -> List[str]:
 
         Returns:
             list - lista contendo as frases obtidas do arquivo."""
-    phrases = []
-    if os.path.isfile(file) and str(file).endswith(".txt"):
-        with open(file, "r") as f:
-            phrases = [
-                line.strip() for line in f.read().split("\n") if line.strip() != ""
-            ]
-    else:
-        print(f'\n\n"{file}" is not a valid file or file path.')
-    return phrases
-        
+    return list(iter_from_txt(file))
+
+
+def iter_from_txt_offset(file: str, offset: int=0, 
+                            complete_only: bool=True) -> Iterator[Tuple[str, int]]:
+    """
+        Gerador que lê o arquivo .txt a partir da posição, em bytes, informada. Por padrão, somente linhas completas (terminadas em \\n) são lidas, pois a última linha pode estar sendo escrita por outro processo.
+
+        Args:
+            file (str) - nome do arquivo que contém as frases.
+            offset (int) - posição, em bytes, a partir da qual a leitura é feita.
+            complete_only (bool) - se falso, a última linha também é lida, mesmo sem \\n.
+
+        Yields:
+            tuple - a frase tratada (vazia para linhas em branco) e a posição, em bytes, do fim de sua linha."""
+    if not _is_txt_file(file):
+        return
+    with open(file, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if complete_only and not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            yield line.decode("utf-8").strip(), offset
+
+
+def txt_head_digest(file: str, offset: int) -> str:
+    """
+        SHA-1 do início do arquivo (até 4096 bytes, sem ultrapassar offset), utilizado para verificar se o arquivo foi substituído ou truncado desde uma leitura."""
+    with open(file, "rb") as f:
+        head = f.read(min(offset, _CHECKPOINT_HEAD))
+    return hashlib.sha1(head).hexdigest()
+
+
+def read_txt_checkpoint(file: str) -> int:
+    """
+        Obtém a posição, em bytes, registrada no checkpoint do arquivo. Se não houver checkpoint, ou se o arquivo tiver sido truncado ou substituído desde o registro, a leitura recomeça do início.
+
+        Args:
+            file (str) - nome do arquivo que contém as frases.
+
+        Returns:
+            int - posição a partir da qual o arquivo ainda não foi consumido."""
+    checkpoint_file = f"{file}{CHECKPOINT_SUFFIX}"
+    if not os.path.isfile(checkpoint_file) or not os.path.isfile(file):
+        return 0
+    try:
+        checkpoint = get_json(checkpoint_file)
+        offset = int(checkpoint["offset"])
+        head = checkpoint["head"]
+    except (ValueError, KeyError, TypeError):
+        return 0
+    if offset > os.path.getsize(file) or txt_head_digest(file, offset) != head:
+        return 0
+    return offset
+
+
+def write_txt_checkpoint(file: str, offset: int) -> None:
+    """
+        Registra, atomicamente, a posição, em bytes, até a qual o arquivo foi consumido.
+
+        Args:
+            file (str) - nome do arquivo que contém as frases.
+            offset (int) - posição do fim da última linha consumida."""
+    checkpoint = {"offset": offset, "head": txt_head_digest(file, offset)}
+    _replace_atomically(
+        f"{file}{CHECKPOINT_SUFFIX}", 
+        lambda f: f.write(json.dumps(checkpoint))
+    )
+
+
+def _replace_atomically(file: str, write: Callable) -> None:
+    directory = os.path.dirname(os.path.abspath(file))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            write(tmp)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        if os.path.exists(file):
+            shutil.copymode(file, tmp_path)
+        os.replace(tmp_path, file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def rewrite_txt_atomically(file: str, phrases: Iterable[str]) -> None:
+    """
+        Reescreve o arquivo com as frases fornecidas, uma por linha. A escrita é feita em um arquivo temporário no mesmo diretório, que substitui o original somente ao final, de modo que uma falha no meio da escrita não trunca o arquivo.
+
+        Args:
+            file (str) - nome do arquivo a ser reescrito.
+            phrases (Iterable[str]) - frases, eventualmente produzidas sob demanda a partir do próprio arquivo."""
+    def write(tmp) -> None:
+        for phrase in phrases:
+            tmp.write(f"{phrase}\n")
+    _replace_atomically(file, write)
 
 
 
@@ -75,7 +214,11 @@ def create_json_config_file(file_name: str) -> None:
 		"auto_executable_path": true
 	},
 	"imgPath": "",
-	"phrasesFile": "frases.txt"
+	"phrasesFile": "frases.txt",
+	"subtitlesPath": "",
+	"incrementalPhrases": false,
+	"database": "sqlite",
+	"ocrEngine": "vision"
 }'''
         )
 
@@ -91,6 +234,14 @@ def set_json_file(file, content: dict) -> None:
     serialized = json.dumps(content, indent=4)
     with open(file, 'w') as f:
         f.write(serialized)
+
+
+
+def set_json_file_atomically(file, content) -> None:
+    """
+        Grava o conteúdo serializado em JSON por meio de um arquivo temporário que substitui o original ao final. Um arquivo novo é criado com permissão apenas para o usuário."""
+    serialized = json.dumps(content, indent=4)
+    _replace_atomically(file, lambda f: f.write(serialized))
     
 
 
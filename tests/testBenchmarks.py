@@ -0,0 +1,240 @@
+"""BENCHMARKS DAS ETAPAS MAIS CUSTOSAS DA APLICAÇÃO. OS QUE DEPENDEM DE UM NAVEGADOR SÓ SÃO EXECUTADOS SE A VARIÁVEL DE AMBIENTE AUTOCARDS_BENCH_BROWSER FOR CONFIGURADA COM O NOME DO NAVEGADOR (ex.: chrome, firefox), COM O WEBDRIVER CORRESPONDENTE INSTALADO.
+"""
+import os
+import sys
+import time
+import subprocess
+import re
+import json
+import random
+import pathlib
+import tempfile
+import tracemalloc
+from importlib import import_module
+from unittest import TestCase, main, skipUnless
+
+from src.clss.cards import MyCard
+from src.clss.assistants import AnkiEditPageHandler
+from src.clss.cardWriter import DictBasedCardWriter
+from src.clss.cardDeliverers import SeleniumAnkiBot
+from src.clss.databases import SQLiteDatabase
+from src.clss.imageStages import BKTree
+from src.clss.sourceAdmins import MyCardShelveAdmin
+
+from . import SAMPLE_FOLDER
+
+BENCH_BROWSER = os.environ.get('AUTOCARDS_BENCH_BROWSER', '')
+STAND_IN_PAGE = os.path.join(SAMPLE_FOLDER, 'edit_page_stand_in.html')
+
+
+def create_headless_driver(browser: str):
+    webdriver = import_module(f'selenium.webdriver.{browser}.webdriver')
+    options = import_module(f'selenium.webdriver.{browser}.options').Options()
+    options.headless = True
+    return webdriver.WebDriver(options=options)
+
+
+@skipUnless(BENCH_BROWSER, 'AUTOCARDS_BENCH_BROWSER not configured.')
+class BenchSeleniumAnkiBotInsertCard(TestCase):
+    TOTAL_CARDS = 50
+
+    def setUp(self):
+        self.deliverer = SeleniumAnkiBot('_', '_')
+        self.deliverer._bot = create_headless_driver(BENCH_BROWSER)
+        self.deliverer._bot.get(pathlib.Path(STAND_IN_PAGE).resolve().as_uri())
+
+    def tearDown(self):
+        self.deliverer._bot.quit()
+
+    def test_per_card_latency(self):
+        cards = [MyCard(f'phrase {i}', 'bench') for i in range(self.TOTAL_CARDS)]
+        self.deliverer._card_list.extend(cards)
+        start = time.perf_counter()
+        for card in cards:
+            self.deliverer._insert_card(card)
+        elapsed = time.perf_counter() - start
+        per_card = elapsed / self.TOTAL_CARDS
+        print(f'\nSeleniumAnkiBot._insert_card: {per_card * 1000:.1f} ms/card')
+        self.assertEqual(self.deliverer.total_inserted, self.TOTAL_CARDS)
+        self.assertLess(per_card, 1)
+
+
+
+class BenchCardDelivererStatusUpdate(TestCase):
+    TOTAL_CARDS = 50000
+
+    def setUp(self):
+        self.cards = [
+            MyCard(f'synthetic phrase {i}', f'source {i % 100}') 
+            for i in range(self.TOTAL_CARDS)
+        ]
+
+    def test_mark_half_of_cards_inserted_and_handoff(self):
+        deliverer = SeleniumAnkiBot('_', '_')
+        start = time.perf_counter()
+        deliverer._add_cards(self.cards)
+        for card in self.cards[::2]:
+            deliverer._update_card(card)
+        card_list = deliverer.card_list
+        update = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            database = SQLiteDatabase()
+            db = MyCardShelveAdmin(os.path.join(tmp_dir, 'db'), 'cards', database)
+            start = time.perf_counter()
+            db.update_sources(card_list)
+            handoff = time.perf_counter() - start
+            pending = db.count_sources()
+            database.close()
+        print(f'\n{self.TOTAL_CARDS} cards: status update {update:.2f} s, '
+                f'MyCardShelveAdmin handoff {handoff:.2f} s')
+        self.assertEqual(pending, self.TOTAL_CARDS // 2)
+        self.assertLess(update, 5)
+
+
+
+
+class DictBasedCard:
+    """
+        Modelo de cartão anterior, com __dict__ por instância e igualdade por representation."""
+    def __init__(self, front, source, back=MyCard._DEFAULT_BACK):
+        self.front = front
+        self.back = back
+        self.source = source
+        self.inserted = False
+
+    @property
+    def representation(self) -> str:
+        return str({"front": self.front, "back": self.back,
+                    "source": self.source, "inserted": self.inserted})
+
+
+class BenchMyCardLayout(TestCase):
+    TOTAL_CARDS = 20000
+
+    def _allocated(self, card_class) -> int:
+        tracemalloc.start()
+        cards = [card_class(f'phrase {i}', 'source') for i in range(self.TOTAL_CARDS)]
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del cards
+        return allocated
+
+    def _comparison_time(self, cards, equal) -> float:
+        start = time.perf_counter()
+        for _ in range(5):
+            for a, b in zip(cards, cards[1:]):
+                equal(a, b)
+        return time.perf_counter() - start
+
+    def test_slotted_card_memory_and_comparison(self):
+        dict_based = self._allocated(DictBasedCard)
+        slotted = self._allocated(MyCard)
+        legacy_cards = [DictBasedCard(f'phrase {i}', 'source') for i in range(self.TOTAL_CARDS)]
+        cards = [MyCard(f'phrase {i}', 'source') for i in range(self.TOTAL_CARDS)]
+        legacy_cmp = self._comparison_time(
+            legacy_cards, lambda a, b: a.representation == b.representation)
+        slotted_cmp = self._comparison_time(cards, lambda a, b: a == b)
+        print(f'\n{self.TOTAL_CARDS} cards: memory {dict_based / 1024:.0f} KiB -> '
+                f'{slotted / 1024:.0f} KiB, comparisons {legacy_cmp:.3f} s -> {slotted_cmp:.3f} s')
+        self.assertLess(slotted, dict_based)
+        self.assertLess(slotted_cmp, legacy_cmp)
+
+
+class BenchDictBasedCardWriterIncremental(TestCase):
+    TOTAL_PHRASES = 5000
+
+    def test_interleaved_updates_and_writes(self):
+        writer = DictBasedCardWriter()
+        start = time.perf_counter()
+        for i in range(self.TOTAL_PHRASES):
+            writer.update_contents(f'phrase {i}', 'bench')
+            next(writer.iter_cards())
+        elapsed = time.perf_counter() - start
+        print(f'\n{self.TOTAL_PHRASES} interleaved writes: {elapsed:.2f} s')
+        self.assertEqual(len(writer.card_list), self.TOTAL_PHRASES)
+        self.assertLess(elapsed, 2)
+
+
+
+class BenchBKTreeLookup(TestCase):
+    TOTAL_HASHES = 10000
+    TOTAL_QUERIES = 200
+
+    def test_bk_tree_against_linear_scan(self):
+        rng = random.Random(0)
+        hashes = [rng.getrandbits(64) for _ in range(self.TOTAL_HASHES)]
+        queries = [rng.getrandbits(64) for _ in range(self.TOTAL_QUERIES)]
+        tree = BKTree()
+        for _hash in hashes:
+            tree.add(_hash)
+        start = time.perf_counter()
+        for query in queries:
+            tree.find(query, 4)
+        indexed = time.perf_counter() - start
+        start = time.perf_counter()
+        for query in queries:
+            [h for h in hashes if BKTree.distance(h, query) <= 4]
+        linear = time.perf_counter() - start
+        print(f'\n{self.TOTAL_HASHES} hashes, {self.TOTAL_QUERIES} queries: '
+                f'linear {linear:.2f} s -> BK-tree {indexed:.2f} s')
+        self.assertLess(indexed, linear)
+
+
+class BenchAnkiEditPageHandler(TestCase):
+    TOTAL_DECKS = 500
+    FILLER_SCRIPTS = 20000
+
+    def _legacy_deck_names(self, page_source):
+        flags = re.I | re.DOTALL | re.M
+        script = re.compile(r'(<script>.*</script>).+?', flags).findall(page_source)[-1]
+        editor = re.compile(r"editor\.decks =.*}};", flags).findall(script)[0]
+        names = re.compile(r'("name": "(\w|\s|[.-=])*").+?', flags).findall(editor)
+        return [name[0].split(':')[1].replace('"', '').strip() for name in names]
+
+    def test_deck_names_on_multi_megabyte_page(self):
+        decks = {str(i): {"name": f"deck {i}", "conf": 1} for i in range(self.TOTAL_DECKS)}
+        filler = '<script>var f = {"a": [1, 2, 3]};</script><div class="row">text</div>\n'
+        page = (filler * self.FILLER_SCRIPTS + 
+                f'<script>editor.decks = {json.dumps(decks)};</script>\n' + 
+                filler * self.FILLER_SCRIPTS)
+        start = time.perf_counter()
+        expected = self._legacy_deck_names(page)
+        legacy = time.perf_counter() - start
+        handler = AnkiEditPageHandler(re)
+        handler.page_source = page
+        start = time.perf_counter()
+        names = handler.return_resources()["deck_names"]
+        extracted = time.perf_counter() - start
+        start = time.perf_counter()
+        handler.return_resources()
+        cached = time.perf_counter() - start
+        print(f'\n{len(page) / 2**20:.1f} MiB page: regex {legacy * 1000:.0f} ms -> '
+                f'json {extracted * 1000:.1f} ms, cached {cached * 1000:.1f} ms')
+        self.assertEqual(names, expected)
+        self.assertLess(extracted, legacy)
+
+
+
+class BenchAppImport(TestCase):
+    IMPORT_APPS = (
+        'import time; start = time.perf_counter(); '
+        'import src.apps.scale2, src.apps.scale3, src.apps.scale4, src.apps.scale5, src.apps.scale6, src.apps.scale7; '
+        'print(time.perf_counter() - start)'
+    )
+
+    def test_importing_apps_is_fast_and_does_no_io(self):
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+        env = dict(os.environ, PYTHONPATH=root)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = subprocess.run([sys.executable, '-c', self.IMPORT_APPS], cwd=tmp_dir, 
+                                    env=env, stdout=subprocess.PIPE, check=True)
+            created = os.listdir(tmp_dir)
+        elapsed = float(result.stdout)
+        print(f'\nimport src.apps.scale2-7: {elapsed * 1000:.1f} ms')
+        self.assertEqual(created, [])
+        self.assertLess(elapsed, 0.5)
+
+
+
+if __name__ == "__main__":
+    main()
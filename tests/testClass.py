@@ -1,31 +1,105 @@
 import os
 import io
 import re
-from unittest import TestCase, mock, main
+import json
+import pickle
+import dataclasses
+import random
+import shelve
+import sqlite3
+import zipfile
+import tempfile
+import sys
+import time
+from importlib import import_module
+from unittest import TestCase, mock, main, skipUnless
 
 from src.clss.cards import MyCard
 from src.clss.autoFlashCards import AutoFlashCards
 from src.clss.cardWriter import DictBasedCardWriter
-from src.clss.cardDeliverers import SeleniumAnkiBot
+from src.clss.phraseIndex import PhraseIndex
+from src.clss.cardDeliverers import (SeleniumAnkiBot, 
+                                    AnkiPackageDeliverer, 
+                                    AnkiConnectDeliverer)
+from src.clss import assistants
 from src.clss.assistants import AnkiEditPageHandler
 from src.clss.webDriverConfigurator import WebDriverConfigurator
 from src.clss.error import DataConfigError
 from src.clss.applicationConfigurator import appConfigurator
-from src.clss.imageSources import LocalFolderSource
+from src.apps import create_text_extractor, lazy_automaton
+from src.clss.appConfig import AppConfig, load_config
+from src.clss.imageSources import LocalFolderSource, GoogleDriveSource
+from src.clss.myImageData import MyImageData
 from src.clss.mocks import (MockImageSource, 
                             MockWebDriverConfigurator,
-                            MockGoogleVision)
+                            MockGoogleVision,
+                            MockMemoryImageSource,
+                            MockLatencyTextExtractor,
+                            MockAnkiConnectServer)
+from src.clss.databases import SQLiteDatabase
+from src.clss.extractorCache import OCRResultCache, CachedTextExtractor
+from src.clss.offlineExtractors import TesseractOCR
+from src.clss.imageStages import SubtitleBandPreprocessor, PerceptualDedupStage, BKTree
+from src.clss.interfaces import TextExtractorInterface
 from src.clss.sourceAdmins import (MyCardShelveAdmin, 
+                                    DriveFileIdShelveAdmin,
                                     TextSourceAdmin, 
+                                    SubtitleSourceAdmin,
                                     ImageSourceAdmin)
 
-from src.funcs.textFunc import get_from_txt
+from src.funcs.textFunc import get_from_txt, get_json
+from src.funcs.imgFuncs import PILLOW_AVAILABLE
 from src.funcs.resetSamplesFuncs import text_source_reset, db_cards_reset
 
 from . import SAMPLE_FOLDER, config_file_path, filled_text_path, empty_text_path, img_folder_path
 
 
 
+class LegacyMyCard:
+    """
+        Reproduz o MyCard anterior à adoção de __slots__, cujo estado era o __dict__ do objeto."""
+    def __init__(self, front, source, back, inserted):
+        self.front = front
+        self.back = back
+        self.source = source
+        self.inserted = inserted
+
+LegacyMyCard.__module__ = MyCard.__module__
+LegacyMyCard.__qualname__ = MyCard.__qualname__
+
+
+
+class TestMyCard(TestCase):
+    def test__legacy_pickled_card_still_loads(self):
+        state = {'front': 'front', 'back': 'back', 'source': 'src', 'inserted': True}
+        with mock.patch('src.clss.cards.MyCard', LegacyMyCard):
+            legacy_pickle = pickle.dumps(LegacyMyCard('front', 'src', 'back', True))
+        card = pickle.loads(legacy_pickle)
+        self.assertIsInstance(card, MyCard)
+        self.assertEqual(card.representation, str(state))
+        self.assertEqual(card.key, MyCard('front', 'src', 'back').key)
+
+    def test__card_round_trips_through_pickle(self):
+        card = MyCard('front', 'src')
+        card.inserted = True
+        expected = pickle.loads(pickle.dumps(card))
+        self.assertEqual(expected.representation, card.representation)
+
+    def test__equality_and_hash_follow_identity(self):
+        card = MyCard('front', 'src')
+        other = MyCard('front', 'src')
+        other.inserted = True
+        self.assertEqual(card, other)
+        self.assertEqual(len({card, other, MyCard('front', 'other src')}), 2)
+
+    def test__identity_fields_are_immutable(self):
+        card = MyCard('front', 'src')
+        with self.assertRaises(AttributeError):
+            card.front = 'changed'
+        self.assertFalse(hasattr(card, '__dict__'))
+
+
+
 class TestDictBasedCardWriter(TestCase):
     def setUp(self):
         self.source = filled_text_path
@@ -62,6 +136,102 @@ class TestDictBasedCardWriter(TestCase):
         for card in card_list:
             self.assertEqual(isinstance(card, MyCard), True)
 
+    def test_repeated_calls_write_each_content_once(self):
+        self.writer.update_contents('first', self.source)
+        self.writer.return_written_cards()
+        self.writer.update_contents('second', self.source)
+        card_list = self.writer.return_written_cards()
+        self.assertEqual([card.front for card in card_list], ['first', 'second'])
+        self.assertEqual(self.writer.return_written_cards(), card_list)
+
+    def test_bounded_mode_yields_batches_without_keeping_cards(self):
+        writer = DictBasedCardWriter(keep_cards=False)
+        for i in range(5):
+            writer.update_contents(f'phrase {i}', self.source)
+        batches = [[card.front for card in batch] for batch in writer.iter_card_batches(2)]
+        self.assertEqual(batches, [['phrase 0', 'phrase 1'], ['phrase 2', 'phrase 3'], ['phrase 4']])
+        self.assertEqual(writer.card_list, [])
+        self.assertEqual(writer.return_written_cards(), [])
+        self.assertEqual(writer.contents, [])
+
+    def test_bounded_mode_keeps_contents_within_a_batch(self):
+        writer = DictBasedCardWriter(keep_cards=False)
+        retained = 0
+        for i in range(2000):
+            writer.update_contents(f'phrase {i}', self.source)
+            if i % 100 == 99:
+                retained = max(retained, len(writer.contents))
+                self.assertEqual(len(list(writer.iter_cards())), 100)
+        self.assertEqual(retained, 100)
+        self.assertEqual(writer.contents, [])
+
+
+
+class TestPhraseIndexWriter(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmp_dir.name, 'phrases.sqlite3')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, phrases, fuzzy=None) -> list:
+        index = PhraseIndex(self.index_path, fuzzy)
+        writer = DictBasedCardWriter(index)
+        for i, phrase in enumerate(phrases):
+            writer.update_contents(phrase, f'img{i}.jpg')
+        card_list = writer.return_written_cards()
+        self.contents = writer.contents
+        writer.commit_index()
+        index.close()
+        return [card.front for card in card_list]
+
+    def test_normalized_duplicates_across_sources_and_runs(self):
+        fronts = self._write(['Take this time, Francis.', 'take   this time francis'])
+        self.assertEqual(fronts, ['Take this time, Francis.'])
+        self.assertEqual(self.contents[1]['duplicate'], True)
+        self.assertEqual(self._write(['TAKE THIS TIME... FRANCIS!', 'Another line']), 
+                            ['Another line'])
+
+    def test_fuzzy_matching_is_optional(self):
+        self._write(["I don't know what colour it is"])
+        self.assertEqual(len(self._write(["I dont know what color it is"])), 1)
+        self.assertEqual(self._write(["I don't know what color it is."], fuzzy=0.9), [])
+
+    def test_phrases_are_indexed_only_when_committed(self):
+        index = PhraseIndex(self.index_path)
+        writer = DictBasedCardWriter(index)
+        for phrase in ['first', 'First!', 'second']:
+            writer.update_contents(phrase, 'src')
+        self.assertEqual(len(writer.return_written_cards()), 2)
+        self.assertEqual(len(index), 0)
+        index.close()
+        self.assertEqual(self._write(['first', 'second']), ['first', 'second'])
+        index = PhraseIndex(self.index_path)
+        with mock.patch.object(index, '_conn', wraps=index._conn) as conn:
+            for phrase in ['third', 'fourth', 'first']:
+                index.check_and_add(phrase)
+            self.assertEqual(index.commit(), 2)
+            statements = [c.args[0] for c in conn.execute.call_args_list]
+            self.assertTrue(all(sql.startswith('SELECT') for sql in statements))
+            conn.executemany.assert_called_once()
+        self.assertEqual(len(index), 4)
+        index.close()
+
+    def test_text_source_still_consumes_duplicates(self):
+        source = os.path.join(self.tmp_dir.name, 'frases.txt')
+        config = os.path.join(self.tmp_dir.name, 'config.json')
+        with open(config, 'w') as f:
+            json.dump({'phrasesFile': source}, f)
+        with open(source, 'w') as f:
+            f.write('Hello there.\nhello there\n')
+        index = PhraseIndex(self.index_path)
+        sourceAdmin = TextSourceAdmin(config, DictBasedCardWriter(index))
+        self.assertEqual(len(sourceAdmin.return_sources()), 1)
+        sourceAdmin.update_sources()
+        index.close()
+        self.assertEqual(get_from_txt(source), [])
+
 
 
 class TestTextSourceAdmin(TestCase):
@@ -99,6 +269,112 @@ class TestTextSourceAdmin(TestCase):
 
 
 
+class TestIncrementalTextSourceAdmin(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, 'frases.txt')
+        config = os.path.join(self.tmp_dir.name, 'config.json')
+        with open(config, 'w') as f:
+            json.dump({'phrasesFile': self.source}, f)
+        with open(self.source, 'w') as f:
+            f.write('first phrase\nsecond phrase\n')
+        self.config = config
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _run(self) -> list:
+        sourceAdmin = TextSourceAdmin(self.config, DictBasedCardWriter(keep_cards=False), 
+                                        incremental=True, batch_size=2)
+        cards = sourceAdmin.return_sources()
+        sourceAdmin.update_sources()
+        return [card.front for card in cards]
+
+    def _append(self, text: str) -> None:
+        with open(self.source, 'a') as f:
+            f.write(text)
+
+    def test_reads_only_lines_appended_since_last_run(self):
+        self.assertEqual(self._run(), ['first phrase', 'second phrase'])
+        self.assertEqual(self._run(), [])
+        self._append('third phrase\n\nfourth phrase\n')
+        self.assertEqual(self._run(), ['third phrase', 'fourth phrase'])
+        self.assertEqual(get_from_txt(self.source)[0], 'first phrase')
+
+    def test_incomplete_last_line_is_left_for_next_run(self):
+        self._append('third')
+        self.assertEqual(self._run(), ['first phrase', 'second phrase'])
+        self._append(' phrase\n')
+        self.assertEqual(self._run(), ['third phrase'])
+
+    def test_restarts_when_file_is_replaced(self):
+        self._run()
+        with open(self.source, 'w') as f:
+            f.write('new phrase\n')
+        self.assertEqual(self._run(), ['new phrase'])
+
+    def test_bounded_writer_rewrites_file_keeping_appended_lines(self):
+        sourceAdmin = TextSourceAdmin(self.config, DictBasedCardWriter(keep_cards=False), 
+                                        batch_size=1)
+        cards = sourceAdmin.return_sources()
+        self._append('third phrase\n')
+        sourceAdmin.update_sources()
+        self.assertEqual([card.front for card in cards], ['first phrase', 'second phrase'])
+        self.assertEqual(get_from_txt(self.source), ['third phrase'])
+
+    def test_file_replaced_during_run_is_not_rewritten(self):
+        sourceAdmin = TextSourceAdmin(self.config, DictBasedCardWriter(keep_cards=False))
+        sourceAdmin.return_sources()
+        with open(self.source, 'w') as f:
+            f.write('other phrase\nanother phrase\n')
+        sourceAdmin.update_sources()
+        self.assertEqual(get_from_txt(self.source), ['other phrase', 'another phrase'])
+
+
+
+class TestSubtitleSourceAdmin(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.season = os.path.join(self.tmp_dir.name, 'season')
+        os.mkdir(self.season)
+        self.episode = os.path.join(self.season, 'e01.srt')
+        with open(self.episode, 'w') as f:
+            f.write('1\n00:00:01,500 --> 00:00:03,000\n<i>Take this time,</i>\nFrancis.\n\n')
+        with open(os.path.join(self.season, 'notes.txt'), 'w') as f:
+            f.write('not a subtitle\n')
+        config = os.path.join(self.tmp_dir.name, 'config.json')
+        with open(config, 'w') as f:
+            json.dump({'subtitlesPath': self.season}, f)
+        self.sourceAdmin = SubtitleSourceAdmin(config, DictBasedCardWriter())
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_return_sources_writes_cards_with_cue_timestamp(self):
+        cards = self.sourceAdmin.return_sources()
+        self.assertEqual(len(cards), 1)
+        self.assertEqual(cards[0].front, 'Take this time, Francis.')
+        self.assertEqual(cards[0].source, f'{self.episode}@00:00:01.500')
+
+    def test_update_sources_keeps_subtitles_and_skips_processed_files(self):
+        empty = os.path.join(self.season, 'e02.vtt')
+        with open(empty, 'w') as f:
+            f.write('WEBVTT\n\n00:01.000 --> 00:02.000\n<i></i>\n\n')
+        self.sourceAdmin.return_sources()
+        self.sourceAdmin.update_sources()
+        self.assertEqual(sorted(os.listdir(self.season)), 
+                            ['e01.srt', 'e01.srt.checkpoint.json', 'e02.vtt',
+                             'e02.vtt.checkpoint.json', 'notes.txt'])
+        writer = DictBasedCardWriter()
+        self.sourceAdmin.writer = writer
+        self.assertEqual(self.sourceAdmin.return_sources(), [])
+        with open(self.episode, 'a') as f:
+            f.write('2\n00:00:04,000 --> 00:00:05,000\nNew line.\n\n')
+        cards = self.sourceAdmin.return_sources()
+        self.assertEqual([card.front for card in cards], ['Take this time, Francis.', 'New line.'])
+
+
+
 class TestMyCardShelveAdmin(TestCase):    
     def setUp(self):
         self.db_source = os.path.join(SAMPLE_FOLDER, "db_cards_test")
@@ -154,6 +430,99 @@ class TestMyCardShelveAdmin(TestCase):
         expected = db.update_sources(EMPTY_LIST)
         self.assertEqual(expected, None)
 
+    def test__legacy_card_list_is_migrated_to_records(self):
+        card_list = self.textAdmin.return_sources()
+        db_cards_reset(self.db_source, self.db_key, card_list)
+        db = MyCardShelveAdmin(self.db_source, self.db_key)
+        cards = [card.representation for card in card_list]
+        expected = [card.representation for card in db.return_sources()]
+        self.assertEqual(expected, cards)
+        with shelve.open(self.db_source) as shelf:
+            self.assertNotIn(self.db_key, shelf)
+
+    def test__same_card_is_stored_once(self):
+        db = MyCardShelveAdmin(self.db_source, self.db_key)
+        db.update_sources([MyCard('front', 'src')])
+        db.update_sources([MyCard('front', 'src'), MyCard('front', 'src')])
+        expected = len(db.return_sources())
+        self.assertEqual(expected, 1)
+
+
+
+class TestMyCardSQLiteAdmin(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database = SQLiteDatabase()
+        self.db_source = os.path.join(self.tmp_dir.name, "db_cards_test")
+        self.db = MyCardShelveAdmin(self.db_source, "test_key", self.database)
+        self.cards = [MyCard(f'front {i}', 'src') for i in range(10)]
+
+    def tearDown(self):
+        self.database.close()
+        self.tmp_dir.cleanup()
+
+    def test__storage_card_works_for_created_cards(self):
+        self.db.update_sources(self.cards)
+        cards = [card.representation for card in self.cards]
+        expected = [card.representation for card in self.db.return_sources()]
+        self.assertEqual(expected, cards)
+
+    def test__inserted_cards_are_removed(self):
+        self.db.update_sources(self.cards)
+        for card in self.cards[:-1]:
+            card.inserted = True
+        self.db.update_sources(self.cards)
+        expected = [card.front for card in self.db.return_sources()]
+        self.assertEqual(expected, ['front 9'])
+
+    def test__page_sources_returns_slice_in_insertion_order(self):
+        self.db.update_sources(self.cards)
+        expected = [card.front for card in self.db.page_sources(4, 3)]
+        self.assertEqual(expected, ['front 4', 'front 5', 'front 6'])
+        self.assertEqual(self.db.count_sources(), 10)
+
+    def test__existing_shelve_is_imported_once(self):
+        legacy_source = os.path.join(self.tmp_dir.name, "db")
+        with shelve.open(legacy_source) as db:
+            db["test_key"] = self.cards[:3]
+            db["ids"] = ['a']
+        database = SQLiteDatabase()
+        db = MyCardShelveAdmin(legacy_source, "test_key", database)
+        self.assertEqual([card.front for card in db.return_sources()], 
+                            ['front 0', 'front 1', 'front 2'])
+        self.assertEqual(DriveFileIdShelveAdmin(legacy_source, "ids", database).return_sources(), ['a'])
+        database.close()
+        names = os.listdir(self.tmp_dir.name)
+        self.assertIn("db.sqlite3", names)
+        self.assertTrue(all(name.endswith(".migrated") for name in names if not name.startswith("db.sqlite3")))
+        with shelve.open(legacy_source) as db:
+            db["test_key"] = self.cards[3:]
+        database = SQLiteDatabase()
+        db = MyCardShelveAdmin(legacy_source, "test_key", database)
+        self.assertEqual(db.count_sources(), 3)
+        database.close()
+
+    def test__imported_records_keep_insertion_order(self):
+        legacy_source = os.path.join(self.tmp_dir.name, "db")
+        legacy = MyCardShelveAdmin(legacy_source, "test_key")
+        legacy.update_sources(self.cards)
+        with shelve.open(legacy_source) as db:
+            keys = [key for key in db.keys() if key.startswith("test_key:")]
+            # sequências na ordem inversa à das keys do dbm
+            for seq, key in enumerate(reversed(keys), 1):
+                db[key] = (seq, db[key][1])
+            expected = [db[key][1].front for key in reversed(keys)]
+        database = SQLiteDatabase()
+        db = MyCardShelveAdmin(legacy_source, "test_key", database)
+        self.assertEqual([card.front for card in db.return_sources()], expected)
+        database.close()
+
+    def test__drive_file_id_admin_keeps_contract(self):
+        id_admin = DriveFileIdShelveAdmin(self.db_source, "ids", self.database)
+        self.assertEqual(id_admin.return_sources(), [])
+        id_admin.update_sources(['a', 'b'])
+        self.assertEqual(id_admin.return_sources(), ['a', 'b'])
+
 
 
 class TestSeleniumAnkiBot(TestCase):
@@ -174,6 +543,396 @@ class TestSeleniumAnkiBot(TestCase):
         expected = deliverer.card_list[0].inserted
         self.assertEqual(expected, True)   
 
+    def test__update_card_marks_only_first_pending_equal_card(self):
+        cards = [MyCard('_', '_'), MyCard('_', '_'), MyCard('other', '_')]
+        deliverer = SeleniumAnkiBot('_', '_')
+        deliverer._add_cards(cards)
+        deliverer._update_card(MyCard('_', '_'))
+        deliverer._update_card(MyCard('missing', '_'))
+        expected = [card.inserted for card in deliverer.card_list]
+        self.assertEqual(expected, [True, False, False])
+
+    @mock.patch('src.clss.cardDeliverers.sleep', create=True)
+    def test__insert_card_fills_fields_once_and_waits_for_editor(self, mocked_sleep):
+        card = MyCard('front', 'src')
+        bot = mock.Mock()
+        bot.execute_script.side_effect = [None, False, True]
+        deliverer = SeleniumAnkiBot('_', '_', poll_frequency=0.001)
+        deliverer._bot = bot
+        deliverer._card_list.append(card)
+        deliverer._insert_card(card)
+        fill_call = bot.execute_script.call_args_list[0]
+        self.assertEqual(fill_call.args[1], {'f0': 'front', 'f1': card.back})
+        self.assertEqual(bot.execute_script.call_count, 3)
+        mocked_sleep.assert_not_called()
+        self.assertEqual(deliverer.total_inserted, 1)
+        self.assertTrue(card.inserted)
+
+    def test__insert_card_is_not_counted_if_editor_never_clears(self):
+        card = MyCard('front', 'src')
+        bot = mock.Mock()
+        bot.execute_script.return_value = False
+        deliverer = SeleniumAnkiBot('_', '_', timeout=0.01, poll_frequency=0.001)
+        deliverer._bot = bot
+        deliverer._card_list.append(card)
+        deliverer._insert_card(card)
+        self.assertEqual(deliverer.total_inserted, 0)
+        self.assertFalse(card.inserted)
+
+
+
+class FakeElement:
+    def __init__(self, driver, tag_name, name=''):
+        self.driver = driver
+        self.tag_name = tag_name
+        self.name = name
+
+    def send_keys(self, keys):
+        self.driver.typed[self.name] = keys
+
+    def click(self):
+        self.driver.click(self.name)
+
+
+
+class FakeAnkiWebDriver:
+    """
+        Navegador falso que simula o login, os cookies de sessão e a página de edição do AnkiWeb."""
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.current_url = 'about:blank'
+        self.rendering = False
+        self.cookies = []
+        self.typed = {}
+        self.submits = 0
+        self.quitted = False
+        FakeAnkiWebDriver.instances.append(self)
+
+    @property
+    def logged_in(self):
+        return any(c['name'] == 'ankiweb' and c['value'] == 'valid' for c in self.cookies)
+
+    def implicitly_wait(self, seconds):
+        self.implicit_wait = seconds
+
+    def set_window_size(self, width, height): ...
+
+    def get(self, url):
+        if self.quitted:
+            raise RuntimeError('browser closed')
+        if url.endswith('/decks/') and not self.logged_in:
+            url = 'https://ankiweb.net/account/login'
+        self.current_url = url
+        self.rendering = url.endswith('/login')
+
+    def add_cookie(self, cookie):
+        self.cookies.append(dict(cookie))
+
+    def get_cookies(self):
+        return [dict(c) for c in self.cookies]
+
+    def click(self, name):
+        if name == 'submit':
+            self.submits += 1
+            if self.typed.get('password') == 'pw':
+                self.cookies = [{'name': 'ankiweb', 'value': 'valid', 'expiry': 1e10}]
+                self.current_url = 'https://ankiweb.net/decks/'
+        elif name == 'add':
+            self.current_url = 'https://ankiuser.net/edit/'
+
+    def find_element_by_css_selector(self, selector):
+        if 'email' in selector:
+            return FakeElement(self, 'input', 'email')
+        if 'password' in selector:
+            return FakeElement(self, 'input', 'password')
+        if 'submit' in selector:
+            return FakeElement(self, 'input', 'submit')
+        return FakeElement(self, 'button', 'save')
+
+    def find_elements(self, by, selector):
+        nav_links = [FakeElement(self, 'a', 'decks'), FakeElement(self, 'a', 'add')]
+        if self.current_url.endswith('/login'):
+            # a navegação é exibida antes do formulário de login
+            elements = nav_links if 'nav-link' in selector else []
+            if 'email' in selector and not self.rendering:
+                elements.append(FakeElement(self, 'input', 'email'))
+            self.rendering = False
+            return elements
+        if self.current_url.endswith('/decks/'):
+            if 'logout' in selector:
+                return [FakeElement(self, 'a', 'logout')]
+            return nav_links
+        return []
+
+    def find_element(self, by, value):
+        if by == 'css selector':
+            return self.find_element_by_css_selector(value)
+        if self.current_url.endswith('/edit/'):
+            return FakeElement(self, 'div', value)
+        from selenium.common.exceptions import NoSuchElementException
+        raise NoSuchElementException(value)
+
+    def execute_script(self, script, *args):
+        return True
+
+    def quit(self):
+        self.quitted = True
+
+
+
+class TestSeleniumAnkiBotSession(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.session_file = os.path.join(self.tmp_dir.name, 'session.json')
+        config = os.path.join(self.tmp_dir.name, 'config.json')
+        with open(config, 'w') as f:
+            json.dump({'login': {'email': 'email', 'password': 'pw'}, 
+                        'deck': {'name': ''}}, f)
+        self.config = load_config(config)
+        self.settings = {'driver': FakeAnkiWebDriver, 'web_driver_args': {}}
+        FakeAnkiWebDriver.instances = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _deliver(self, deliverer, phrase):
+        with mock.patch('builtins.print'):
+            deliverer.deliver([MyCard(phrase, 'src')])
+
+    def test_saved_cookies_skip_login_form_on_next_run(self):
+        self._deliver(SeleniumAnkiBot(self.settings, self.config, 
+                        session_file=self.session_file), 'first')
+        self.assertEqual(os.stat(self.session_file).st_mode & 0o777, 0o600)
+        deliverer = SeleniumAnkiBot(self.settings, self.config, session_file=self.session_file)
+        self._deliver(deliverer, 'second')
+        first, second = FakeAnkiWebDriver.instances
+        self.assertEqual((first.submits, second.submits), (1, 0))
+        self.assertTrue(second.quitted)
+        self.assertEqual(deliverer.total_inserted, 1)
+
+    def test_expired_session_falls_back_to_login(self):
+        with open(self.session_file, 'w') as f:
+            json.dump([{'name': 'ankiweb', 'value': 'expired'}], f)
+        deliverer = SeleniumAnkiBot(self.settings, self.config, session_file=self.session_file)
+        self._deliver(deliverer, 'first')
+        self.assertEqual(FakeAnkiWebDriver.instances[0].submits, 1)
+        self.assertEqual(get_json(self.session_file)[0]['value'], 'valid')
+        self.assertEqual(deliverer.total_inserted, 1)
+
+    def test_restored_session_is_saved_again(self):
+        with open(self.session_file, 'w') as f:
+            json.dump([{'name': 'ankiweb', 'value': 'valid', 'expiry': 1e10}], f)
+        deliverer = SeleniumAnkiBot(self.settings, self.config, session_file=self.session_file)
+        self._deliver(deliverer, 'first')
+        self.assertEqual(FakeAnkiWebDriver.instances[0].submits, 0)
+        self.assertEqual(get_json(self.session_file)[0]['expiry'], 10000000000)
+
+    def test_navigation_on_login_page_is_not_taken_for_session(self):
+        deliverer = SeleniumAnkiBot(self.settings, self.config, poll_frequency=0.001)
+        deliverer._bot = FakeAnkiWebDriver()
+        deliverer._bot.get('https://ankiweb.net/account/login')
+        self.assertFalse(deliverer._logged_in())
+
+    def test_driver_is_resolved_again_when_browser_fails_to_start(self):
+        from selenium.common.exceptions import SessionNotCreatedException
+        started = []
+
+        def driver(**kwargs):
+            if kwargs.get('executable_path') == 'stale':
+                raise SessionNotCreatedException('version mismatch')
+            started.append(kwargs['executable_path'])
+            return FakeAnkiWebDriver()
+
+        def reinstall_driver():
+            self.settings['web_driver_args']['executable_path'] = 'fresh'
+            return True
+
+        self.settings.update(driver=driver, reinstall_driver=reinstall_driver,
+                             web_driver_args={'executable_path': 'stale'})
+        deliverer = SeleniumAnkiBot(self.settings, self.config)
+        self._deliver(deliverer, 'first')
+        self.assertEqual(started, ['fresh'])
+        self.assertEqual(deliverer.total_inserted, 1)
+
+    def test_browser_uses_only_explicit_waits(self):
+        deliverer = SeleniumAnkiBot(self.settings, self.config, keep_alive=True)
+        self._deliver(deliverer, 'first')
+        self.assertEqual(FakeAnkiWebDriver.instances[0].implicit_wait, 0)
+        deliverer.close()
+
+    def test_keep_alive_reuses_browser_until_closed(self):
+        deliverer = SeleniumAnkiBot(self.settings, self.config, keep_alive=True)
+        self._deliver(deliverer, 'first')
+        self._deliver(deliverer, 'second')
+        self.assertEqual(len(FakeAnkiWebDriver.instances), 1)
+        browser = FakeAnkiWebDriver.instances[0]
+        self.assertEqual((browser.submits, browser.quitted), (1, False))
+        deliverer.close()
+        self.assertTrue(browser.quitted)
+        self.assertEqual(deliverer.total_inserted, 2)
+
+
+
+class TestAnkiEditPageHandler(TestCase):
+    DECKS = {"1": {"name": "Default", "conf": 1},
+             "2": {"name": "my deck", "conf": 1},
+             "3": {"name": "deck teste testando", "conf": 2},
+             "4": {"name": "dEcK 4.2 (ü)", "desc": "}};</script>"}}
+
+    def setUp(self):
+        self.handler = AnkiEditPageHandler(re)
+        self.handler.page_source = (
+            '<html><script>var x = "editor";</script>'
+            f'<script>editor.decks = {json.dumps(self.DECKS)};\n'
+            'editor.models = {};</script></html>'
+        )
+
+    def test__return_resources_names_and_backspace_times(self):
+        expected = {"deck_names": ['Default', 'my deck', 'deck teste testando', 'dEcK 4.2 (ü)'],
+                    "backspace_times": len('deck teste testando')}
+        self.assertEqual(self.handler.return_resources(), expected)
+
+    def test__deck_names_are_cached_per_page_source(self):
+        with mock.patch('src.clss.assistants.extract_deck_names',
+                        wraps=assistants.extract_deck_names) as extract:
+            self.handler.return_resources()
+            self.handler.return_resources()
+            self.handler.page_source += ' '
+            self.handler.return_resources()
+        self.assertEqual(extract.call_count, 2)
+
+    def test__page_without_decks_returns_no_names(self):
+        self.handler.page_source = '<script>editor.decks = {broken</script>'
+        self.assertEqual(self.handler.return_resources(),
+                            {"deck_names": [], "backspace_times": 0})
+
+
+
+class TestAnkiPackageDeliverer(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.deliverer = AnkiPackageDeliverer(self.tmp_dir.name, 'my deck')
+        self.cards = [MyCard(f'phrase {i}', 'src') for i in range(3)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _read_collection(self, query):
+        with zipfile.ZipFile(self.deliverer.package_path) as package:
+            self.assertEqual(package.read('media'), b'{}')
+            package.extract('collection.anki2', self.tmp_dir.name)
+        conn = sqlite3.connect(os.path.join(self.tmp_dir.name, 'collection.anki2'))
+        try:
+            return conn.execute(query).fetchall()
+        finally:
+            conn.close()
+
+    def test__deliver_writes_notes_and_cards_to_package(self):
+        self.deliverer.deliver(self.cards)
+        notes = self._read_collection('SELECT flds FROM notes ORDER BY id')
+        expected = [flds.split('\x1f')[0] for flds, in notes]
+        self.assertEqual(expected, ['phrase 0', 'phrase 1', 'phrase 2'])
+        cards = self._read_collection('SELECT did FROM cards')
+        self.assertEqual(cards, [(self.deliverer.deck_id,)] * 3)
+        decks = json.loads(self._read_collection('SELECT decks FROM col')[0][0])
+        self.assertEqual(decks[str(self.deliverer.deck_id)]['name'], 'my deck')
+
+    def test__deliver_marks_cards_inserted(self):
+        self.deliverer.deliver(self.cards)
+        self.assertEqual(self.deliverer.total_inserted, 3)
+        expected = [card.inserted for card in self.deliverer.card_list]
+        self.assertEqual(expected, [True, True, True])
+
+    def test__default_deck_is_not_duplicated(self):
+        deliverer = AnkiPackageDeliverer(self.tmp_dir.name)
+        self.deliverer = deliverer
+        deliverer.deliver(self.cards)
+        decks = json.loads(self._read_collection('SELECT decks FROM col')[0][0])
+        self.assertEqual({key: deck['name'] for key, deck in decks.items()}, {'1': 'Default'})
+        self.assertEqual(self._read_collection('SELECT DISTINCT did FROM cards'), [(1,)])
+
+    def test__deck_name_is_sanitized_in_file_name(self):
+        deliverer = AnkiPackageDeliverer(self.tmp_dir.name, 'english::movies/2024')
+        deliverer.deliver(self.cards)
+        self.assertEqual(os.path.dirname(deliverer.package_path), self.tmp_dir.name)
+        self.assertTrue(os.path.basename(deliverer.package_path).startswith('english-movies_2024-'))
+
+    def test__deliveries_in_same_second_create_distinct_packages(self):
+        with mock.patch('src.clss.cardDeliverers.time', return_value=1700000000):
+            self.deliverer.deliver(self.cards[:1])
+            first = self.deliverer.package_path
+            self.deliverer.deliver(self.cards[1:])
+        self.assertNotEqual(first, self.deliverer.package_path)
+        self.assertTrue(self.deliverer.package_path.endswith('-1.apkg'))
+        notes = self._read_collection('SELECT flds FROM notes')
+        self.assertEqual(len(notes), 2)
+
+
+
+class TestAnkiConnectDeliverer(TestCase):
+    def test__cards_are_sent_in_batches_over_one_connection(self):
+        cards = [MyCard(f'phrase {i}', 'src') for i in range(25)]
+        with MockAnkiConnectServer() as server:
+            deliverer = AnkiConnectDeliverer('my deck', server.url, batch_size=10)
+            deliverer.deliver(cards)
+        actions = [r['action'] for r in server.requests]
+        self.assertEqual(actions, ['createDeck'] + ['canAddNotesWithErrorDetail', 'addNotes'] * 3)
+        batches = [len(r['params']['notes']) for r in server.requests[2::2]]
+        self.assertEqual(batches, [10, 10, 5])
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(deliverer.total_inserted, 25)
+
+    def test__repeated_front_in_batch_is_sent_once_and_delivered(self):
+        cards = [MyCard('repeated', 'a'), MyCard('repeated', 'b'), MyCard('new', 'c')]
+        with MockAnkiConnectServer() as server:
+            deliverer = AnkiConnectDeliverer('my deck', server.url)
+            deliverer.deliver(cards)
+        expected = [card.inserted for card in deliverer.card_list]
+        self.assertEqual(expected, [True, True, True])
+        self.assertEqual(len(server.requests[-1]['params']['notes']), 2)
+        self.assertEqual(deliverer.total_inserted, 2)
+
+    def test__invalid_note_stays_pending(self):
+        cards = [MyCard('', 'a'), MyCard('new', 'b')]
+        with MockAnkiConnectServer() as server:
+            deliverer = AnkiConnectDeliverer('my deck', server.url)
+            deliverer.deliver(cards)
+        expected = [card.inserted for card in deliverer.card_list]
+        self.assertEqual(expected, [False, True])
+
+    def test__note_already_in_collection_is_delivered_without_blocking_batch(self):
+        for null_per_note, error_detail in ((False, True), (True, True), (False, False)):
+            cards = [MyCard('existing', 'a'), MyCard('new', 'b'), MyCard('other', 'c')]
+            with MockAnkiConnectServer(null_per_note, error_detail) as server:
+                server.fronts.add('existing')
+                deliverer = AnkiConnectDeliverer('my deck', server.url)
+                with mock.patch('builtins.print'):
+                    deliverer.deliver(cards)
+            expected = [card.inserted for card in deliverer.card_list]
+            self.assertEqual(expected, [True, True, True])
+            self.assertEqual(deliverer.total_inserted, 2)
+            self.assertEqual(server.fronts, {'existing', 'new', 'other'})
+
+    def test__rejected_batch_is_reconciled_with_note_states(self):
+        cards = [MyCard('raced', 'a'), MyCard('new', 'b')]
+        with MockAnkiConnectServer() as server:
+            reply = server.reply
+            def racing_reply(request):
+                if request['action'] == 'addNotes':
+                    server.fronts.add('raced')
+                return reply(request)
+            server.reply = racing_reply
+            deliverer = AnkiConnectDeliverer('my deck', server.url)
+            with mock.patch('builtins.print'):
+                deliverer.deliver(cards)
+        actions = [r['action'] for r in server.requests]
+        self.assertEqual(actions, ['createDeck', 'canAddNotesWithErrorDetail', 'addNotes', 
+                                    'canAddNotesWithErrorDetail'])
+        expected = [card.inserted for card in deliverer.card_list]
+        self.assertEqual(expected, [True, True])
+        self.assertEqual(server.fronts, {'raced', 'new'})
+
 
 
 class TestAutoFlashCards(TestCase):
@@ -259,6 +1018,349 @@ class TestImageSourceAdmin(TestCase):
         mocked.assert_called_once_with(imgs_list)
 
 
+class TestConcurrentImageSourceAdmin(TestCase):
+    def setUp(self):
+        imgs_data = [
+            MyImageData(bytes(f'phrase {i}', 'utf-8'), source=f'img{i}.jpg')
+            for i in range(8)
+        ]
+        self.imgSource = MockMemoryImageSource(imgs_data)
+
+    def _timed_return_sources(self, max_workers, failing=None):
+        extractor = MockLatencyTextExtractor(0.05, failing)
+        imgAdmin = ImageSourceAdmin(self.imgSource, DictBasedCardWriter(),
+                                    extractor, max_workers=max_workers)
+        start = time.perf_counter()
+        card_list = imgAdmin.return_sources()
+        return card_list, time.perf_counter() - start
+
+    def test__concurrent_extraction_is_faster_than_serial(self):
+        _, serial = self._timed_return_sources(1)
+        _, concurrent = self._timed_return_sources(8)
+        self.assertLess(concurrent * 3, serial)
+
+    def test__cards_keep_source_order(self):
+        card_list, _ = self._timed_return_sources(4)
+        expected = [card.front for card in card_list]
+        self.assertEqual(expected, [f'phrase {i}' for i in range(8)])
+
+    def test__failed_image_is_skipped(self):
+        card_list, _ = self._timed_return_sources(4, [b'phrase 3'])
+        expected = [card.source for card in card_list]
+        self.assertNotIn('img3.jpg', expected)
+        self.assertEqual(len(expected), 7)
+
+
+
+class TestStreamingImageSourceAdmin(TestCase):
+    def setUp(self):
+        imgs_data = [
+            MyImageData(bytes(f'phrase {i}', 'utf-8'), source=f'img{i}.jpg')
+            for i in range(6)
+        ]
+        self.imgSource = MockMemoryImageSource(imgs_data, latency=0.03)
+
+    def _timed_return_sources(self, prefetch):
+        extractor = MockLatencyTextExtractor(0.03)
+        imgAdmin = ImageSourceAdmin(self.imgSource, DictBasedCardWriter(),
+                                    extractor, prefetch=prefetch)
+        start = time.perf_counter()
+        card_list = imgAdmin.return_sources()
+        return card_list, time.perf_counter() - start
+
+    def test__prefetch_overlaps_fetch_and_extraction(self):
+        _, serial = self._timed_return_sources(0)
+        card_list, overlapped = self._timed_return_sources(2)
+        self.assertLess(overlapped, serial * 0.8)
+        expected = [card.front for card in card_list]
+        self.assertEqual(expected, [f'phrase {i}' for i in range(6)])
+
+    def test__source_error_reaches_caller(self):
+        def broken_images():
+            yield MyImageData(b'phrase', source='img.jpg')
+            raise DataConfigError('imgPath')
+        self.imgSource.iter_images = broken_images
+        imgAdmin = ImageSourceAdmin(self.imgSource, DictBasedCardWriter(),
+                                    MockLatencyTextExtractor(0), prefetch=2)
+        with self.assertRaises(DataConfigError):
+            imgAdmin.return_sources()
+
+
+
+class RecordingTextExtractor(TextExtractorInterface):
+    def __init__(self):
+        self.received = []
+
+    def img_to_str(self, img: bytes) -> str:
+        self.received.append(img)
+        return f'text {len(self.received)}'
+
+
+
+@skipUnless(PILLOW_AVAILABLE, 'Pillow not installed.')
+class TestSubtitleBandPreprocessor(TestCase):
+    def setUp(self):
+        from PIL import Image
+        frame = Image.frombytes('RGB', (1920, 1080), os.urandom(1920 * 1080 * 3))
+        buffer = io.BytesIO()
+        frame.save(buffer, format='PNG')
+        self.frame = buffer.getvalue()
+        self.extractor = RecordingTextExtractor()
+
+    def _return_sources(self, imgs_data, stages):
+        imgAdmin = ImageSourceAdmin(MockMemoryImageSource(imgs_data), DictBasedCardWriter(), 
+                                    self.extractor, stages=stages)
+        with mock.patch('builtins.print'):
+            return imgAdmin.return_sources()
+
+    def test_extractor_receives_shrunk_subtitle_band(self):
+        from PIL import Image
+        stage = SubtitleBandPreprocessor()
+        card_list = self._return_sources([MyImageData(self.frame, source='img.png')], [stage])
+        self.assertEqual(card_list[0].source, 'img.png')
+        received = Image.open(io.BytesIO(self.extractor.received[0]))
+        self.assertEqual((received.size, received.mode), ((960, 162), 'L'))
+        self.assertEqual(stage.stats['bytes_before'], len(self.frame))
+        self.assertLess(stage.stats['bytes_after'] * 3, stage.stats['bytes_before'])
+
+    def test_undecodable_image_is_sent_unchanged(self):
+        stage = SubtitleBandPreprocessor()
+        self._return_sources([MyImageData(b'not an image', source='img.png')], [stage])
+        self.assertEqual(self.extractor.received, [b'not an image'])
+        self.assertEqual(stage.stats['failed'], 1)
+
+    def test_stage_returning_None_drops_image(self):
+        dropper = mock.Mock()
+        dropper.process.side_effect = lambda data: None if data.source == 'a.png' else data
+        card_list = self._return_sources(
+            [MyImageData(b'a', source='a.png'), MyImageData(b'b', source='b.png')], [dropper])
+        self.assertEqual([card.source for card in card_list], ['b.png'])
+
+
+
+class TestBKTree(TestCase):
+    def test_find_matches_linear_scan(self):
+        rng = random.Random(7)
+        hashes = [rng.getrandbits(64) for _ in range(500)]
+        hashes += [h ^ (1 << rng.randrange(64)) for h in hashes[:100]]
+        tree = BKTree()
+        for _hash in hashes:
+            tree.add(_hash)
+        for query in hashes[:50] + [rng.getrandbits(64) for _ in range(50)]:
+            expected = sorted(h for h in hashes if BKTree.distance(h, query) <= 3)
+            self.assertEqual(sorted(tree.find(query, 3)), expected)
+        self.assertEqual(len(tree), 600)
+
+
+
+@skipUnless(PILLOW_AVAILABLE, 'Pillow not installed.')
+class TestPerceptualDedupStage(TestCase):
+    def _frame(self, seed: int, quality: int=90) -> bytes:
+        from PIL import Image, ImageDraw
+        rng = random.Random(seed)
+        image = Image.new('RGB', (1280, 720), (0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(1120), rng.randrange(640)
+            draw.rectangle((x, y, x + 160, y + 80), fill=(255, 255, 255))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality)
+        return buffer.getvalue()
+
+    def test_near_duplicates_are_dropped_and_removed_from_source(self):
+        imgs_data = [
+            MyImageData(self._frame(1), source='a.jpg'),
+            MyImageData(self._frame(1, quality=60), source='a_again.jpg'),
+            MyImageData(self._frame(2), source='b.jpg'),
+        ]
+        imgSource = MockMemoryImageSource(imgs_data)
+        imgSource.remove_images = mock.Mock()
+        stage = PerceptualDedupStage()
+        imgAdmin = ImageSourceAdmin(imgSource, DictBasedCardWriter(), 
+                                    RecordingTextExtractor(), stages=[stage])
+        with mock.patch('builtins.print'):
+            card_list = imgAdmin.return_sources()
+        imgAdmin.update_sources()
+        self.assertEqual([card.source for card in card_list], ['a.jpg', 'b.jpg'])
+        self.assertEqual(stage.stats['ocr_calls_avoided'], 1)
+        imgSource.remove_images.assert_called_once_with(['a.jpg', 'b.jpg', 'a_again.jpg'])
+
+    def _subtitled_frame(self, text: str, shift: int=0, noise: int=0) -> bytes:
+        from PIL import Image, ImageDraw, ImageFont
+        rng = random.Random(3)
+        image = Image.new('RGB', (1920, 1080), (40, 60, 80))
+        draw = ImageDraw.Draw(image)
+        for _ in range(30):
+            x, y = rng.randrange(1800) + shift, rng.randrange(700)
+            draw.rectangle((x, y, x + rng.randrange(50, 400), y + rng.randrange(50, 300)),
+                            fill=tuple(rng.randrange(256) for _ in range(3)))
+        pixels, noise_rng = image.load(), random.Random(noise)
+        for _ in range(noise):
+            pixels[noise_rng.randrange(1920), noise_rng.randrange(1080)] = \
+                tuple(noise_rng.randrange(256) for _ in range(3))
+        try:
+            font = ImageFont.load_default(size=36)
+        except TypeError:
+            font = ImageFont.load_default()
+        draw.text((960, 950), text, fill=(255, 255, 255), font=font, anchor='mm')
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=90)
+        return buffer.getvalue()
+
+    def test_different_subtitles_on_same_background_are_kept(self):
+        imgs_data = [
+            MyImageData(self._subtitled_frame('I told you not to come back here.'), source='a.jpg'),
+            MyImageData(self._subtitled_frame('Where were you last night?'), source='b.jpg'),
+        ]
+        stage = PerceptualDedupStage()
+        imgAdmin = ImageSourceAdmin(MockMemoryImageSource(imgs_data), DictBasedCardWriter(), 
+                                    RecordingTextExtractor(), stages=[stage])
+        with mock.patch('builtins.print'):
+            card_list = imgAdmin.return_sources()
+        self.assertEqual([card.source for card in card_list], ['a.jpg', 'b.jpg'])
+        self.assertEqual(stage.stats['ocr_calls_avoided'], 0)
+
+    def test_same_subtitle_over_moving_background_is_dropped(self):
+        text = 'I told you not to come back here.'
+        imgs_data = [MyImageData(self._subtitled_frame(text), source='a.jpg')]
+        imgs_data += [
+            MyImageData(self._subtitled_frame(text, shift=shift), source=f'shift{shift}.jpg')
+            for shift in (1, 2, 4, 8)
+        ]
+        imgs_data.append(MyImageData(self._subtitled_frame(text, noise=20000), source='noisy.jpg'))
+        imgs_data.append(MyImageData(self._subtitled_frame('I told you not to come back there.', 
+                                                            shift=4), source='b.jpg'))
+        stage = PerceptualDedupStage()
+        kept = [data.source for data in imgs_data if stage.process(data) is not None]
+        self.assertEqual(kept, ['a.jpg', 'b.jpg'])
+        self.assertEqual(stage.stats['ocr_calls_avoided'], 5)
+
+    def test_duplicate_is_kept_while_its_match_is_not_consumed(self):
+        imgs_data = [
+            MyImageData(self._frame(1), source='a.jpg'),
+            MyImageData(self._frame(1), source='a_again.jpg'),
+        ]
+        imgSource = MockMemoryImageSource(imgs_data)
+        imgSource.remove_images = mock.Mock()
+        extractor = mock.Mock()
+        extractor.img_to_str.side_effect = Exception('quota exceeded')
+        imgAdmin = ImageSourceAdmin(imgSource, DictBasedCardWriter(), extractor,
+                                    stages=[PerceptualDedupStage()])
+        with mock.patch('builtins.print'):
+            self.assertEqual(imgAdmin.return_sources(), [])
+        imgAdmin.update_sources()
+        imgSource.remove_images.assert_called_once_with([])
+
+
+
+class TestCachedTextExtractor(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, 'ocr_cache.sqlite3')
+        self.cache = OCRResultCache(self.cache_path)
+        self.extractor = MockLatencyTextExtractor(0)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    @mock.patch('src.clss.mocks.MockLatencyTextExtractor.img_to_str', return_value='text')
+    def test__repeated_image_is_extracted_once(self, mocked):
+        cached = CachedTextExtractor(self.extractor, self.cache)
+        cached.img_to_str(b'img')
+        expected = cached.img_to_str(b'img')
+        self.assertEqual(expected, 'text')
+        mocked.assert_called_once_with(b'img')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test__cache_persists_between_runs(self):
+        CachedTextExtractor(self.extractor, self.cache).img_to_str(b'img')
+        self.cache.close()
+        self.cache = OCRResultCache(self.cache_path)
+        self.assertEqual(self.cache.get(self.cache.digest(b'img')), 'img')
+
+    def test__failed_extraction_is_not_cached(self):
+        extractor = MockLatencyTextExtractor(0, [b'img'])
+        cached = CachedTextExtractor(extractor, self.cache)
+        with self.assertRaises(Exception):
+            cached.img_to_str(b'img')
+        self.assertEqual(len(self.cache), 0)
+
+    def test__least_recently_accessed_entries_are_evicted(self):
+        self.cache.max_entries = 2
+        self.cache.set('a', 'a')
+        self.cache.set('b', 'b')
+        self.cache.get('a')
+        self.cache.set('c', 'c')
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(len(self.cache), 2)
+
+    def test__accesses_are_written_in_batches(self):
+        self.cache.flush_every = 3
+        for key in 'abc':
+            self.cache.set(key, key)
+        with mock.patch.object(self.cache, '_conn', wraps=self.cache._conn) as conn:
+            self.cache.get('a')
+            self.cache.get('b')
+            self.cache.get('a')
+            conn.commit.assert_not_called()
+            self.cache.get('c')
+            conn.commit.assert_called_once()
+            conn.executemany.assert_called_once()
+
+    def test__eviction_waits_for_the_margin(self):
+        self.cache.max_entries = 10
+        self.cache.evict_margin = 0.2
+        for key in 'abcdefghijkl':
+            self.cache.set(key, key)
+        self.assertEqual(len(self.cache), 12)
+        self.cache.set('m', 'm')
+        self.assertEqual(len(self.cache), 10)
+        self.assertIsNone(self.cache.get('a'))
+
+    def test__expired_entries_are_evicted(self):
+        self.cache.set('a', 'a')
+        self.cache.max_age = -1
+        self.cache.evict()
+        self.assertEqual(len(self.cache), 0)
+
+
+
+class TestTesseractOCR(TestCase):
+    FAKE_TESSERACT = (
+        'import sys, time\n'
+        'img = sys.stdin.buffer.read()\n'
+        'if img == b"slow": time.sleep(5)\n'
+        'if img == b"broken": sys.exit("cannot read image")\n'
+        'print(img.decode(), sys.argv[1:3])\n'
+    )
+
+    def setUp(self):
+        self.extractor = TesseractOCR(
+            [sys.executable, '-c', self.FAKE_TESSERACT], 
+            timeout=1, max_workers=2, preprocess=False
+        )
+
+    def tearDown(self):
+        self.extractor.close()
+
+    def test_img_to_str_reads_tesseract_stdout(self):
+        text = self.extractor.img_to_str(b'hello\nthere')
+        self.assertEqual(text, "hello there ['stdin', 'stdout']")
+
+    def test_imgs_to_str_keeps_order_across_processes(self):
+        imgs = [f'phrase {i}'.encode() for i in range(6)]
+        texts = self.extractor.imgs_to_str(imgs)
+        self.assertEqual([t.split(' [')[0] for t in texts], 
+                        [img.decode() for img in imgs])
+
+    def test_timeout_and_failure_return_None(self):
+        texts = self.extractor.imgs_to_str([b'slow', b'broken', b'ok'])
+        self.assertEqual(texts[:2], [None, None])
+        self.assertTrue(texts[2].startswith('ok'))
+
+
+
 class TestWebDriverConfigurator(TestCase):
     def setUp(self):
         self.wdconfig = WebDriverConfigurator(config_file_path)
@@ -306,6 +1408,41 @@ class TestWebDriverConfigurator(TestCase):
         with self.assertRaises(DataConfigError):
             self.wdconfig._browser_import_handler()
 
+    @mock.patch('webdriver_manager.chrome.ChromeDriverManager')
+    def test_driver_is_resolved_again_only_when_browser_version_changes(self, manager):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            driver = os.path.join(tmp_dir, 'chromedriver')
+            open(driver, 'w').close()
+            manager.return_value.install.return_value = driver
+            cache_file = os.path.join(tmp_dir, 'cache.json')
+            versions = ['90.0.1', '90.0.1', None, '91.0.2']
+            with mock.patch('src.clss.webDriverConfigurator.get_browser_version', 
+                            side_effect=versions):
+                for _ in versions:
+                    wdconfig = WebDriverConfigurator(config_file_path, cache_file)
+                    wdconfig._install_driver_handler()
+                    path = wdconfig.web_driver_settings["web_driver_args"]["executable_path"]
+                    self.assertEqual(path, driver)
+            self.assertEqual(manager.return_value.install.call_count, 2)
+            self.assertEqual(get_json(cache_file)["chrome"]["browser_version"], '91.0.2')
+
+    @mock.patch('webdriver_manager.chrome.ChromeDriverManager')
+    def test_reinstall_driver_discards_cached_executable(self, manager):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stale, fresh = os.path.join(tmp_dir, 'stale'), os.path.join(tmp_dir, 'fresh')
+            for driver in (stale, fresh):
+                open(driver, 'w').close()
+            manager.return_value.install.side_effect = [stale, fresh]
+            cache_file = os.path.join(tmp_dir, 'cache.json')
+            with mock.patch('src.clss.webDriverConfigurator.get_browser_version', 
+                            return_value='91.0.2'):
+                wdconfig = WebDriverConfigurator(config_file_path, cache_file)
+                wdconfig._install_driver_handler()
+                self.assertTrue(wdconfig.web_driver_settings["reinstall_driver"]())
+            path = wdconfig.web_driver_settings["web_driver_args"]["executable_path"]
+            self.assertEqual(path, fresh)
+            self.assertEqual(get_json(cache_file)["chrome"]["executable_path"], fresh)
+
 
 
 class TestAppConfigurator(TestCase):
@@ -323,6 +1460,28 @@ class TestAppConfigurator(TestCase):
         expected = type(app.automaton)
         self.assertEqual(expected, AutoFlashCards)
 
+    def test_importing_apps_builds_nothing(self):
+        for name in ('scale2', 'scale3', 'scale4', 'scale5', 'scale6', 'scale7'):
+            with mock.patch('src.clss.appConfig.load_config') as mocked:
+                app = import_module(f'src.apps.{name}')
+                mocked.assert_not_called()
+            self.assertTrue(callable(app.build_automaton))
+            with self.assertRaises(AttributeError):
+                app.missing
+
+    def test_automaton_is_built_once_on_first_access(self):
+        build = mock.Mock(return_value=object())
+        module_getattr = lazy_automaton('app', build)
+        self.assertIs(module_getattr('automaton'), module_getattr('automaton'))
+        build.assert_called_once()
+
+    def test_ocr_engine_selects_text_extractor(self):
+        config = mock.Mock(ocr_engine='tesseract')
+        with mock.patch('src.clss.extractorCache.OCRResultCache') as cache:
+            extractor = create_text_extractor(config)
+        self.assertIsInstance(extractor.extractor, TesseractOCR)
+        cache.assert_called_once_with('ocr_cache_tesseract.sqlite3')
+
     def test_raise_error_if_not_given_name(self):
         file = 'config_with_no_app_name.json'
         path = os.path.join(SAMPLE_FOLDER, file)
@@ -332,6 +1491,74 @@ class TestAppConfigurator(TestCase):
         
 
 
+class TestAppConfig(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'config.json')
+        self._dump({
+            'login': {'email': 'email', 'password': 'pw'},
+            'deck': {'deck_name': 'Legendas', 'new_deck': True},
+            'phrasesFile': 'frases.txt'
+        })
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _dump(self, content: dict, mtime: float=None) -> None:
+        with open(self.path, 'w') as f:
+            json.dump(content, f)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_parsed_once_until_file_changes(self):
+        with mock.patch('src.clss.appConfig.get_json', wraps=get_json) as mocked:
+            config = load_config(self.path)
+            self.assertIs(load_config(self.path), config)
+            sourceAdmin = TextSourceAdmin(self.path, DictBasedCardWriter())
+            self.assertEqual(sourceAdmin.source, 'frases.txt')
+            self.assertEqual(mocked.call_count, 1)
+            self._dump({'phrasesFile': 'other.txt'}, mtime=time.time() + 10)
+            self.assertEqual(config.current().phrases_file, 'other.txt')
+            self.assertEqual(mocked.call_count, 2)
+
+    def test_typed_and_immutable(self):
+        config = load_config(self.path)
+        self.assertEqual((config.deck.name, config.deck.new_deck), ('Legendas', True))
+        self.assertEqual(config.login.email, 'email')
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            config.phrases_file = 'other.txt'
+
+    def test_missing_keys_are_reported_at_construction(self):
+        config = load_config(self.path)
+        with self.assertRaisesRegex(DataConfigError, 'imgPath'):
+            LocalFolderSource(config)
+        with self.assertRaisesRegex(DataConfigError, 'web_driver_user_settings'):
+            WebDriverConfigurator(config)
+        self._dump({'deck': {'name': ''}}, mtime=time.time() + 10)
+        with self.assertRaisesRegex(DataConfigError, 'login'):
+            SeleniumAnkiBot('_', load_config(self.path))
+
+    def test_malformed_section_raises_DataConfigError(self):
+        self._dump({'login': {'email': 'email'}})
+        with self.assertRaisesRegex(DataConfigError, 'login'):
+            load_config(self.path)
+
+    def test_database_engine_defaults_to_sqlite(self):
+        self.assertEqual(load_config(self.path).database, 'sqlite')
+        self._dump({'database': 'mysql'}, mtime=time.time() + 10)
+        with self.assertRaisesRegex(DataConfigError, 'database'):
+            load_config(self.path)
+
+    def test_ocr_engine_defaults_to_vision(self):
+        self.assertEqual(load_config(self.path).ocr_engine, 'vision')
+        self._dump({'ocrEngine': 'tesseract'}, mtime=time.time() + 10)
+        self.assertEqual(load_config(self.path).ocr_engine, 'tesseract')
+        self._dump({'ocrEngine': 'easyocr'}, mtime=time.time() + 20)
+        with self.assertRaisesRegex(DataConfigError, 'ocrEngine'):
+            load_config(self.path)
+
+
+
 class TestLocalFolderSource(TestCase):
     def setUp(self):
         self.source = LocalFolderSource(config_file_path)
@@ -349,6 +1576,13 @@ class TestLocalFolderSource(TestCase):
         with self.assertRaises(DataConfigError):
             self.source.get_images()
 
+    def test_iter_images_reads_lazily(self):
+        imgs_data = self.source.iter_images()
+        first = next(imgs_data)
+        self.assertIsInstance(first, MyImageData)
+        self.assertEqual(self.source.my_images, [])
+        self.assertEqual(len(list(imgs_data)), 1)
+
     @mock.patch('src.clss.imageSources.os.remove')
     def test__remove_all_two_imgs(self, mocked):
         img_list = self.source.get_images()
@@ -358,6 +1592,36 @@ class TestLocalFolderSource(TestCase):
         
 
 
+class TestGoogleDriveSource(TestCase):
+    def setUp(self):
+        self.id_admin = mock.Mock()
+        self.id_admin.return_sources.return_value = ['failed']
+
+    @mock.patch('src.clss.imageSources.get_id_by_folder_name', return_value='folder')
+    @mock.patch('src.clss.imageSources.get_data_files_from_folder')
+    @mock.patch('src.clss.imageSources.download_file_bytes')
+    def test__parallel_download_keeps_order_and_skips_failed(self, download, files, folder):
+        files.return_value = ['failed'] + [f'id{i}' for i in range(10)]
+        download.side_effect = lambda _id, chunk_size: bytes(_id, 'utf-8')
+        source = GoogleDriveSource('Legendas', self.id_admin, max_workers=4)
+        expected = [data.source for data in source.get_images()]
+        self.assertEqual(expected, [f'id{i}' for i in range(10)])
+        self.assertEqual(download.call_count, 10)
+
+    @mock.patch('src.clss.imageSources.get_id_by_folder_name', return_value='folder')
+    @mock.patch('src.clss.imageSources.get_data_files_from_folder')
+    @mock.patch('src.clss.imageSources.download_file_bytes')
+    def test__iter_images_downloads_on_demand(self, download, files, folder):
+        files.return_value = [f'id{i}' for i in range(10)]
+        download.side_effect = lambda _id, chunk_size: bytes(_id, 'utf-8')
+        source = GoogleDriveSource('Legendas', self.id_admin, max_workers=2)
+        imgs_data = source.iter_images()
+        self.assertEqual(next(imgs_data).source, 'id0')
+        self.assertLess(download.call_count, 10)
+        imgs_data.close()
+
+
+
 if __name__ == "__main__":
     main()
 
@@ -1,8 +1,25 @@
+import io
 import os
-from unittest import TestCase, main, mock
+from unittest import TestCase, main, mock, skipUnless
 
-from src.funcs.textFunc import get_from_txt
-from src.funcs.imgFuncs import get_imgs_path, remove_imgs_list
+import threading
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+import tempfile
+import plistlib
+
+from src.funcs.subtitleFuncs import iter_subtitle_cues, normalize_timestamp
+from src.funcs.poolFuncs import prefetch
+from src.funcs import driverFuncs
+from src.funcs.textFunc import (get_from_txt, iter_from_txt, rewrite_txt_atomically,
+                                iter_from_txt_offset)
+from src.funcs.imgFuncs import (get_imgs_path, remove_imgs_list, 
+                                PILLOW_AVAILABLE, preprocess_for_ocr)
+from src.funcs import google_drive_interface
+from src.funcs.google_drive_interface import download_file_bytes
+from src.clss.error import DriveServiceError
 
 from . import SAMPLE_FOLDER, IMG_FOLDER
 
@@ -23,6 +40,172 @@ class TestGetFromTxt(TestCase):
         phrases = get_from_txt(path)
         self.assertEqual(phrases, frases)
 
+    def test_iter_from_txt_yields_lazily(self):
+        file = "frasesTestePreenchida.txt"
+        path = os.path.join(SAMPLE_FOLDER, file)
+        phrases = iter_from_txt(path)
+        self.assertEqual(next(phrases), 
+                        "Take this time, Francis, to know your other attendees.")
+        phrases.close()
+
+
+
+class TestIterSubtitleCues(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_srt_cues_are_joined_and_stripped(self):
+        path = self._write('e01.srt', 
+            '\ufeff1\n00:00:01,500 --> 00:00:03,000\n<i>Hello</i> &amp;\nwelcome.\n\n'
+            '2\n00:00:04,000 --> 00:00:05,000\n<b></b>\n\n'
+            '3\n01:02:03,040 --> 01:02:04,000\nBye.')
+        cues = list(iter_subtitle_cues(path))
+        self.assertEqual(cues, [('00:00:01.500', 'Hello & welcome.'), 
+                                ('01:02:03.040', 'Bye.')])
+
+    def test_vtt_skips_header_notes_and_cue_settings(self):
+        path = self._write('e01.vtt', 
+            'WEBVTT\n\nNOTE a comment\n\nintro\n'
+            '00:01.000 --> 00:04.000 align:start\n<v Francis>Take this time.</v>\n')
+        cues = list(iter_subtitle_cues(path))
+        self.assertEqual(cues, [('00:00:01.000', 'Take this time.')])
+
+    def test_ass_dialogue_text_keeps_commas(self):
+        path = self._write('e01.ass', 
+            '[Script Info]\nTitle: test\n\n[Events]\n'
+            'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n'
+            'Comment: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,ignored\n'
+            'Dialogue: 0,0:00:02.50,0:00:04.00,Default,,0,0,0,,{\\i1}Well,{\\i0} hello\\Nthere.\n')
+        cues = list(iter_subtitle_cues(path))
+        self.assertEqual(cues, [('00:00:02.500', 'Well, hello there.')])
+
+    def test_normalize_timestamp(self):
+        self.assertEqual(normalize_timestamp('0:01:02.5'), '00:01:02.500')
+
+
+
+@skipUnless(PILLOW_AVAILABLE, 'Pillow not installed.')
+class TestPreprocessForOCR(TestCase):
+    def test_crops_subtitle_band_and_binarizes(self):
+        from PIL import Image
+        image = Image.new('RGB', (100, 100), (20, 20, 20))
+        image.paste((250, 250, 250), (10, 80, 60, 90))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG')
+        processed = Image.open(io.BytesIO(preprocess_for_ocr(buffer.getvalue())))
+        self.assertEqual(processed.size, (100, 30))
+        self.assertEqual(processed.mode, 'L')
+        self.assertEqual(set(processed.getdata()), {0, 255})
+        self.assertEqual(processed.getpixel((30, 15)), 0)
+        self.assertEqual(processed.getpixel((90, 5)), 255)
+
+
+
+class TestRewriteTxtAtomically(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'frases.txt')
+        with open(self.path, 'w') as f:
+            f.write('one\ntwo\nthree\n')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rewrite_from_own_stream(self):
+        remaining = (p for p in iter_from_txt(self.path) if p != 'two')
+        rewrite_txt_atomically(self.path, remaining)
+        self.assertEqual(get_from_txt(self.path), ['one', 'three'])
+
+    def test_failure_keeps_original_file(self):
+        def broken_phrases():
+            yield 'one'
+            raise OSError('disk full')
+        with self.assertRaises(OSError):
+            rewrite_txt_atomically(self.path, broken_phrases())
+        self.assertEqual(get_from_txt(self.path), ['one', 'two', 'three'])
+        self.assertEqual(os.listdir(self.tmp_dir.name), ['frases.txt'])
+
+    def test_accented_phrases_are_written_and_read_as_utf8(self):
+        rewrite_txt_atomically(self.path, ['ação', 'pingüim'])
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), 'ação\npingüim\n'.encode('utf-8'))
+        self.assertEqual(get_from_txt(self.path), ['ação', 'pingüim'])
+        offsets = [phrase for phrase, _ in iter_from_txt_offset(self.path)]
+        self.assertEqual(offsets, ['ação', 'pingüim'])
+
+
+class TestPrefetch(TestCase):
+    def test_items_are_yielded_in_order(self):
+        self.assertEqual(list(prefetch(range(10), 2)), list(range(10)))
+
+    def test_producer_stops_when_consumer_abandons_generator(self):
+        finished = threading.Event()
+
+        def produce():
+            try:
+                for i in range(1000):
+                    yield i
+            finally:
+                finished.set()
+
+        items = prefetch(produce(), 2, poll_interval=0.01)
+        self.assertEqual(next(items), 0)
+        items.close()
+        self.assertTrue(finished.wait(2))
+
+
+
+class TestGetBrowserVersion(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_windows_reads_newest_version_directory(self):
+        application = os.path.join(self.tmp_dir.name, 'Google', 'Chrome', 'Application')
+        for name in ('91.0.4472.114', '91.0.4472.124', 'SetupMetrics'):
+            os.makedirs(os.path.join(application, name))
+        with mock.patch.dict(os.environ, {'PROGRAMFILES': self.tmp_dir.name}), \
+                mock.patch.object(driverFuncs, 'WINDOWS_INSTALL_DIRS', 
+                                    {'chrome': (('PROGRAMFILES', os.path.join('Google', 'Chrome', 'Application')),)}):
+            version = driverFuncs._windows_install_version('chrome')
+        self.assertEqual(version, '91.0.4472.124')
+
+    def test_windows_reads_firefox_application_ini(self):
+        with open(os.path.join(self.tmp_dir.name, 'application.ini'), 'w') as f:
+            f.write('[App]\nVendor=Mozilla\nVersion=89.0.2\n')
+        with mock.patch.object(driverFuncs, '_windows_install_dirs', 
+                                return_value=[self.tmp_dir.name]):
+            self.assertEqual(driverFuncs._windows_install_version('firefox'), '89.0.2')
+
+    def test_mac_reads_app_bundle_info_plist(self):
+        contents = os.path.join(self.tmp_dir.name, 'Firefox.app', 'Contents')
+        os.makedirs(contents)
+        with open(os.path.join(contents, 'Info.plist'), 'wb') as f:
+            plistlib.dump({'CFBundleShortVersionString': '89.0.2'}, f)
+        with mock.patch.object(driverFuncs.os.path, 'expanduser', 
+                                return_value=self.tmp_dir.name):
+            self.assertEqual(driverFuncs._mac_bundle_version('firefox'), '89.0.2')
+
+    def test_browser_is_not_executed_on_windows(self):
+        with mock.patch.object(driverFuncs.sys, 'platform', 'win32'), \
+                mock.patch.object(driverFuncs, '_windows_registry_version', return_value=None), \
+                mock.patch.object(driverFuncs, '_windows_install_version', return_value='91.0'), \
+                mock.patch.object(driverFuncs, '_command_version') as command:
+            self.assertEqual(driverFuncs.get_browser_version('Chrome'), '91.0')
+        command.assert_not_called()
+
+
 
 class TestGetImgsName(TestCase):
     def test__returns_all_two_imgs_path(self):
@@ -49,5 +232,93 @@ class TestRemoveImgs(TestCase):
 
 
 
+
+class FakeDownloader:
+    def __init__(self, fd, request, chunksize):
+        self.fd = fd
+        self.chunks = [request[i:i + chunksize] 
+                        for i in range(0, len(request), chunksize)]
+
+    def next_chunk(self):
+        self.fd.write(self.chunks.pop(0))
+        return None, len(self.chunks) == 0
+
+
+class FakeDriveService:
+    def __init__(self, content=b'', failures=0, status=503):
+        self.content = content
+        self.failures = failures
+        self.status = status
+        self.calls = 0
+
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        self.calls += 1
+        if self.calls <= self.failures:
+            resp = httplib2.Response({'status': self.status})
+            raise HttpError(resp, b'')
+        return self.content
+
+
+@mock.patch('src.funcs.google_drive_interface.sleep')
+@mock.patch('src.funcs.google_drive_interface.MediaIoBaseDownload', FakeDownloader)
+class TestDownloadFileBytes(TestCase):
+    def test__download_joins_chunks(self, mocked_sleep):
+        service = FakeDriveService(b'0123456789')
+        expected = download_file_bytes('id', service, chunk_size=3)
+        self.assertEqual(expected, b'0123456789')
+
+    def test__transient_error_is_retried_with_backoff(self, mocked_sleep):
+        service = FakeDriveService(b'img', failures=2)
+        expected = download_file_bytes('id', service, backoff=1)
+        self.assertEqual(expected, b'img')
+        self.assertEqual(
+            [c.args[0] for c in mocked_sleep.call_args_list], [1, 2])
+
+    def test__permanent_error_returns_None(self, mocked_sleep):
+        service = FakeDriveService(b'img', failures=1, status=404)
+        expected = download_file_bytes('id', service)
+        self.assertIsNone(expected)
+        self.assertEqual(service.calls, 1)
+
+    @mock.patch('src.funcs.google_drive_interface._credentials', None)
+    @mock.patch('src.funcs.google_drive_interface.build')
+    @mock.patch('src.funcs.google_drive_interface.load_credentials')
+    def test__each_thread_gets_its_own_service(self, mocked_load, mocked_build, mocked_sleep):
+        mocked_load.return_value = mock.Mock(valid=True)
+        mocked_build.side_effect = lambda *args, **kwargs: FakeDriveService(b'img')
+        services = []
+        def worker():
+            services.append(google_drive_interface.get_thread_service())
+            services.append(google_drive_interface.get_thread_service())
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, services))), 3)
+        mocked_load.assert_called_once()
+        self.assertEqual(mocked_build.call_count, 3)
+
+    @mock.patch('src.funcs.google_drive_interface._credentials', None)
+    @mock.patch('src.funcs.google_drive_interface.load_credentials', 
+                side_effect=FileNotFoundError('client_drive_key.json'))
+    def test__credentials_failure_raises_clear_error(self, mocked_load, mocked_sleep):
+        errors = []
+        def worker():
+            try:
+                google_drive_interface.get_thread_service()
+            except DriveServiceError as err:
+                errors.append(err)
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertIn('client_drive_key.json', str(errors[0]))
+
+
+
 if __name__ == "__main__":
     main()
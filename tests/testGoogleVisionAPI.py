@@ -3,8 +3,11 @@
 import os
 import io
 from unittest import TestCase, mock, main
-from src.clss.TextExtractors import GoogleVision
-from src.clss.mocks import MockImageSource
+from src.clss.TextExtractors import GoogleVision, BatchGoogleVision
+from src.clss.myImageData import MyImageData
+from src.clss.mocks import (MockImageSource, 
+                            MockMemoryImageSource, 
+                            MockVisionClient)
 from src.clss.cardWriter import DictBasedCardWriter
 from src.clss.sourceAdmins import ImageSourceAdmin
 
@@ -41,5 +44,40 @@ class TestImageSourceAdmin(TestCase):
         self.assertEqual(expected, 2)
 
 
+
+class TestBatchGoogleVision(TestCase):
+    def setUp(self):
+        self.client = MockVisionClient()
+        self.extractor = BatchGoogleVision(self.client)
+
+    def test_images_are_packed_up_to_api_limit(self):
+        imgs = [bytes(f'line\n{i}', 'utf-8') for i in range(40)]
+        texts = self.extractor.imgs_to_str(imgs)
+        self.assertEqual(self.client.batch_sizes, [16, 16, 8])
+        self.assertEqual(texts, [f'line {i}' for i in range(40)])
+
+    def test_failed_image_returns_None_for_that_image(self):
+        texts = self.extractor.imgs_to_str([b'first', b'', b'third'])
+        self.assertEqual(texts, ['first', None, 'third'])
+
+    def test_img_to_str_reuses_client(self):
+        self.extractor.img_to_str(b'one')
+        self.extractor.img_to_str(b'two')
+        self.assertIs(self.extractor.client, self.client)
+        self.assertEqual(self.client.batch_sizes, [1, 1])
+
+    def test_image_source_admin_sends_batches(self):
+        imgs_data = [
+            MyImageData(bytes(f'phrase {i}', 'utf-8'), source=f'img{i}.jpg') 
+            for i in range(20)
+        ]
+        imgAdmin = ImageSourceAdmin(MockMemoryImageSource(imgs_data), 
+                                    DictBasedCardWriter(), self.extractor, 
+                                    batch_size=16)
+        card_list = imgAdmin.return_sources()
+        self.assertEqual(self.client.batch_sizes, [16, 4])
+        self.assertEqual(len(card_list), 20)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
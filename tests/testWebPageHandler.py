@@ -18,12 +18,6 @@ class TestAnkiEditPageHandler(TestCase):
         self.expected_names = ['Default', 'my deck', 'deck teste testando', 'teste TESTE', 'dEcK 4.2']
         self.longest_name = len(self.expected_names[2])
 
-    def test__key_value_filter_method(self):
-        handler = AnkiEditPageHandler('_')
-        filth_name = '"name": "Default"'
-        expected = handler._key_value_filter(filth_name, ':')
-        self.assertEqual(expected, 'Default')
-    
     def test__return_deck_names_method_returns_names(self):
         expected = self.handler._return_deck_names()
         self.assertEqual(expected, self.expected_names)